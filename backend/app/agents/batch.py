@@ -0,0 +1,157 @@
+"""
+Forecast every product of an organization without the LLM nodes.
+
+All series are loaded with one query and fitted in parallel in
+``forecast_pool``; results are yielded as each product finishes.
+"""
+
+from typing import Dict, Iterator, Optional, Tuple
+import logging
+
+import pandas as pd
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+
+from ..models import Product, SalesData, SalesRollup
+from ..rollups import PERIOD_TYPES
+from .executor import forecast_pool
+from .forecast_graph import format_forecast, preprocess_agent
+from .forecasters import forecast_series
+from .model_cache import data_version_columns, fitted_model_cache, make_data_version
+
+logger = logging.getLogger("forecast_workflow")
+
+
+def _org_data_versions(db: Session, org_id: int) -> Dict[int, Tuple]:
+    """``{product_id: data_version}`` for every product of ``org_id``, as ``fetch_data_agent`` computes it."""
+    return {
+        product_id: make_data_version(*version)
+        for product_id, *version in db.query(Product.product_id, *data_version_columns())
+        .outerjoin(SalesData, SalesData.product_id == Product.product_id)
+        .filter(Product.org_id == org_id)
+        .group_by(Product.product_id)
+    }
+
+
+def load_org_series(
+    db: Session, org_id: int, granularity: str = "daily"
+) -> Dict[int, Tuple[str, pd.DataFrame, Tuple]]:
+    """
+    Return ``{product_id: (product_name, series, data_version)}`` for every
+    product of ``org_id``; ``series`` is indexed by sales_date like the one
+    built by ``filter_data_agent``. Monthly and yearly series are read from
+    the sales rollups when they are complete.
+    """
+    if granularity in PERIOD_TYPES:
+        series = _load_org_rollups(db, org_id, granularity)
+        if series is not None:
+            return series
+
+    rows = (
+        db.query(
+            Product.product_id,
+            Product.product_name,
+            SalesData.sales_date,
+            SalesData.sales_quantity,
+        )
+        .outerjoin(SalesData, SalesData.product_id == Product.product_id)
+        .filter(Product.org_id == org_id)
+        .order_by(Product.product_id, SalesData.sales_date)
+        .all()
+    )
+    df = pd.DataFrame(
+        rows, columns=["product_id", "product_name", "sales_date", "sales_quantity"]
+    )
+    versions = _org_data_versions(db, org_id)
+
+    series = {}
+    for product_id, group in df.groupby("product_id", sort=True):
+        group = group.dropna(subset=["sales_date"])
+        ts = pd.DataFrame(
+            {"sales_quantity": group["sales_quantity"].astype(float).values},
+            index=pd.DatetimeIndex(pd.to_datetime(group["sales_date"]), name="sales_date"),
+        )
+        product_name = df.loc[df["product_id"] == product_id, "product_name"].iloc[0]
+        series[int(product_id)] = (product_name, ts, versions[int(product_id)])
+
+    logger.info(f"[batch] Loaded {len(df)} rows for {len(series)} products of org {org_id}")
+    return series
+
+
+def _load_org_rollups(
+    db: Session, org_id: int, granularity: str
+) -> Optional[Dict[int, Tuple[str, pd.DataFrame, Tuple]]]:
+    """Rollup-backed ``load_org_series``; None if a product has sales but no rollups."""
+    versions = _org_data_versions(db, org_id)
+    rows = (
+        db.query(Product.product_id, Product.product_name, SalesRollup.period_start, SalesRollup.total)
+        .outerjoin(
+            SalesRollup,
+            and_(SalesRollup.product_id == Product.product_id, SalesRollup.period_type == granularity),
+        )
+        .filter(Product.org_id == org_id)
+        .order_by(Product.product_id, SalesRollup.period_start)
+        .all()
+    )
+
+    periods: Dict[int, list] = {}
+    names = {}
+    for product_id, product_name, period_start, total in rows:
+        names[product_id] = product_name
+        periods.setdefault(product_id, [])
+        if period_start is not None:
+            periods[product_id].append((period_start, float(total)))
+
+    if any(versions[product_id][0] and not periods[product_id] for product_id in periods):
+        return None
+
+    series = {}
+    for product_id, values in periods.items():
+        ts = pd.DataFrame(
+            {"sales_quantity": [total for _, total in values]},
+            index=pd.DatetimeIndex(pd.to_datetime([start for start, _ in values]), name="sales_date"),
+        )
+        series[int(product_id)] = (names[product_id], ts, versions[product_id])
+
+    logger.info(f"[batch] Loaded {len(rows)} {granularity} rollup rows for {len(series)} products of org {org_id}")
+    return series
+
+
+def batch_forecast(
+    series: Dict[int, Tuple[str, pd.DataFrame, Tuple]],
+    granularity: str,
+    horizon: int,
+) -> Iterator[dict]:
+    """Yield one result dict per product, in completion order."""
+    prepared = {}
+    for product_id, (product_name, ts, data_version) in series.items():
+        if ts.empty:
+            yield {"product_id": product_id, "product_name": product_name, "error": "No sales data"}
+            continue
+        ts = preprocess_agent({"time_series": ts, "granularity": granularity})["time_series"]
+        cache_key = fitted_model_cache.make_key(product_id, granularity, None, None, data_version)
+        prepared[product_id] = (product_name, ts, cache_key, fitted_model_cache.get(cache_key))
+
+    jobs = (
+        (product_id, (ts["sales_quantity"].astype(float), granularity, 1, horizon, fitted))
+        for product_id, (_, ts, _, fitted) in prepared.items()
+    )
+    for product_id, future in forecast_pool.map_unordered(forecast_series, jobs):
+        product_name, ts, cache_key, _ = prepared[product_id]
+        try:
+            values, model_name, fitted_models, fallback_reason = future.result()
+        except Exception as e:
+            logger.warning(f"[batch] Product {product_id} failed: {e}")
+            yield {"product_id": product_id, "product_name": product_name, "error": str(e)}
+            continue
+
+        fitted_model_cache.put(cache_key, fitted_models)
+        result = format_forecast(ts, granularity, 1, values, model_name)
+        yield {
+            "product_id": product_id,
+            "product_name": product_name,
+            "granularity": granularity,
+            "model": model_name,
+            "fallback_reason": fallback_reason,
+            "forecast": result["forecast"],
+        }
@@ -0,0 +1,168 @@
+"""
+Bounded process pool for CPU-bound model fitting.
+
+Forecast fits run here instead of on the API's threadpool so CRUD endpoints
+keep their workers. At most ``size`` fits run at once and at most
+``queue_limit`` more may wait; beyond that ``submit`` raises
+``ForecastPoolSaturated`` so the API can answer 503 instead of queueing
+without bound.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from threading import BoundedSemaphore, Lock
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, Optional, Tuple
+import asyncio
+import multiprocessing
+
+from ..configs import config
+
+
+class ForecastPoolSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class ForecastPool:
+    def __init__(self, size: int, queue_limit: int):
+        self.size = max(1, size)
+        self.queue_limit = max(0, queue_limit)
+        self._slots = BoundedSemaphore(self.size + self.queue_limit)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: the API process is multi-threaded, forking it is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.size,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _submit_holding_slot(self, fn: Callable[..., Any], args: Tuple) -> Future:
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        if not self._slots.acquire(blocking=False):
+            raise ForecastPoolSaturated(
+                f"Forecast pool saturated ({self.size} running, {self.queue_limit} queued)"
+            )
+        return self._submit_holding_slot(fn, args)
+
+    def map_unordered(
+        self, fn: Callable[..., Any], jobs: Iterable[Tuple[Hashable, Tuple]]
+    ) -> Iterator[Tuple[Hashable, Future]]:
+        """
+        Run ``fn(*args)`` for each ``(key, args)`` and yield ``(key, future)``
+        as they finish. Keeps at most ``size`` jobs in flight and waits for
+        free slots instead of raising, so a large batch drains through the
+        pool without starving interactive requests of queue space.
+        """
+        jobs = iter(jobs)
+        pending: Dict[Future, Hashable] = {}
+
+        def fill():
+            while len(pending) < self.size:
+                job = next(jobs, None)
+                if job is None:
+                    return
+                key, args = job
+                self._slots.acquire()
+                pending[self._submit_holding_slot(fn, args)] = key
+
+        try:
+            fill()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future
+                fill()
+        finally:
+            # Consumer went away (e.g. client disconnected): drop queued work
+            for future in pending:
+                future.cancel()
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+forecast_pool = ForecastPool(
+    size=config.forecast_pool_size,
+    queue_limit=config.forecast_queue_limit,
+)
+
+
+class SubprocessTimeout(Exception):
+    """Raised by ``run_in_subprocess`` when the child was killed at its deadline."""
+
+
+# Imported once by the forkserver so each child starts with the model code loaded
+SUBPROCESS_PRELOAD = ["app.agents.forecasters", "prophet", "pmdarima", "statsmodels.tsa.api"]
+
+_subprocess_context = None
+_subprocess_lock = Lock()
+
+
+def _get_subprocess_context():
+    global _subprocess_context
+    with _subprocess_lock:
+        if _subprocess_context is None:
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                # Forks from a single-threaded server process: cheap and safe to
+                # start from the threaded API process
+                _subprocess_context = multiprocessing.get_context("forkserver")
+                _subprocess_context.set_forkserver_preload(SUBPROCESS_PRELOAD)
+            else:
+                _subprocess_context = multiprocessing.get_context("spawn")
+        return _subprocess_context
+
+
+def _subprocess_main(conn, fn: Callable[..., Any], args: Tuple) -> None:
+    try:
+        conn.send((True, fn(*args)))
+    except BaseException as e:
+        # Exceptions from model libraries do not always pickle
+        conn.send((False, f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def run_in_subprocess(fn: Callable[..., Any], *args: Any, timeout: float) -> Any:
+    """
+    Run ``fn(*args)`` in a child process and return its result. The child
+    is killed after ``timeout`` seconds and ``SubprocessTimeout`` raised;
+    unlike a pool task, a runaway fit cannot outlive its deadline. Works
+    from inside ``forecast_pool`` workers as well as the API process.
+    """
+    ctx = _get_subprocess_context()
+    receiver, sender = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_subprocess_main, args=(sender, fn, args), daemon=True)
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(timeout):
+            raise SubprocessTimeout(f"Timed out after {timeout:g}s")
+        try:
+            ok, value = receiver.recv()
+        except EOFError:
+            raise RuntimeError(f"Worker process exited with code {process.exitcode}")
+    finally:
+        if process.is_alive():
+            process.kill()
+        process.join()
+        receiver.close()
+    if not ok:
+        raise RuntimeError(value)
+    return value
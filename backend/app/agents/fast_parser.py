@@ -0,0 +1,218 @@
+"""
+Rule-based fast path for formulaic forecast queries.
+
+``classify_query_agent`` and ``extract_params_agent`` try these parsers
+before calling the LLM. A parser returns ``None`` unless it is confident,
+in which case the node falls back to the LLM as before. Supported phrases:
+
+- "next 10 days", "next 2 weeks", "next 3 months", "next 4 years"
+- "next day" / "tomorrow", "next week", "next month", "next quarter", "next year"
+- "March 2025", "March to June 2025", "all months of 2026"
+- "2025", "2025 to 2027"
+"""
+
+from datetime import date
+from threading import Lock
+from typing import Dict, Optional
+import calendar
+import re
+
+from .models import ForecastParams, QueryClassification
+
+# Forward-looking wording; questions about past sales go to the LLM
+_FORECAST_WORDS = re.compile(r"\b(forecast\w*|predict\w*|project\w*|expect\w*|estimat\w*|will|next|tomorrow|coming|upcoming|future)\b")
+
+# Anything that asks us to restrict the history needs the LLM
+_HISTORY_WORDS = re.compile(r"\b(since|based on|using|history|historical|past|last|previous|between|till|until)\b")
+
+# Exact dates ("2025-03-15", "15/03") are left to the LLM
+_EXPLICIT_DATE = re.compile(r"\b\d{4}-\d{1,2}-\d{1,2}\b|\b\d{1,2}/\d{1,2}\b")
+
+# Periods finer than a year that the calendar patterns below don't model
+_SUBYEAR_WORDS = re.compile(r"\b(q[1-4]|h[12]|quarter\w*|half|week\w*|days?)\b")
+
+_GRANULARITY_WORDS = {
+    "daily": re.compile(r"\b(daily|day by day|day-by-day|per day|each day|every day)\b"),
+    "weekly": re.compile(r"\b(weekly|per week|each week|every week)\b"),
+    "monthly": re.compile(r"\b(monthly|month by month|month-by-month|per month|each month|every month|all months)\b"),
+    "yearly": re.compile(r"\b(yearly|annual\w*|per year|each year|every year|year by year|year-by-year)\b"),
+}
+
+_MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+_MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_abbr) if name})
+_MONTH_RE = r"(" + "|".join(sorted(_MONTHS, key=len, reverse=True)) + r")\.?"
+_YEAR_RE = r"(20\d{2})"
+
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+}
+_NUMBER_RE = r"(\d+|" + "|".join(_NUMBER_WORDS) + r")"
+
+
+class FastPathStats:
+    """Thread-safe hit/miss counters per parser stage."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, stage: str, hit: bool) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(stage, {"hits": 0, "misses": 0})
+            counts["hits" if hit else "misses"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {stage: dict(counts) for stage, counts in self._counts.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+fast_path_stats = FastPathStats()
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text.lower()).strip()
+
+
+def _to_int(token: str) -> int:
+    return _NUMBER_WORDS[token] if token in _NUMBER_WORDS else int(token)
+
+
+def _month_index(year: int, month: int) -> int:
+    return year * 12 + month
+
+
+def _params(start: int, end: int, granularity: str, single_day: bool = False) -> Optional[ForecastParams]:
+    if start < 1 or end < start:
+        # Target is not after the last observed period; let the LLM decide
+        return None
+    return ForecastParams(
+        start_horizon=start,
+        end_horizon=end,
+        single_day=single_day,
+        granularity=granularity,
+    )
+
+
+def _parse_relative(text: str) -> Optional[ForecastParams]:
+    m = re.search(rf"\bnext {_NUMBER_RE} (day|week|month|quarter|year)s?\b", text)
+    if m:
+        n, unit = _to_int(m.group(1)), m.group(2)
+    else:
+        m = re.search(r"\b(?:next|coming) (day|week|month|quarter|year)\b", text)
+        if m:
+            n, unit = 1, m.group(1)
+        elif re.search(r"\btomorrow\b", text):
+            n, unit = 1, "day"
+        else:
+            return None
+
+    if n < 1:
+        return None
+    if unit == "day":
+        return _params(1, n, "daily", single_day=(n == 1))
+    if unit == "week":
+        return _params(1, n * 7, "daily")
+    if unit == "month":
+        return _params(1, n, "monthly")
+    if unit == "quarter":
+        return _params(1, n * 3, "monthly")
+    return _params(1, n, "yearly")
+
+
+def _parse_calendar(text: str, last_date: date) -> Optional[ForecastParams]:
+    last_month = _month_index(last_date.year, last_date.month)
+
+    # "all months of 2026", "each month in 2026", "monthly for 2026"
+    m = re.search(rf"\b(?:all months|each month|every month|monthly|month by month|month-by-month)\b(?: \w+)? {_YEAR_RE}\b", text)
+    if m:
+        year = int(m.group(1))
+        return _params(
+            _month_index(year, 1) - last_month,
+            _month_index(year, 12) - last_month,
+            "monthly",
+        )
+
+    # "march to june 2025", "from mar 2025 to jun 2025"
+    m = re.search(rf"\b{_MONTH_RE}(?: {_YEAR_RE})? (?:to|through|-) {_MONTH_RE} {_YEAR_RE}\b", text)
+    if m:
+        end_year = int(m.group(4))
+        start_year = int(m.group(2)) if m.group(2) else end_year
+        start_month, end_month = _MONTHS[m.group(1)], _MONTHS[m.group(3)]
+        return _params(
+            _month_index(start_year, start_month) - last_month,
+            _month_index(end_year, end_month) - last_month,
+            "monthly",
+        )
+
+    # "february 2025"
+    m = re.search(rf"\b{_MONTH_RE},? {_YEAR_RE}\b", text)
+    if m:
+        horizon = _month_index(int(m.group(2)), _MONTHS[m.group(1)]) - last_month
+        return _params(horizon, horizon, "monthly", single_day=True)
+
+    if _SUBYEAR_WORDS.search(text):
+        return None
+
+    # "2025 to 2027"
+    m = re.search(rf"\b{_YEAR_RE} (?:to|through|-) {_YEAR_RE}\b", text)
+    if m:
+        return _params(
+            int(m.group(1)) - last_date.year,
+            int(m.group(2)) - last_date.year,
+            "yearly",
+        )
+
+    # "for 2025", "in 2025"
+    years = re.findall(rf"\b{_YEAR_RE}\b", text)
+    if len(years) == 1:
+        horizon = int(years[0]) - last_date.year
+        return _params(horizon, horizon, "yearly", single_day=True)
+
+    return None
+
+
+def parse_forecast_params(user_query: str, last_date: date) -> Optional[ForecastParams]:
+    """Return parameters for a formulaic query, or ``None`` to defer to the LLM."""
+    text = _normalize(user_query)
+    if _HISTORY_WORDS.search(text) or _EXPLICIT_DATE.search(text):
+        return None
+
+    params = _parse_relative(text)
+    if params is None and not re.search(r"\bnext\b", text):
+        params = _parse_calendar(text, last_date)
+    if params is None:
+        return None
+
+    # "daily forecast for the next 3 months" asks for a different granularity
+    for granularity, pattern in _GRANULARITY_WORDS.items():
+        if granularity != params.granularity and pattern.search(text):
+            return None
+    return params
+
+
+def classify_query(user_query: str) -> Optional[QueryClassification]:
+    """Recognise unambiguous forecast requests; ``None`` means ask the LLM."""
+    text = _normalize(user_query)
+    if not _FORECAST_WORDS.search(text):
+        return None
+    # Horizons are irrelevant here; an early anchor keeps calendar targets in the future
+    if parse_forecast_params(text, date(2000, 1, 1)) is None:
+        return None
+    return QueryClassification(is_forecast_request=True)
+
+
+def fast_classify(user_query: str) -> Optional[QueryClassification]:
+    result = classify_query(user_query)
+    fast_path_stats.record("classify", result is not None)
+    return result
+
+
+def fast_extract_params(user_query: str, last_date: date) -> Optional[ForecastParams]:
+    result = parse_forecast_params(user_query, last_date)
+    fast_path_stats.record("extract", result is not None)
+    return result
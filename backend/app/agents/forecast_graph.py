@@ -1,5 +1,9 @@
 from typing import Dict, TypedDict, Any, Optional, Literal
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
 from datetime import timedelta, date
+from threading import Lock
+import asyncio
+import contextvars
 import json
 import warnings
 import logging
@@ -7,19 +11,31 @@ import pandas as pd
 import numpy as np
 from langchain_core.prompts import ChatPromptTemplate
 
-from pmdarima import auto_arima
-from statsmodels.tsa.statespace.sarimax import SARIMAX
-from statsmodels.tsa.holtwinters import ExponentialSmoothing
 from langgraph.graph import StateGraph, END
 
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from ..db import SessionLocal
 from ..models import SalesData
-from .tools import get_llm
+from ..rollups import PERIOD_TYPES, load_rollup_series
+from .tools import StubLLM, get_llm
+from .executor import forecast_pool
+from .forecasters import fallback_chain, forecast_series, holdout_size, preload_libraries
+from .fast_parser import fast_classify, fast_extract_params
+from .model_cache import data_version_columns, fitted_model_cache, make_data_version
+from .llm_cache import llm_cache
+from .report_template import template_report
+from .telemetry import instrument, note, record_llm_usage
+from .tournament import arun_tournament, run_tournament
+from ..configs import config
 
 from langchain_core.output_parsers import PydanticOutputParser
 from .models import QueryClassification, ForecastParams
-from .prompts import fotecasting_extract_params_prompt, fotecasting_classify_query_prompt
+from .prompts import (
+    fotecasting_extract_params_prompt,
+    fotecasting_classify_query_prompt,
+    fotecasting_conversational_response_prompt,
+)
 from .states import ForecastState
 classification_parser = PydanticOutputParser(pydantic_object=QueryClassification)
 params_parser = PydanticOutputParser(pydantic_object=ForecastParams)
@@ -37,96 +53,207 @@ if not logger.handlers:
 
 
 
-def classify_query_agent(state: ForecastState) -> ForecastState:
+def _content(response: Any) -> str:
+    return response.content if hasattr(response, "content") else str(response)
+
+
+def _llm_cache_key(llm: Any, prompt: Any, context: tuple) -> Optional[str]:
+    # Only real chat models are cached; the local stub's answers are placeholders
+    model = getattr(llm, "model_name", None)
+    if not model or not llm_cache.enabled:
+        return None
+    return llm_cache.make_key(model, prompt, *context)
+
+
+def _invoke_llm(prompt: Any, *context: Any) -> Any:
+    """
+    Ask the LLM, answering from ``llm_cache`` when the same model saw the
+    same prompt with the same ``context`` (dates the answer depends on).
+    """
     llm = get_llm()
-    user_query = state.get("user_query", "")
-    
-    parser = classification_parser
+    key = _llm_cache_key(llm, prompt, context)
+    if key is not None:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            record_llm_usage(cached, cached=True)
+            return cached
+
+    response = llm.invoke(prompt)
+    record_llm_usage(response)
+    if key is not None:
+        llm_cache.put(key, llm.model_name, _content(response))
+    return response
 
-    prompt = fotecasting_classify_query_prompt
 
-    formatted = prompt.format(
-        format_instructions=parser.get_format_instructions(),
-        user_query=user_query
+async def _ainvoke_llm(prompt: Any, *context: Any) -> Any:
+    llm = get_llm()
+    key = _llm_cache_key(llm, prompt, context)
+    if key is not None:
+        cached = await asyncio.to_thread(llm_cache.get, key)
+        if cached is not None:
+            record_llm_usage(cached, cached=True)
+            return cached
+
+    response = await llm.ainvoke(prompt)
+    record_llm_usage(response)
+    if key is not None:
+        await asyncio.to_thread(llm_cache.put, key, llm.model_name, _content(response))
+    return response
+
+
+def _fast_classification(state: ForecastState) -> Optional[ForecastState]:
+    fast = fast_classify(state.get("user_query", ""))
+    if fast is None:
+        return None
+    logger.info("[classify_query_agent] Fast path: forecast request")
+    note(fast_path=True)
+    return {"is_forecast_request": fast.is_forecast_request}
+
+
+def _classify_prompt(state: ForecastState) -> Any:
+    return fotecasting_classify_query_prompt.format(
+        format_instructions=classification_parser.get_format_instructions(),
+        user_query=state.get("user_query", "")
     )
 
-    response = llm.invoke(formatted)
-    parsed = parser.parse(response.content)
 
+def _classification_result(response: Any) -> ForecastState:
+    parsed = classification_parser.parse(_content(response))
     return {
         "is_forecast_request": parsed.is_forecast_request,
     }
 
 
-def conversational_response_agent(state: ForecastState) -> ForecastState:
-    logger.info("[conversational_response_agent] Generating conversational response")
+def classify_query_agent(state: ForecastState) -> ForecastState:
+    fast = _fast_classification(state)
+    if fast is not None:
+        return fast
 
-    llm = get_llm()
-    user_query = state.get("user_query", "")
+    response = _invoke_llm(_classify_prompt(state))
+    return _classification_result(response)
+
+
+async def aclassify_query_agent(state: ForecastState) -> ForecastState:
+    fast = _fast_classification(state)
+    if fast is not None:
+        return fast
 
-    prompt = fotecasting_conversational_response_prompt
+    response = await _ainvoke_llm(_classify_prompt(state))
+    return _classification_result(response)
 
-    formatted = prompt.format(user_query=user_query)
-    resp = llm.invoke(formatted)
-    text = resp.content if hasattr(resp, "content") else str(resp)
 
+def _conversation_prompt(state: ForecastState) -> Any:
+    logger.info("[conversational_response_agent] Generating conversational response")
+    return fotecasting_conversational_response_prompt.format(
+        user_query=state.get("user_query", "")
+    )
+
+
+def _conversation_result(response: Any) -> ForecastState:
+    text = _content(response)
     logger.info(f"[conversational_response_agent] LLM response: {text}")
     return {"conversational_response": text}
 
+
+def conversational_response_agent(state: ForecastState) -> ForecastState:
+    response = _invoke_llm(_conversation_prompt(state))
+    return _conversation_result(response)
+
+
+async def aconversational_response_agent(state: ForecastState) -> ForecastState:
+    response = await _ainvoke_llm(_conversation_prompt(state))
+    return _conversation_result(response)
+
+
 def fetch_data_agent(state: ForecastState) -> ForecastState:
+    """
+    Fingerprint and last sales date of the product, from the index alone.
+    Runs alongside ``extract_params_agent``; ``filter_data_agent`` loads the
+    series once the granularity and history window are known.
+    """
     logger.info(
-        f"[fetch_data_agent] Fetching all available data for product {state['product_id']}"
+        f"[fetch_data_agent] Fetching data summary for product {state['product_id']}"
     )
 
     db: Session = SessionLocal()
     try:
-        q = db.query(SalesData.sales_date, SalesData.sales_quantity).filter(
-            SalesData.product_id == state["product_id"]
-        )
-
-        rows = q.order_by(SalesData.sales_date).all()
-
+        # Fingerprint of the product's rows, used to key the fitted-model cache
+        *version, max_sales_date = db.query(
+            *data_version_columns(),
+            func.max(SalesData.sales_date),
+        ).filter(SalesData.product_id == state["product_id"]).one()
     finally:
         db.close()
 
-    if not rows:
+    data_version = make_data_version(*version)
+    note(rows=data_version[0])
+    if not data_version[0]:
         logger.warning("[fetch_data_agent] No rows found.")
-        ts = pd.DataFrame(columns=["sales_date", "sales_quantity"])
-        last_date = date.today()
-    else:
-        logger.info(f"[fetch_data_agent] Retrieved {len(rows)} rows.")
-        ts = pd.DataFrame(rows, columns=["sales_date", "sales_quantity"])
-        ts["sales_date"] = pd.to_datetime(ts["sales_date"])
-        ts.set_index("sales_date", inplace=True)
-        last_date = ts.index.max().date()
+    last_date = max_sales_date or date.today()
 
-    logger.info(f"[fetch_data_agent] Last date in dataset: {last_date}")
+    logger.info(f"[fetch_data_agent] {data_version[0]} rows, last date in dataset: {last_date}")
 
     return {
-        "time_series": ts,
-        "last_date": last_date
+        "last_date": last_date,
+        "data_version": data_version,
     }
 
 
-def extract_params_agent(state: ForecastState) -> ForecastState:
-    llm = get_llm()
+def fetch_last_date(product_id: int) -> date:
+    """Latest sales date of the product, or today when it has no rows."""
+    db: Session = SessionLocal()
+    try:
+        last_date = db.query(func.max(SalesData.sales_date)).filter(
+            SalesData.product_id == product_id
+        ).scalar()
+    finally:
+        db.close()
+
+    return last_date or date.today()
+
+
+def _extract_params_request(state: ForecastState):
+    """
+    Return ``(parsed, prompt, last_date)``: ``parsed`` is set when the fast
+    path matched, otherwise ``prompt`` must be sent to the LLM.
+    """
     user_query = state.get("user_query", "")
     today = date.today()
-    last_date = state.get("last_date", today)
+    # Runs alongside fetch_data_agent, so only the cheap MAX(sales_date) is needed here
+    last_date = state.get("last_date") or fetch_last_date(state["product_id"])
 
-    parser = params_parser
+    parsed = fast_extract_params(user_query, last_date)
+    if parsed is not None:
+        logger.info("[extract_params_agent] Fast path matched, skipping LLM")
+        note(fast_path=True)
+        return parsed, None, last_date
 
-    prompt = fotecasting_extract_params_prompt
-    formatted = prompt.format(
-        format_instructions=parser.get_format_instructions(),
+    prompt = fotecasting_extract_params_prompt.format(
+        format_instructions=params_parser.get_format_instructions(),
         user_query=user_query,
         today=today,
         last_date=last_date
     )
+    return None, prompt, last_date
+
+
+def extract_params_agent(state: ForecastState) -> ForecastState:
+    parsed, prompt, last_date = _extract_params_request(state)
+    if parsed is None:
+        response = _invoke_llm(prompt, date.today(), last_date)
+        parsed = params_parser.parse(_content(response))
+    return _params_result(parsed, last_date)
 
-    response = llm.invoke(formatted)
-    parsed = parser.parse(response.content)
 
+async def aextract_params_agent(state: ForecastState) -> ForecastState:
+    parsed, prompt, last_date = await asyncio.to_thread(_extract_params_request, state)
+    if parsed is None:
+        response = await _ainvoke_llm(prompt, date.today(), last_date)
+        parsed = params_parser.parse(_content(response))
+    return _params_result(parsed, last_date)
+
+
+def _params_result(parsed: ForecastParams, last_date: date) -> ForecastState:
     history_start = (
         date.fromisoformat(parsed.history_start)
         if parsed.history_start else None
@@ -159,35 +286,57 @@ def extract_params_agent(state: ForecastState) -> ForecastState:
 
 def filter_data_agent(state: ForecastState) -> ForecastState:
     """
-    Apply history_start and history_end filters if specified.
+    Load the product's series for the requested granularity and history
+    window. Monthly/yearly totals over the whole history are read from
+    sales_rollup; otherwise the daily rows, with history_start and
+    history_end applied in SQL.
     """
-    ts = state["time_series"]
+    product_id = state["product_id"]
+    granularity = state.get("granularity", "daily")
     history_start = state.get("history_start")
     history_end = state.get("history_end")
+    row_count = (state.get("data_version") or (None,))[0]
 
-    if ts.empty:
-        logger.warning("[filter_data_agent] Empty time series, skipping filter")
-        return {}
-
-    original_len = len(ts)
+    db: Session = SessionLocal()
+    try:
+        ts = None
+        if granularity in PERIOD_TYPES and not history_start and not history_end and row_count:
+            ts = load_rollup_series(db, product_id, granularity, row_count)
+            if ts is not None:
+                logger.info(f"[filter_data_agent] Retrieved {len(ts)} {granularity} rollup rows.")
+                note(source="sales_rollup")
+
+        rows = None
+        if ts is None:
+            q = db.query(SalesData.sales_date, SalesData.sales_quantity).filter(
+                SalesData.product_id == product_id
+            )
+            if history_start:
+                q = q.filter(SalesData.sales_date >= history_start)
+                logger.info(f"[filter_data_agent] Filtered by history_start={history_start}")
+            if history_end:
+                q = q.filter(SalesData.sales_date <= history_end)
+                logger.info(f"[filter_data_agent] Filtered by history_end={history_end}")
+
+            rows = q.order_by(SalesData.sales_date).all()
+    finally:
+        db.close()
 
-    if history_start:
-        ts = ts[ts.index >= pd.Timestamp(history_start)]
-        logger.info(f"[filter_data_agent] Filtered by history_start={history_start}")
+    if ts is not None:
+        return {"time_series": ts}
 
-    if history_end:
-        ts = ts[ts.index <= pd.Timestamp(history_end)]
-        logger.info(f"[filter_data_agent] Filtered by history_end={history_end}")
+    if not rows:
+        logger.warning("[filter_data_agent] No rows found.")
+        return {"time_series": pd.DataFrame(columns=["sales_date", "sales_quantity"])}
 
-    filtered_len = len(ts)
-    logger.info(f"[filter_data_agent] Data filtered: {original_len} → {filtered_len} rows")
+    logger.info(f"[filter_data_agent] Retrieved {len(rows)} rows.")
+    ts = pd.DataFrame(rows, columns=["sales_date", "sales_quantity"])
+    ts["sales_date"] = pd.to_datetime(ts["sales_date"])
+    ts.set_index("sales_date", inplace=True)
 
-    # Update last_date after filtering
-    if not ts.empty:
-        last_date = ts.index.max().date()
-        logger.info(f"[filter_data_agent] Updated last_date after filtering: {last_date}")
-    else:
-        last_date = state.get("last_date")
+    # The window may end before the latest sale
+    last_date = ts.index.max().date()
+    logger.info(f"[filter_data_agent] Last date in the series: {last_date}")
 
     return {
         "time_series": ts,
@@ -229,11 +378,10 @@ def preprocess_agent(state: ForecastState) -> ForecastState:
 
     return {"time_series": ts}
 
-from prophet import Prophet
-import warnings
 warnings.filterwarnings('ignore')
 
-def arima_agent(state: ForecastState) -> ForecastState:
+def _forecast_inputs(state: ForecastState):
+    """Series, horizons and model-cache lookup shared by the sync and async nodes."""
     logger.info("[arima_agent] Starting multi-granularity forecasting with Prophet")
 
     ts = state["time_series"]
@@ -242,274 +390,95 @@ def arima_agent(state: ForecastState) -> ForecastState:
     granularity = state.get("granularity", "daily")
     start_horizon = int(state.get("start_horizon", 1))
     end_horizon = int(state.get("end_horizon", 1))
-    
+
     logger.info(f"[arima_agent] Granularity: {granularity}, Last date: {last_date}")
     logger.info(f"[arima_agent] Horizons: start={start_horizon}, end={end_horizon}")
 
-    
-    if granularity == "monthly":
-        freq = "MS"
-        seasonal_m = 12
-        prophet_freq = 'MS'  # Month Start
-        
-    elif granularity == "yearly":
-        freq = "YS"
-        seasonal_m = 1
-        prophet_freq = 'YS'  # Year Start
-        
-    else:  # daily
-        freq = "D"
-        seasonal_m = 7
-        prophet_freq = 'D'  # Daily
-    
-    forecast_length = end_horizon - start_horizon + 1
-    start_offset = start_horizon - 1
-    total_steps = start_offset + forecast_length
-    
-    logger.info(f"[arima_agent] Forecasting {forecast_length} {granularity} periods, "
-               f"offset={start_offset}, total_steps={total_steps}")
-    
-    forecast_values = None
-    
-    
-    try:
-        logger.info("[arima_agent] Attempting Prophet forecast...")
-        
-        # Prepare data for Prophet (requires 'ds' and 'y' columns)
-        df_prophet = pd.DataFrame({
-            'ds': series.index,
-            'y': series.values
-        })
-        
-        # Configure Prophet based on granularity
-        if granularity == "daily":
-            model = Prophet(
-                yearly_seasonality=True,
-                weekly_seasonality=True,
-                daily_seasonality=False,
-                seasonality_mode='multiplicative',  # Better for sales with trends
-                changepoint_prior_scale=0.05,  # Controls trend flexibility
-                seasonality_prior_scale=10.0,  # Controls seasonality strength
-                interval_width=0.95,
-            )
-            
-        elif granularity == "monthly":
-            model = Prophet(
-                yearly_seasonality=True,
-                weekly_seasonality=False,
-                daily_seasonality=False,
-                seasonality_mode='multiplicative',
-                changepoint_prior_scale=0.1,
-                seasonality_prior_scale=10.0,
-            )
-            # Add monthly patterns
-            model.add_seasonality(name='monthly', period=30.5, fourier_order=5)
-            
-        else:  # yearly
-            model = Prophet(
-                yearly_seasonality=False,
-                weekly_seasonality=False,
-                daily_seasonality=False,
-                seasonality_mode='additive',
-                changepoint_prior_scale=0.15,
-                growth='linear',  # or 'logistic' if you have cap/floor
-            )
-        
-        # Fit the model
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            model.fit(df_prophet)
-        
-        # Generate future dates
-        future = model.make_future_dataframe(periods=total_steps, freq=prophet_freq)
-        
-        # Make predictions
-        forecast_df = model.predict(future)
-        
-        # Extract only the future predictions we need
-        all_predictions = forecast_df['yhat'].tail(total_steps).values
-        
-        # Extract the specific range requested
-        forecast_values = [
-            max(0, float(all_predictions[i]))  # Ensure non-negative
-            for i in range(start_offset, total_steps)
-        ]
-        
-        # Validate Prophet results
-        forecast_mean = np.mean(forecast_values)
-        forecast_std = np.std(forecast_values)
-        
-        logger.info(f"[arima_agent] Prophet succeeded: {len(forecast_values)} values, "
-                   f"mean={forecast_mean:.2f}, std={forecast_std:.2f}")
-        
-        # Check if forecast is reasonable (not all zeros or constant)
-        if forecast_std < 0.01 * abs(forecast_mean) and forecast_mean > 0:
-            logger.warning("[arima_agent] Prophet produced near-constant forecast, will try fallback")
-            forecast_values = None
-        
-    except Exception as e:
-        logger.warning(f"[arima_agent] Prophet failed: {str(e)}")
-        forecast_values = None
+    # Reuse fitted models while the product's sales rows are unchanged
+    cache_key = None
+    if state.get("product_id") is not None and state.get("data_version") is not None:
+        cache_key = fitted_model_cache.make_key(
+            state["product_id"],
+            granularity,
+            state.get("history_start"),
+            state.get("history_end"),
+            state["data_version"],
+        )
+    fitted_models = fitted_model_cache.get(cache_key) if cache_key else None
+    if cache_key:
+        note(model_cache_hit=fitted_models is not None)
+
+    return series, granularity, start_horizon, end_horizon, cache_key, fitted_models
+
+
+def _use_tournament(state: ForecastState, series: pd.Series, granularity: str) -> bool:
+    if state.get("model_selection", config.forecast_selection) != "tournament":
+        return False
+    if holdout_size(series, granularity) == 0:
+        logger.info(f"[arima_agent] {len(series)} periods are too few to hold out, using fallback chain")
+        return False
+    return True
+
+
+def _forecast_update(
+    state: ForecastState, granularity, start_horizon, forecast_values, model_name, candidates, fallback_reason
+) -> ForecastState:
+    update = format_forecast(state["time_series"], granularity, start_horizon, forecast_values, model_name)
+    note(
+        model=model_name,
+        selection="tournament" if candidates is not None else "fallback",
+        fallback_chain=None if candidates is not None else fallback_chain(model_name),
+        fallback_reason=fallback_reason,
+    )
+    if candidates is not None:
+        update["model_candidates"] = candidates
+    if fallback_reason:
+        logger.warning(f"[arima_agent] Time limits forced a fallback: {fallback_reason}")
+        update["fallback_reason"] = fallback_reason
+    return update
 
-    if forecast_values is None:
-        logger.info("[arima_agent] Falling back to ARIMA/SARIMA...")
-        
-        try:
-            # Determine if we have enough data for seasonality
-            min_data_for_seasonal = {
-                "daily": 28,
-                "monthly": 24,
-                "yearly": 3
-            }
-            
-            has_enough_data = len(series) >= min_data_for_seasonal.get(granularity, 10)
-            seasonal = has_enough_data and granularity != "yearly"
-            
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                
-                model = auto_arima(
-                    series,
-                    seasonal=seasonal,
-                    m=seasonal_m if seasonal else 1,
-                    stepwise=True,
-                    suppress_warnings=True,
-                    error_action="ignore",
-                    max_p=5,
-                    max_q=5,
-                    max_d=2,
-                    max_P=2 if seasonal else 0,
-                    max_Q=2 if seasonal else 0,
-                    max_D=1 if seasonal else 0,
-                    start_p=1,
-                    start_q=1,
-                    information_criterion='aic',
-                )
-
-                order = model.order
-                seasonal_order = model.seasonal_order if seasonal else (0, 0, 0, 0)
-                
-                logger.info(f"[arima_agent] ARIMA order: {order}, seasonal: {seasonal_order}")
-                
-                # Check for poor model (random walk)
-                is_random_walk = (order[0] == 0 and order[2] == 0)
-                
-                if is_random_walk:
-                    logger.warning("[arima_agent] Random walk detected, forcing ETS fallback")
-                    raise ValueError("Poor ARIMA model")
-                
-                # Fit SARIMA
-                sarimax = SARIMAX(
-                    series,
-                    order=order,
-                    seasonal_order=seasonal_order,
-                    enforce_stationarity=False,
-                    enforce_invertibility=False,
-                )
-
-                fitted = sarimax.fit(disp=False, maxiter=200)
-                all_preds = fitted.get_forecast(steps=total_steps).predicted_mean
-                
-                forecast_values = [
-                    max(0, float(all_preds.iloc[i]))
-                    for i in range(start_offset, total_steps)
-                ]
-                
-                forecast_std = np.std(forecast_values)
-                forecast_mean = np.mean(forecast_values)
-                
-                logger.info(f"[arima_agent] ARIMA succeeded: mean={forecast_mean:.2f}, std={forecast_std:.2f}")
-
-        except Exception as e:
-            logger.warning(f"[arima_agent] ARIMA failed: {str(e)}")
-            forecast_values = None
 
-    
-    if forecast_values is None:
-        logger.info("[arima_agent] Falling back to ETS...")
-        
-        try:
-            use_seasonal = (
-                granularity in ["daily", "monthly"] and 
-                len(series) >= 2 * seasonal_m
-            )
-            
-            # Try additive first
-            try:
-                ets = ExponentialSmoothing(
-                    series,
-                    trend="add",
-                    seasonal="add" if use_seasonal else None,
-                    seasonal_periods=seasonal_m if use_seasonal else None,
-                    damped_trend=True,
-                ).fit(optimized=True)
-                
-            except:
-                # Fallback to multiplicative
-                logger.info("[arima_agent] Trying multiplicative ETS")
-                ets = ExponentialSmoothing(
-                    series + 1,  # Avoid zeros
-                    trend="mul",
-                    seasonal="mul" if use_seasonal else None,
-                    seasonal_periods=seasonal_m if use_seasonal else None,
-                    damped_trend=True,
-                ).fit(optimized=True)
-
-            all_preds = ets.forecast(total_steps)
-            forecast_values = [
-                max(0, float(all_preds[i]))
-                for i in range(start_offset, total_steps)
-            ]
-
-            logger.info(f"[arima_agent] ETS succeeded: {len(forecast_values)} values")
-
-        except Exception as e:
-            logger.error(f"[arima_agent] ETS failed: {str(e)}")
-            forecast_values = None
+def arima_agent(state: ForecastState) -> ForecastState:
+    series, granularity, start_horizon, end_horizon, cache_key, fitted_models = _forecast_inputs(state)
 
-    
-    if forecast_values is None:
-        logger.warning("[arima_agent] All models failed, using trend-based fallback")
-        
-        # Use recent trend
-        window = min(90 if granularity == "daily" else 12, len(series) // 2)
-        recent = series.tail(window)
-        
-        # Calculate trend using linear regression
-        from scipy.stats import linregress
-        x = np.arange(len(recent))
-        slope, intercept, _, _, _ = linregress(x, recent.values)
-        
-        # Project forward
-        last_value = float(series.iloc[-1])
-        base_trend = [last_value + slope * i for i in range(1, total_steps + 1)]
-        
-        # Add seasonal component if available
-        if len(series) >= seasonal_m * 2:
-            # Extract seasonal pattern from last periods
-            seasonal_pattern = []
-            for i in range(seasonal_m):
-                period_values = series.iloc[i::seasonal_m].tail(3)  # Last 3 cycles
-                seasonal_pattern.append(period_values.mean() - series.mean())
-            
-            # Apply seasonal pattern
-            forecast_values = []
-            for i in range(start_offset, total_steps):
-                trend_val = base_trend[i]
-                seasonal_idx = i % len(seasonal_pattern)
-                seasonal_adj = seasonal_pattern[seasonal_idx]
-                forecast_values.append(max(0, trend_val + seasonal_adj))
-        else:
-            # Just use trend with small noise
-            std = float(series.std())
-            forecast_values = [
-                max(0, base_trend[i] + np.random.normal(0, std * 0.05))
-                for i in range(start_offset, total_steps)
-            ]
-        
-        logger.info(f"[arima_agent] Trend-based forecast: mean={np.mean(forecast_values):.2f}")
-    
+    candidates = None
+    if _use_tournament(state, series, granularity):
+        forecast_values, model_name, fitted_models, candidates, fallback_reason = run_tournament(
+            series, granularity, start_horizon, end_horizon, fitted_models
+        )
+    else:
+        forecast_values, model_name, fitted_models, fallback_reason = forecast_series(
+            series, granularity, start_horizon, end_horizon, fitted_models
+        )
+
+    if cache_key:
+        fitted_model_cache.put(cache_key, fitted_models)
+
+    return _forecast_update(state, granularity, start_horizon, forecast_values, model_name, candidates, fallback_reason)
+
+
+async def aarima_agent(state: ForecastState) -> ForecastState:
+    """Like ``arima_agent`` but fits in the bounded process pool."""
+    series, granularity, start_horizon, end_horizon, cache_key, fitted_models = _forecast_inputs(state)
+
+    candidates = None
+    if _use_tournament(state, series, granularity):
+        forecast_values, model_name, fitted_models, candidates, fallback_reason = await arun_tournament(
+            series, granularity, start_horizon, end_horizon, fitted_models
+        )
+    else:
+        forecast_values, model_name, fitted_models, fallback_reason = await forecast_pool.run(
+            forecast_series, series, granularity, start_horizon, end_horizon, fitted_models
+        )
+
+    if cache_key:
+        fitted_model_cache.put(cache_key, fitted_models)
+
+    return _forecast_update(state, granularity, start_horizon, forecast_values, model_name, candidates, fallback_reason)
 
+
+def format_forecast(ts, granularity, start_horizon, forecast_values, model_name) -> ForecastState:
+    """Key forecast values by period label, counted from the end of ``ts``."""
     last_ts_date = ts.index.max()
     
     if granularity == "daily":
@@ -548,17 +517,19 @@ def arima_agent(state: ForecastState) -> ForecastState:
     logger.info(f"[arima_agent] Forecast complete: {list(forecast_dict.keys())[:5]}... "
                f"({len(forecast_dict)} total)")
 
-    return {"forecast": forecast_dict}
+    return {"forecast": forecast_dict, "forecast_model": model_name}
 
 
-def report_agent(state: ForecastState) -> ForecastState:
+def _report_request(state: ForecastState):
+    """
+    Return ``(prompt, update)``. ``prompt`` is ``None`` when there is nothing
+    to summarize; otherwise the LLM's text is added to ``update`` as "report".
+    """
     logger.info("[report_agent] Generating LLM summary")
 
     forecast = state["forecast"]
     granularity = state.get("granularity", "daily")
     single_day = state.get("single_day", False)
-    
-    llm = get_llm()
 
     # Granularity labels
     period_label = {
@@ -575,7 +546,7 @@ def report_agent(state: ForecastState) -> ForecastState:
         if value is None:
             logger.warning(f"[report_agent] No forecast found")
             text = "No forecast available."
-            return {
+            return None, {
                 "report": text,
                 "forecast": {}
             }
@@ -586,16 +557,9 @@ def report_agent(state: ForecastState) -> ForecastState:
             ("user", f"Forecasted units: {value:.2f}")
         ])
 
-        formatted = prompt.format()
-        resp = llm.invoke(formatted)
-        text = resp.content if hasattr(resp, "content") else str(resp)
-
-        logger.info(f"[report_agent] Single {period_label} summary generated")
+        logger.info(f"[report_agent] Single {period_label} summary requested")
 
-        return {
-            "report": text,
-            "forecast": {target_key: round(value, 2)}
-        }
+        return prompt.format(), {"forecast": {target_key: round(value, 2)}}
 
     # Multi-period forecast
     values = list(forecast.values())
@@ -614,54 +578,172 @@ def report_agent(state: ForecastState) -> ForecastState:
         ("user", f"Average {period_label}ly demand: {avg:.2f} units")
     ])
 
-    formatted = prompt.format()
-    resp = llm.invoke(formatted)
-    text = resp.content if hasattr(resp, "content") else str(resp)
+    logger.info(f"[report_agent] Multi-{period_label} summary requested")
+
+    return prompt.format(), {}
+
+
+# Report LLM calls that may outlive REPORT_LLM_TIMEOUT; threads are started on first use
+_report_llm_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="report-llm")
+
+
+def _template_reason(state: ForecastState) -> Optional[str]:
+    """Why the report skips the LLM, or ``None`` to ask it."""
+    if state.get("report_mode", config.forecast_report_mode) == "template":
+        return "template mode"
+    if isinstance(get_llm(), StubLLM):
+        return "no LLM configured"
+    return None
+
+
+def _template_update(state: ForecastState, update: ForecastState, reason: str) -> ForecastState:
+    logger.info(f"[report_agent] Using the template summary: {reason}")
+    note(report_source="template")
+    ts = state.get("time_series")
+    history = ts["sales_quantity"] if ts is not None and not ts.empty else None
+    report = template_report(
+        update.get("forecast", state["forecast"]),
+        state.get("granularity", "daily"),
+        history,
+        single_period=state.get("single_day", False),
+    )
+    return {**update, "report": report, "report_source": "template"}
+
+
+def _llm_update(update: ForecastState, response: Any) -> ForecastState:
+    note(report_source="llm")
+    return {**update, "report": _content(response), "report_source": "llm"}
+
+
+def report_agent(state: ForecastState) -> ForecastState:
+    prompt, update = _report_request(state)
+    if prompt is None:
+        return update
+    reason = _template_reason(state)
+    if reason:
+        return _template_update(state, update, reason)
+
+    timeout = config.report_llm_timeout
+    try:
+        if timeout > 0:
+            # A late answer is dropped here but still lands in the LLM cache
+            future = _report_llm_executor.submit(contextvars.copy_context().run, _invoke_llm, prompt)
+            response = future.result(timeout=timeout)
+        else:
+            response = _invoke_llm(prompt)
+    except FuturesTimeout:
+        return _template_update(state, update, f"LLM gave no answer within {timeout:g}s")
+    except Exception as e:
+        return _template_update(state, update, f"LLM failed: {e}")
+    return _llm_update(update, response)
+
 
-    logger.info(f"[report_agent] Multi-{period_label} summary generated")
+def _discard_result(task: asyncio.Task) -> None:
+    if not task.cancelled():
+        task.exception()
 
-    return {"report": text}
+
+async def areport_agent(state: ForecastState) -> ForecastState:
+    prompt, update = _report_request(state)
+    if prompt is None:
+        return update
+    reason = _template_reason(state)
+    if reason:
+        return _template_update(state, update, reason)
+
+    timeout = config.report_llm_timeout
+    task = asyncio.ensure_future(_ainvoke_llm(prompt))
+    try:
+        if timeout > 0:
+            # Shielded so a late answer still lands in the LLM cache
+            response = await asyncio.wait_for(asyncio.shield(task), timeout)
+        else:
+            response = await task
+    except asyncio.TimeoutError:
+        task.add_done_callback(_discard_result)
+        return _template_update(state, update, f"LLM gave no answer within {timeout:g}s")
+    except Exception as e:
+        return _template_update(state, update, f"LLM failed: {e}")
+    return _llm_update(update, response)
 
 
 
 def should_continue_forecast(state: ForecastState):
     decision = "forecast" if state.get("is_forecast_request") else "conversation"
     logger.info(f"[branch] Routing → {decision}")
-    return decision
+    if decision == "forecast":
+        # Fan out: the series load and the parameter extraction run in parallel
+        return ["fetch_data_agent", "extract_params_agent"]
+    return "conversational_response_agent"
 
 
 
-builder = StateGraph(ForecastState)
+def build_workflow(async_nodes: bool = False):
+    """
+    Compile the forecast graph. With ``async_nodes`` the LLM nodes use
+    ``ainvoke`` and model fitting runs in ``forecast_pool``; that graph must
+    be driven with ``ainvoke``/``astream``.
+    """
+    builder = StateGraph(ForecastState)
+
+    def add_node(name: str, node, async_node=None):
+        # Every node reports its timings under state["diagnostics"][name]
+        builder.add_node(name, instrument(name, async_node if async_nodes and async_node else node))
+
+    add_node("classify_query_agent", classify_query_agent, aclassify_query_agent)
+    add_node("conversational_response_agent", conversational_response_agent, aconversational_response_agent)
+    add_node("fetch_data_agent", fetch_data_agent)
+    add_node("extract_params_agent", extract_params_agent, aextract_params_agent)
+    add_node("filter_data_agent", filter_data_agent)
+    add_node("preprocess_agent", preprocess_agent)
+    add_node("arima_agent", arima_agent, aarima_agent)
+    add_node("report_agent", report_agent, areport_agent)
+
+    builder.set_entry_point("classify_query_agent")
+
+    builder.add_conditional_edges(
+        "classify_query_agent",
+        should_continue_forecast,
+        ["fetch_data_agent", "extract_params_agent", "conversational_response_agent"],
+    )
 
-builder.add_node("classify_query_agent", classify_query_agent)
-builder.add_node("conversational_response_agent", conversational_response_agent)
-builder.add_node("fetch_data_agent", fetch_data_agent)
-builder.add_node("extract_params_agent", extract_params_agent)
-builder.add_node("filter_data_agent", filter_data_agent)
-builder.add_node("preprocess_agent", preprocess_agent)
-builder.add_node("arima_agent", arima_agent)
-builder.add_node("report_agent", report_agent)
+    # Forecast path: filter_data_agent waits for both branches
+    builder.add_edge(["fetch_data_agent", "extract_params_agent"], "filter_data_agent")
+    builder.add_edge("filter_data_agent", "preprocess_agent")
+    builder.add_edge("preprocess_agent", "arima_agent")
+    builder.add_edge("arima_agent", "report_agent")
+    builder.add_edge("report_agent", END)
 
-builder.set_entry_point("classify_query_agent")
+    # Conversation path
+    builder.add_edge("conversational_response_agent", END)
+
+    return builder.compile()
+
+
+_workflows: Dict[bool, Any] = {}
+_workflows_lock = Lock()
+
+
+def get_workflow(async_nodes: bool = False):
+    """The compiled graph, built on first use and shared afterwards."""
+    with _workflows_lock:
+        if async_nodes not in _workflows:
+            _workflows[async_nodes] = build_workflow(async_nodes=async_nodes)
+        return _workflows[async_nodes]
 
-builder.add_conditional_edges(
-    "classify_query_agent",
-    should_continue_forecast,
-    {
-        "forecast": "fetch_data_agent",
-        "conversation": "conversational_response_agent",
-    }
-)
 
-# Forecast path
-builder.add_edge("fetch_data_agent", "extract_params_agent")
-builder.add_edge("extract_params_agent", "filter_data_agent")
-builder.add_edge("filter_data_agent", "preprocess_agent")
-builder.add_edge("preprocess_agent", "arima_agent")
-builder.add_edge("arima_agent", "report_agent")
-builder.add_edge("report_agent", END)
+def __getattr__(name: str):
+    # Module-level names of the compiled graphs, compiled on first access
+    if name == "demand_forecast_workflow":
+        return get_workflow()
+    if name == "async_demand_forecast_workflow":
+        return get_workflow(async_nodes=True)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Conversation path
-builder.add_edge("conversational_response_agent", END)
 
-demand_forecast_workflow = builder.compile()
\ No newline at end of file
+def warm_up() -> None:
+    """Compile both graphs and import the model libraries ahead of the first request."""
+    get_workflow()
+    get_workflow(async_nodes=True)
+    loaded = preload_libraries()
+    logger.info(f"[warm_up] Graphs compiled, model libraries loaded: {', '.join(loaded) or 'none'}")
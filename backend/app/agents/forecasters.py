@@ -0,0 +1,422 @@
+"""
+Candidate forecasting models used by ``arima_agent``.
+
+Fitting and prediction are kept separate so a fitted model can be reused
+for several horizons (see ``model_cache``).
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import importlib
+import logging
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from ..configs import config
+from .executor import SubprocessTimeout, run_in_subprocess
+
+logger = logging.getLogger("forecast_workflow")
+
+# granularity -> (pandas/prophet frequency, seasonal period)
+GRANULARITY_SETTINGS = {
+    "daily": ("D", 7),
+    "monthly": ("MS", 12),
+    "yearly": ("YS", 1),
+}
+
+# Tried in order; the linear trend fallback is cheap and never cached.
+CANDIDATES = ("prophet", "arima", "ets")
+
+# Imported inside the fitters so API workers that never forecast don't load them
+CANDIDATE_MODULES = {
+    "prophet": ("prophet",),
+    "arima": ("pmdarima", "statsmodels.tsa.statespace.sarimax"),
+    "ets": ("statsmodels.tsa.holtwinters",),
+}
+
+MIN_DATA_FOR_SEASONAL = {
+    "daily": 28,
+    "monthly": 24,
+    "yearly": 3,
+}
+
+# Trailing periods held out to score candidates in tournament mode
+HOLDOUT_PERIODS = {
+    "daily": 28,
+    "monthly": 6,
+    "yearly": 2,
+}
+
+
+def preload_libraries() -> List[str]:
+    """Import the libraries of every installed candidate; returns the names loaded."""
+    loaded = []
+    for name in CANDIDATES:
+        try:
+            for module in CANDIDATE_MODULES[name]:
+                importlib.import_module(module)
+        except ImportError:
+            continue
+        loaded.append(name)
+    return loaded
+
+
+def _settings(granularity: str) -> Tuple[str, int]:
+    return GRANULARITY_SETTINGS.get(granularity, GRANULARITY_SETTINGS["daily"])
+
+
+def fit_prophet(series: pd.Series, granularity: str) -> Any:
+    from prophet import Prophet
+
+    # Prepare data for Prophet (requires 'ds' and 'y' columns)
+    df_prophet = pd.DataFrame({
+        'ds': series.index,
+        'y': series.values
+    })
+
+    # Configure Prophet based on granularity
+    if granularity == "monthly":
+        model = Prophet(
+            yearly_seasonality=True,
+            weekly_seasonality=False,
+            daily_seasonality=False,
+            seasonality_mode='multiplicative',
+            changepoint_prior_scale=0.1,
+            seasonality_prior_scale=10.0,
+        )
+        # Add monthly patterns
+        model.add_seasonality(name='monthly', period=30.5, fourier_order=5)
+
+    elif granularity == "yearly":
+        model = Prophet(
+            yearly_seasonality=False,
+            weekly_seasonality=False,
+            daily_seasonality=False,
+            seasonality_mode='additive',
+            changepoint_prior_scale=0.15,
+            growth='linear',  # or 'logistic' if you have cap/floor
+        )
+
+    else:  # daily
+        model = Prophet(
+            yearly_seasonality=True,
+            weekly_seasonality=True,
+            daily_seasonality=False,
+            seasonality_mode='multiplicative',  # Better for sales with trends
+            changepoint_prior_scale=0.05,  # Controls trend flexibility
+            seasonality_prior_scale=10.0,  # Controls seasonality strength
+            interval_width=0.95,
+        )
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        model.fit(df_prophet)
+
+    return model
+
+
+def fit_arima(series: pd.Series, granularity: str) -> Any:
+    from pmdarima import auto_arima
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+    _, seasonal_m = _settings(granularity)
+
+    # Determine if we have enough data for seasonality
+    has_enough_data = len(series) >= MIN_DATA_FOR_SEASONAL.get(granularity, 10)
+    seasonal = has_enough_data and granularity != "yearly"
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+
+        model = auto_arima(
+            series,
+            seasonal=seasonal,
+            m=seasonal_m if seasonal else 1,
+            stepwise=True,
+            suppress_warnings=True,
+            error_action="ignore",
+            max_p=5,
+            max_q=5,
+            max_d=2,
+            max_P=2 if seasonal else 0,
+            max_Q=2 if seasonal else 0,
+            max_D=1 if seasonal else 0,
+            start_p=1,
+            start_q=1,
+            information_criterion='aic',
+        )
+
+        order = model.order
+        seasonal_order = model.seasonal_order if seasonal else (0, 0, 0, 0)
+
+        logger.info(f"[arima_agent] ARIMA order: {order}, seasonal: {seasonal_order}")
+
+        # Check for poor model (random walk)
+        if order[0] == 0 and order[2] == 0:
+            logger.warning("[arima_agent] Random walk detected, forcing ETS fallback")
+            raise ValueError("Poor ARIMA model")
+
+        sarimax = SARIMAX(
+            series,
+            order=order,
+            seasonal_order=seasonal_order,
+            enforce_stationarity=False,
+            enforce_invertibility=False,
+        )
+        return sarimax.fit(disp=False, maxiter=200)
+
+
+def fit_ets(series: pd.Series, granularity: str) -> Any:
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+    _, seasonal_m = _settings(granularity)
+    use_seasonal = (
+        granularity in ["daily", "monthly"] and
+        len(series) >= 2 * seasonal_m
+    )
+
+    # Try additive first
+    try:
+        return ExponentialSmoothing(
+            series,
+            trend="add",
+            seasonal="add" if use_seasonal else None,
+            seasonal_periods=seasonal_m if use_seasonal else None,
+            damped_trend=True,
+        ).fit(optimized=True)
+    except Exception:
+        # Fallback to multiplicative
+        logger.info("[arima_agent] Trying multiplicative ETS")
+        return ExponentialSmoothing(
+            series + 1,  # Avoid zeros
+            trend="mul",
+            seasonal="mul" if use_seasonal else None,
+            seasonal_periods=seasonal_m if use_seasonal else None,
+            damped_trend=True,
+        ).fit(optimized=True)
+
+
+_FITTERS = {
+    "prophet": fit_prophet,
+    "arima": fit_arima,
+    "ets": fit_ets,
+}
+
+
+def fit_candidate(name: str, series: pd.Series, granularity: str) -> Any:
+    """Fit candidate ``name``; raises if the model cannot be fitted."""
+    return _FITTERS[name](series, granularity)
+
+
+def fit_candidate_within(name: str, series: pd.Series, granularity: str, timeout: Optional[float]) -> Any:
+    """
+    ``fit_candidate`` in a child process that is killed after ``timeout``
+    seconds (raising ``SubprocessTimeout``); in-process when ``timeout`` is None.
+    """
+    if timeout is None:
+        return fit_candidate(name, series, granularity)
+    if timeout <= 0:
+        raise SubprocessTimeout("No time left")
+    return run_in_subprocess(fit_candidate, name, series, granularity, timeout=timeout)
+
+
+def candidate_time_limit() -> Optional[float]:
+    """Seconds one candidate may take: the tighter of the per-candidate timeout and the forecast budget."""
+    limits = [t for t in (config.forecast_candidate_timeout, config.forecast_time_budget) if t > 0]
+    return min(limits) if limits else None
+
+
+def predict_candidate(name: str, fitted: Any, total_steps: int, granularity: str) -> List[float]:
+    """Return ``total_steps`` raw predictions following the end of the series."""
+    if name == "prophet":
+        freq, _ = _settings(granularity)
+        future = fitted.make_future_dataframe(periods=total_steps, freq=freq)
+        forecast_df = fitted.predict(future)
+        return [float(v) for v in forecast_df['yhat'].tail(total_steps).values]
+
+    if name == "arima":
+        preds = fitted.get_forecast(steps=total_steps).predicted_mean
+    else:  # ets
+        preds = fitted.forecast(total_steps)
+    return [float(v) for v in np.asarray(preds)]
+
+
+def trend_forecast(series: pd.Series, granularity: str, start_offset: int, total_steps: int) -> List[float]:
+    """Linear trend plus recent seasonal profile; used when every model fails."""
+    from scipy.stats import linregress
+
+    _, seasonal_m = _settings(granularity)
+
+    # Use recent trend
+    window = min(90 if granularity == "daily" else 12, len(series) // 2)
+    recent = series.tail(window)
+
+    # Calculate trend using linear regression
+    x = np.arange(len(recent))
+    slope, intercept, _, _, _ = linregress(x, recent.values)
+
+    # Project forward
+    last_value = float(series.iloc[-1])
+    base_trend = [last_value + slope * i for i in range(1, total_steps + 1)]
+
+    # Add seasonal component if available
+    if len(series) >= seasonal_m * 2:
+        # Extract seasonal pattern from last periods
+        seasonal_pattern = []
+        for i in range(seasonal_m):
+            period_values = series.iloc[i::seasonal_m].tail(3)  # Last 3 cycles
+            seasonal_pattern.append(period_values.mean() - series.mean())
+
+        return [
+            max(0, base_trend[i] + seasonal_pattern[i % len(seasonal_pattern)])
+            for i in range(start_offset, total_steps)
+        ]
+
+    # Just use trend with small noise
+    std = float(series.std())
+    return [
+        max(0, base_trend[i] + np.random.normal(0, std * 0.05))
+        for i in range(start_offset, total_steps)
+    ]
+
+
+def fallback_chain(model_name: str) -> List[str]:
+    """Candidates the fallback chain went through, in order, ending with ``model_name``."""
+    if model_name in CANDIDATES:
+        return list(CANDIDATES[:CANDIDATES.index(model_name) + 1])
+    return [*CANDIDATES, model_name]
+
+
+def forecast_series(
+    series: pd.Series,
+    granularity: str,
+    start_horizon: int,
+    end_horizon: int,
+    fitted_models: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[float], str, Dict[str, Any], Optional[str]]:
+    """
+    Run the Prophet → ARIMA → ETS → trend fallback chain.
+
+    ``fitted_models`` maps candidate name to a previously fitted model, or to
+    ``None`` when that candidate is known to fail on this series; candidates
+    found there are not refitted. With ``FORECAST_CANDIDATE_TIMEOUT`` set,
+    each fit runs in a killable subprocess limited to that many seconds; with
+    ``FORECAST_TIME_BUDGET``, all fits together share that budget. Returns ``(values, model_name,
+    fitted_models, fallback_reason)`` where the mapping includes any new fits
+    and ``fallback_reason`` names the candidates a time limit ruled out.
+    """
+    fitted_models = dict(fitted_models or {})
+    deadline = time.monotonic() + config.forecast_time_budget if config.forecast_time_budget > 0 else None
+    timed_out: List[str] = []
+
+    forecast_length = end_horizon - start_horizon + 1
+    start_offset = start_horizon - 1
+    total_steps = start_offset + forecast_length
+
+    logger.info(f"[arima_agent] Forecasting {forecast_length} {granularity} periods, "
+                f"offset={start_offset}, total_steps={total_steps}")
+
+    for name in CANDIDATES:
+        if name in fitted_models:
+            fitted = fitted_models[name]
+            if fitted is None:
+                logger.info(f"[arima_agent] Skipping {name}: failed on this series before")
+                continue
+            logger.info(f"[arima_agent] Reusing cached {name} fit")
+        else:
+            timeout = config.forecast_candidate_timeout if config.forecast_candidate_timeout > 0 else None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                timeout = remaining if timeout is None else min(timeout, remaining)
+            logger.info(f"[arima_agent] Fitting {name}...")
+            try:
+                fitted = fit_candidate_within(name, series, granularity, timeout)
+            except SubprocessTimeout:
+                # Not cached as a failure: the series may fit in time when the host is quieter
+                if timeout > 0:
+                    logger.warning(f"[arima_agent] {name} exceeded {timeout:.1f}s, moving on")
+                    timed_out.append(f"{name} timed out after {round(timeout, 1):g}s")
+                else:
+                    logger.warning(f"[arima_agent] Skipping {name}: forecast time budget spent")
+                    timed_out.append(f"{name} skipped, {config.forecast_time_budget:g}s forecast budget spent")
+                continue
+            except Exception as e:
+                logger.warning(f"[arima_agent] {name} failed: {str(e)}")
+                fitted_models[name] = None
+                continue
+            fitted_models[name] = fitted
+
+        try:
+            all_preds = predict_candidate(name, fitted, total_steps, granularity)
+        except Exception as e:
+            logger.warning(f"[arima_agent] {name} prediction failed: {str(e)}")
+            continue
+
+        forecast_values = [max(0, v) for v in all_preds[start_offset:total_steps]]
+        forecast_mean = np.mean(forecast_values)
+        forecast_std = np.std(forecast_values)
+
+        logger.info(f"[arima_agent] {name} succeeded: {len(forecast_values)} values, "
+                    f"mean={forecast_mean:.2f}, std={forecast_std:.2f}")
+
+        # Prophet occasionally collapses to a flat line; let the fallbacks try
+        if name == "prophet" and forecast_std < 0.01 * abs(forecast_mean) and forecast_mean > 0:
+            logger.warning("[arima_agent] Prophet produced near-constant forecast, will try fallback")
+            continue
+
+        return forecast_values, name, fitted_models, "; ".join(timed_out) or None
+
+    logger.warning("[arima_agent] All models failed, using trend-based fallback")
+    forecast_values = trend_forecast(series, granularity, start_offset, total_steps)
+    logger.info(f"[arima_agent] Trend-based forecast: mean={np.mean(forecast_values):.2f}")
+
+    return forecast_values, "trend", fitted_models, "; ".join(timed_out) or None
+
+
+def holdout_size(series: pd.Series, granularity: str) -> int:
+    """
+    Periods to hold out for scoring, or 0 when the series is too short to
+    spare them (the model still needs four holdouts' worth of training data).
+    """
+    holdout = min(HOLDOUT_PERIODS.get(granularity, HOLDOUT_PERIODS["daily"]), len(series) // 5)
+    return holdout if holdout >= 1 else 0
+
+
+def evaluate_candidate(
+    name: str,
+    series: pd.Series,
+    granularity: str,
+    holdout: int,
+    total_steps: int,
+    fitted: Any = None,
+    timeout: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Score ``name`` by its mean absolute error over the last ``holdout``
+    periods when fitted on the rest, then fit it on the whole series (unless
+    ``fitted`` is given) and predict ``total_steps`` periods. Runs in a
+    forecast pool worker; raises if either fit fails and
+    ``SubprocessTimeout`` if both together take over ``timeout`` seconds.
+    """
+    began = time.perf_counter()
+
+    def remaining() -> Optional[float]:
+        return None if timeout is None else timeout - (time.perf_counter() - began)
+
+    trial = fit_candidate_within(name, series.iloc[:-holdout], granularity, remaining())
+    trial_preds = predict_candidate(name, trial, holdout, granularity)
+    mae = float(np.mean(np.abs(np.asarray(trial_preds[:holdout]) - series.iloc[-holdout:].to_numpy())))
+
+    if fitted is None:
+        fitted = fit_candidate_within(name, series, granularity, remaining())
+    predictions = predict_candidate(name, fitted, total_steps, granularity)
+
+    return {
+        "model": name,
+        "mae": mae,
+        "fitted": fitted,
+        "predictions": predictions,
+        "seconds": time.perf_counter() - began,
+    }
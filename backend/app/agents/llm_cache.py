@@ -0,0 +1,131 @@
+"""
+Persistent cache of LLM answers for the forecast graph's prompts.
+
+Analysts ask the same questions many times a day, and ``report_agent``
+sends the same totals whenever the forecast itself came from the model
+cache. Answers are stored in a local SQLite file keyed by model name, the
+prompt with case and whitespace normalized, and any date context the
+caller passes (``today``/``last_date`` for parameter extraction), so a
+repeated question skips the network. Entries expire after
+``LLM_CACHE_TTL`` seconds and the least recently used are evicted beyond
+``LLM_CACHE_SIZE``; an empty ``LLM_CACHE_PATH`` disables the cache.
+"""
+
+from pathlib import Path
+from threading import Lock
+from typing import Any, Optional
+import hashlib
+import logging
+import re
+import sqlite3
+import time
+
+from .. import metrics
+from ..configs import config
+
+logger = logging.getLogger("forecast_workflow")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+
+
+def normalize_prompt(prompt: Any) -> str:
+    return re.sub(r"\s+", " ", str(prompt)).strip().lower()
+
+
+class LLMCache:
+    def __init__(self, path: str, ttl: float = 86400, maxsize: int = 10000):
+        self.path = path
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path) and self.maxsize > 0
+
+    @staticmethod
+    def make_key(model: str, prompt: Any, *context: Any) -> str:
+        parts = [model, normalize_prompt(prompt), *(str(c) for c in context)]
+        return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened on first use so importing the graph never touches the disk
+        if self._conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_used ON llm_cache (last_used)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None and self.ttl > 0 and row[1] < now - self.ttl:
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    row = None
+                if row is not None:
+                    conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            # A broken cache must not fail the forecast; ask the LLM instead
+            logger.warning(f"[llm_cache] Lookup failed: {e}")
+            row = None
+        metrics.forecast_llm_cache_requests.inc("hit" if row is not None else "miss")
+        return row[0] if row is not None else None
+
+    def put(self, key: str, model: str, response: str) -> None:
+        if not self.enabled:
+            return
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                    (key, model, response, now, now),
+                )
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.maxsize,),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"[llm_cache] Store failed: {e}")
+
+    def __len__(self) -> int:
+        if not self.enabled:
+            return 0
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def clear(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._connection().execute("DELETE FROM llm_cache")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+llm_cache = LLMCache(config.llm_cache_path, ttl=config.llm_cache_ttl, maxsize=config.llm_cache_size)
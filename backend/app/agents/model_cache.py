@@ -0,0 +1,119 @@
+"""
+In-process LRU cache of fitted forecasting models.
+
+Entries are keyed by product, granularity, history window and a data
+fingerprint, so a repeated question about unchanged sales data only pays for
+the ``predict`` step. New rows change the fingerprint on their own; updates
+and deletes of ``sales_data`` also call ``invalidate`` for the product.
+"""
+
+from collections import OrderedDict
+from datetime import date
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import extract, func
+
+from ..configs import config
+from ..models import SalesData
+
+
+class FittedModelCache:
+    def __init__(self, maxsize: int = 32):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(
+        product_id: int,
+        granularity: str,
+        history_start: Optional[date],
+        history_end: Optional[date],
+        data_version: Hashable,
+    ) -> Tuple:
+        return (product_id, granularity, history_start, history_end, data_version)
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry)
+
+    def put(self, key: Tuple, fitted_models: Dict[str, Any]) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = dict(fitted_models)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, product_id: int) -> None:
+        """Drop every entry for ``product_id``."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == product_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def _day_ordinal(year_offset: int = 0):
+    # Distinct and increasing per date; portable, unlike each dialect's date-to-number
+    return (
+        (extract("year", SalesData.sales_date) - year_offset) * 372
+        + extract("month", SalesData.sales_date) * 31
+        + extract("day", SalesData.sales_date)
+    )
+
+
+def data_version_columns() -> Tuple:
+    """
+    Aggregates fingerprinting a product's sales rows: row count, newest
+    ``created_at``, quantity total, a date checksum and the quantities
+    weighted by their date, so inserts, deletes, edits of a quantity or a
+    date, and quantities swapped between dates all change it.
+    """
+    return (
+        func.count(SalesData.order_id),
+        func.max(SalesData.created_at),
+        func.sum(SalesData.sales_quantity),
+        func.sum(_day_ordinal()),
+        # Offset keeps the weights, and so the float sum, small for recent dates
+        func.sum(SalesData.sales_quantity * _day_ordinal(year_offset=2000)),
+    )
+
+
+def make_data_version(row_count, max_created_at, quantity_total, date_checksum, weighted_total) -> Tuple:
+    """Normalize a ``data_version_columns`` row; drivers differ on Decimal vs float."""
+    return (
+        row_count,
+        max_created_at,
+        round(float(quantity_total), 6) if quantity_total is not None else None,
+        int(date_checksum) if date_checksum is not None else None,
+        round(float(weighted_total), 6) if weighted_total is not None else None,
+    )
+
+
+fitted_model_cache = FittedModelCache(maxsize=config.model_cache_size)
@@ -0,0 +1,67 @@
+"""
+Deterministic forecast summary used instead of the LLM report.
+
+Covers what the LLM prompt is given (period range, total, average) plus
+the peak and trough periods and the change against the trailing history,
+so batch and API consumers get a usable report without waiting on Groq.
+"""
+
+from typing import Dict, Optional
+
+import pandas as pd
+
+PERIOD_LABELS = {"daily": "day", "monthly": "month", "yearly": "year"}
+
+# Fewest history periods the forecast is compared against
+MIN_TRAILING_PERIODS = {"daily": 7, "monthly": 3, "yearly": 1}
+
+
+def _trailing_comparison(level: float, history: Optional[pd.Series], periods: int, granularity: str, label: str) -> str:
+    if history is None or history.empty:
+        return ""
+    window = min(len(history), max(periods, MIN_TRAILING_PERIODS.get(granularity, 1)))
+    baseline = float(history.iloc[-window:].mean())
+    if baseline <= 0:
+        return ""
+    change = (level - baseline) / baseline * 100
+    plural = label if window == 1 else f"{label}s"
+    return (
+        f" That is {change:+.1f}% against the average of the last {window} {plural} "
+        f"of history ({baseline:,.1f} units per {label})."
+    )
+
+
+def template_report(
+    forecast: Dict[str, float],
+    granularity: str = "daily",
+    history: Optional[pd.Series] = None,
+    single_period: bool = False,
+) -> str:
+    """
+    Two or three sentences on ``forecast`` (period label to units).
+    ``history`` holds the observed quantities at the same granularity.
+    """
+    if not forecast:
+        return "No forecast available."
+
+    label = PERIOD_LABELS.get(granularity, "period")
+    periods = list(forecast)
+    values = list(forecast.values())
+
+    if single_period or len(values) == 1:
+        return (
+            f"Forecast for {periods[0]}: {values[0]:,.1f} units."
+            + _trailing_comparison(values[0], history, 1, granularity, label)
+        )
+
+    total = sum(values)
+    average = total / len(values)
+    peak = max(range(len(values)), key=values.__getitem__)
+    trough = min(range(len(values)), key=values.__getitem__)
+    return (
+        f"Forecast for {periods[0]} to {periods[-1]} ({len(values)} {label}s): "
+        f"{total:,.1f} units in total, {average:,.1f} per {label} on average. "
+        f"The peak {label} is {periods[peak]} with {values[peak]:,.1f} units and the "
+        f"lowest is {periods[trough]} with {values[trough]:,.1f} units."
+        + _trailing_comparison(average, history, len(values), granularity, label)
+    )
@@ -1,7 +1,9 @@
-from typing import TypedDict, Optional, Literal, Dict
+from typing import TypedDict, Optional, Literal, Dict, List, Tuple, Any, Annotated
 from datetime import date
 import pandas as pd
 
+from .telemetry import merge_diagnostics
+
 
 class ForecastState(TypedDict, total=False):
     product_id: int
@@ -14,8 +16,17 @@ class ForecastState(TypedDict, total=False):
     granularity: Literal["daily", "monthly", "yearly"]
     time_series: pd.DataFrame
     forecast: Dict[str, float]
+    forecast_model: str  # prophet, arima, ets or trend
+    model_selection: Literal["fallback", "tournament"]
+    model_candidates: List[Dict[str, Any]]  # tournament mode: status, seconds and holdout MAE per model
+    fallback_reason: Optional[str]  # set when a fit timeout or the time budget ruled a model out
     report: str
+    report_mode: Literal["llm", "template"]
+    report_source: str  # 'llm' or 'template'
+    # Per node: wall/CPU seconds, rows, LLM tokens and model choice (see telemetry.py)
+    diagnostics: Annotated[Dict[str, Dict[str, Any]], merge_diagnostics]
     history_start: Optional[date]
     history_end: Optional[date]
     last_date: Optional[date]
+    data_version: Optional[Tuple[Any, ...]]  # model_cache.make_data_version of the product's rows
     _target_year: Optional[int]  # For monthly/yearly forecasts
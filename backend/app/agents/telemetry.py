@@ -0,0 +1,119 @@
+"""
+Per-node telemetry for the forecast graph.
+
+``instrument`` wraps a node so its state update carries a ``diagnostics``
+entry for that node: wall and CPU seconds, rows of the series it returned,
+LLM token usage (``record_llm_usage``) and whatever the node added with
+``note``. The same numbers feed the ``/metrics`` histograms.
+
+CPU time is that of the thread running the node; model fits run in
+subprocesses, so for ``arima_agent`` the wall time is the useful figure.
+"""
+
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import functools
+import time
+
+from .. import metrics
+
+_current: ContextVar[Optional[Dict[str, Any]]] = ContextVar("forecast_node_diagnostics", default=None)
+
+
+def merge_diagnostics(left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """State reducer: nodes that run in parallel each add their own entry."""
+    return {**(left or {}), **(right or {})}
+
+
+def note(**fields: Any) -> None:
+    """Add fields to the running node's diagnostics; a no-op outside an instrumented node."""
+    entry = _current.get()
+    if entry is not None:
+        entry.update(fields)
+
+
+def _token_usage(response: Any) -> Dict[str, int]:
+    # langchain_core messages carry usage_metadata; older providers only response_metadata
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        return {"input_tokens": usage.get("input_tokens", 0), "output_tokens": usage.get("output_tokens", 0)}
+    usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+    return {"input_tokens": usage.get("prompt_tokens", 0), "output_tokens": usage.get("completion_tokens", 0)}
+
+
+def record_llm_usage(response: Any, cached: bool = False) -> None:
+    """Count one LLM call and its tokens, or one cache hit, against the running node."""
+    entry = _current.get()
+    if entry is None:
+        return
+    llm = entry.setdefault("llm", {"calls": 0, "cache_hits": 0, "input_tokens": 0, "output_tokens": 0})
+    if cached:
+        llm["cache_hits"] += 1
+        return
+    llm["calls"] += 1
+    for key, tokens in _token_usage(response).items():
+        llm[key] += int(tokens or 0)
+
+
+def _finish(node: str, entry: Dict[str, Any], update: Any, began: float, began_cpu: float) -> Any:
+    entry["wall_seconds"] = round(time.perf_counter() - began, 4)
+    entry["cpu_seconds"] = round(time.thread_time() - began_cpu, 4)
+
+    update = dict(update or {})
+    ts = update.get("time_series")
+    if ts is not None:
+        entry["rows"] = len(ts)
+
+    metrics.forecast_node_seconds.observe(entry["wall_seconds"], node)
+    metrics.forecast_node_cpu_seconds.observe(entry["cpu_seconds"], node)
+    if "rows" in entry:
+        metrics.forecast_node_rows.observe(entry["rows"], node)
+    if "llm" in entry:
+        metrics.forecast_llm_tokens.observe(entry["llm"]["input_tokens"], node, "input")
+        metrics.forecast_llm_tokens.observe(entry["llm"]["output_tokens"], node, "output")
+    if "model" in entry:
+        metrics.forecast_model_selected.inc(entry["model"], entry.get("selection", "fallback"))
+    if entry.get("fallback_reason"):
+        metrics.forecast_fallbacks.inc()
+
+    # A copy: an LLM call that outlived the node may still count against ``entry``
+    snapshot = {**entry, "llm": dict(entry["llm"])} if "llm" in entry else dict(entry)
+    update["diagnostics"] = {node: snapshot}
+    return update
+
+
+def instrument(node: str, fn: Callable) -> Callable:
+    """Wrap a sync or async graph node to time it and attach its diagnostics."""
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(state):
+            entry: Dict[str, Any] = {}
+            token = _current.set(entry)
+            began, began_cpu = time.perf_counter(), time.thread_time()
+            try:
+                update = await fn(state)
+            except Exception:
+                metrics.forecast_node_errors.inc(node)
+                raise
+            finally:
+                _current.reset(token)
+            return _finish(node, entry, update, began, began_cpu)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(state):
+        entry: Dict[str, Any] = {}
+        token = _current.set(entry)
+        began, began_cpu = time.perf_counter(), time.thread_time()
+        try:
+            update = fn(state)
+        except Exception:
+            metrics.forecast_node_errors.inc(node)
+            raise
+        finally:
+            _current.reset(token)
+        return _finish(node, entry, update, began, began_cpu)
+
+    return wrapper
@@ -1,26 +1,97 @@
-from typing import Any
+from threading import Lock
+from typing import Any, Optional, Tuple
 from ..configs import config
 
+
+class StubLLM:
+    """Stands in for the chat model when GROQ_API_KEY is not set."""
+
+    def invoke(self, prompt: Any) -> Any:
+        return "Stub summary: forecast generated. (GROQ_API_KEY not set)"
+
+    async def ainvoke(self, prompt: Any) -> Any:
+        return self.invoke(prompt)
+
+
+def build_llm(http_client: Any = None, http_async_client: Any = None) -> Any:
+    """
+    A ChatGroq for the configured model. Without HTTP clients it opens its
+    own connections, as every call did before ``get_llm`` shared one.
+    """
+    from langchain_groq import ChatGroq
+
+    return ChatGroq(
+        api_key=config.groq_api_key,
+        model=config.groq_model,
+        temperature=0.2,
+        base_url=config.groq_base_url,
+        timeout=config.llm_timeout,
+        # The Groq SDK retries 429s and 5xx with exponential backoff, honouring Retry-After
+        max_retries=config.llm_max_retries,
+        http_client=http_client,
+        http_async_client=http_async_client,
+    )
+
+
+def _http_clients() -> Tuple[Any, Any]:
+    import httpx
+
+    # max_connections caps concurrent requests per client; callers beyond it wait for a connection
+    limits = httpx.Limits(
+        max_connections=config.llm_max_connections,
+        max_keepalive_connections=config.llm_max_connections,
+        keepalive_expiry=config.llm_keepalive_expiry,
+    )
+    timeout = httpx.Timeout(config.llm_timeout, pool=None)
+    return httpx.Client(limits=limits, timeout=timeout), httpx.AsyncClient(limits=limits, timeout=timeout)
+
+
+class _SharedLLM:
+    """The process-wide ChatGroq, rebuilt when the Groq settings change."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._settings: Optional[Tuple] = None
+        self._llm: Any = None
+        self._clients: Tuple[Any, ...] = ()
+
+    def get(self) -> Any:
+        settings = (config.groq_api_key, config.groq_model, config.groq_base_url)
+        with self._lock:
+            if self._settings != settings:
+                self._close()
+                http_client, http_async_client = _http_clients()
+                self._llm = build_llm(http_client, http_async_client)
+                self._clients = (http_client, http_async_client)
+                self._settings = settings
+            return self._llm
+
+    def _close(self) -> None:
+        for client in self._clients:
+            # The async client's connections belong to the serving event loop,
+            # which is gone or going at shutdown; dropping them is enough
+            if hasattr(client, "close"):
+                client.close()
+        self._llm, self._clients, self._settings = None, (), None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+shared_llm = _SharedLLM()
+
+
 def get_llm() -> Any:
     """
-    Return a LangChain ChatGroq LLM if GROQ_API_KEY is available,
+    Return the shared LangChain ChatGroq LLM if GROQ_API_KEY is available,
     otherwise fall back to a very simple stub LLM for local testing.
     """
-    groq_api_key = config.groq_api_key
-    if groq_api_key:
+    if config.groq_api_key:
         try:
-            from langchain_groq import ChatGroq
-
-            model = config.groq_model
-            return ChatGroq(api_key=groq_api_key, model=model, temperature=0.2)
+            return shared_llm.get()
         except Exception:
             # Fall through to stub
             pass
 
-    class StubLLM:
-        def invoke(self, prompt: Any) -> Any:
-            return "Stub summary: forecast generated. (GROQ_API_KEY not set)"
-
     return StubLLM()
-
-
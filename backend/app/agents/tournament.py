@@ -0,0 +1,199 @@
+"""
+Tournament model selection for ``arima_agent``.
+
+Instead of the Prophet -> ARIMA -> ETS fallback chain, every candidate is
+fitted at once in ``forecast_pool`` and scored on a holdout window; the
+lowest mean absolute error wins. Latency is bounded by the slowest
+candidate rather than the sum of all fits. Each candidate gets
+``forecasters.candidate_time_limit()`` from when a pool worker starts it,
+after which its fitting subprocess is killed; time spent queued for a
+worker does not count. Holdout scores are kept next to the fitted models in
+``fitted_model_cache`` so repeat requests skip the tournament entirely.
+"""
+
+from concurrent.futures import Future, wait
+from typing import Any, Dict, List, Optional, Tuple, Union
+import asyncio
+import logging
+import time
+
+import pandas as pd
+
+from . import forecasters
+from .executor import SubprocessTimeout, forecast_pool
+
+logger = logging.getLogger("forecast_workflow")
+
+# Key of the {candidate: holdout MAE} mapping stored with the fitted models
+SCORES_KEY = "_holdout_mae"
+
+TournamentResult = Tuple[List[float], str, Dict[str, Any], List[Dict[str, Any]], Optional[str]]
+
+
+class Tournament:
+    """Bookkeeping shared by the sync and async runners."""
+
+    def __init__(
+        self,
+        series: pd.Series,
+        granularity: str,
+        start_horizon: int,
+        end_horizon: int,
+        fitted_models: Optional[Dict[str, Any]] = None,
+    ):
+        self.series = series
+        self.granularity = granularity
+        self.start_offset = start_horizon - 1
+        self.total_steps = self.start_offset + (end_horizon - start_horizon + 1)
+        self.holdout = forecasters.holdout_size(series, granularity)
+        self.fitted_models = dict(fitted_models or {})
+        self.scores: Dict[str, float] = dict(self.fitted_models.get(SCORES_KEY) or {})
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.predictions: Dict[str, List[float]] = {}
+        self.pending: List[str] = []
+        self.time_limit = forecasters.candidate_time_limit()
+        self.began = time.perf_counter()
+
+        for name in forecasters.CANDIDATES:
+            if name in self.fitted_models and self.fitted_models[name] is None:
+                self._result(name, "failed")
+            elif name in self.fitted_models and name in self.scores:
+                self._result(name, "cached", mae=self.scores[name])
+            else:
+                self.pending.append(name)
+
+    def _result(self, name: str, status: str, seconds: Optional[float] = None, mae: Optional[float] = None) -> None:
+        self.results[name] = {
+            "model": name,
+            "status": status,
+            "seconds": None if seconds is None else round(seconds, 3),
+            "holdout_mae": None if mae is None else round(mae, 4),
+        }
+
+    def submit_all(self) -> Dict[Future, str]:
+        futures: Dict[Future, str] = {}
+        try:
+            for name in self.pending:
+                logger.info(f"[arima_agent] Tournament: fitting {name} (holdout={self.holdout})")
+                future = forecast_pool.submit(
+                    forecasters.evaluate_candidate,
+                    name,
+                    self.series,
+                    self.granularity,
+                    self.holdout,
+                    self.total_steps,
+                    self.fitted_models.get(name),
+                    self.time_limit,
+                )
+                futures[future] = name
+        except Exception:
+            # Pool saturated part-way: do not leave half a tournament queued
+            for future in futures:
+                future.cancel()
+            raise
+        return futures
+
+    def record(self, name: str, future: Union[Future, asyncio.Future]) -> None:
+        try:
+            outcome = future.result()
+        except SubprocessTimeout:
+            self.timed_out(name)
+            return
+        except Exception as e:
+            logger.warning(f"[arima_agent] Tournament: {name} failed: {str(e)}")
+            self.fitted_models[name] = None
+            self._result(name, "failed", seconds=time.perf_counter() - self.began)
+            return
+        self.fitted_models[name] = outcome["fitted"]
+        self.scores[name] = outcome["mae"]
+        self.predictions[name] = outcome["predictions"]
+        self._result(name, "ok", seconds=outcome["seconds"], mae=outcome["mae"])
+
+    def timed_out(self, name: str) -> None:
+        # Not cached as a failure: it may well fit in time on a quieter pool
+        logger.warning(f"[arima_agent] Tournament: {name} exceeded {self.time_limit:g}s")
+        self._result(name, "timeout", seconds=time.perf_counter() - self.began)
+
+    def winner(self) -> Optional[str]:
+        scored = [name for name, result in self.results.items() if result["status"] in ("ok", "cached")]
+        return min(scored, key=lambda name: self.scores[name]) if scored else None
+
+    def finish(self, name: Optional[str], predictions: Optional[List[float]]) -> TournamentResult:
+        self.fitted_models[SCORES_KEY] = self.scores
+        results = [self.results[candidate] for candidate in forecasters.CANDIDATES if candidate in self.results]
+        timed_out = [result["model"] for result in results if result["status"] == "timeout"]
+        fallback_reason = (
+            f"{', '.join(timed_out)} timed out after {self.time_limit:g}s" if timed_out else None
+        )
+
+        if name is None:
+            logger.warning("[arima_agent] Tournament: no candidate finished, using trend-based fallback")
+            values = forecasters.trend_forecast(self.series, self.granularity, self.start_offset, self.total_steps)
+            return values, "trend", self.fitted_models, results, fallback_reason
+
+        logger.info(
+            f"[arima_agent] Tournament winner: {name} (MAE {self.scores[name]:.2f}) "
+            f"in {time.perf_counter() - self.began:.2f}s"
+        )
+        values = [max(0, v) for v in predictions[self.start_offset:self.total_steps]]
+        return values, name, self.fitted_models, results, fallback_reason
+
+
+def run_tournament(
+    series: pd.Series,
+    granularity: str,
+    start_horizon: int,
+    end_horizon: int,
+    fitted_models: Optional[Dict[str, Any]] = None,
+) -> TournamentResult:
+    """
+    Returns ``(values, model_name, fitted_models, candidates,
+    fallback_reason)``; as from ``forecast_series`` plus ``candidates``, one
+    status/timing/score record per model. Raises ``ForecastPoolSaturated``
+    when the pool is full.
+    """
+    tournament = Tournament(series, granularity, start_horizon, end_horizon, fitted_models)
+    futures = tournament.submit_all()
+    if futures:
+        # No deadline here: a candidate's clock starts in the worker
+        # (``evaluate_candidate``), which raises SubprocessTimeout at its limit
+        wait(futures)
+        for future, name in futures.items():
+            tournament.record(name, future)
+
+    name = tournament.winner()
+    predictions = None
+    if name is not None:
+        predictions = tournament.predictions.get(name)
+        if predictions is None:
+            predictions = forecasters.predict_candidate(
+                name, tournament.fitted_models[name], tournament.total_steps, granularity
+            )
+    return tournament.finish(name, predictions)
+
+
+async def arun_tournament(
+    series: pd.Series,
+    granularity: str,
+    start_horizon: int,
+    end_horizon: int,
+    fitted_models: Optional[Dict[str, Any]] = None,
+) -> TournamentResult:
+    """``run_tournament`` without blocking the event loop."""
+    tournament = Tournament(series, granularity, start_horizon, end_horizon, fitted_models)
+    futures = tournament.submit_all()
+    if futures:
+        wrapped = {asyncio.wrap_future(future): name for future, name in futures.items()}
+        await asyncio.wait(wrapped)
+        for waiter, name in wrapped.items():
+            tournament.record(name, waiter)
+
+    name = tournament.winner()
+    predictions = None
+    if name is not None:
+        predictions = tournament.predictions.get(name)
+        if predictions is None:
+            predictions = await forecast_pool.run(
+                forecasters.predict_candidate, name, tournament.fitted_models[name], tournament.total_steps, granularity
+            )
+    return tournament.finish(name, predictions)
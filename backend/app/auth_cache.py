@@ -0,0 +1,117 @@
+"""
+Short-lived in-process caches for request authorization.
+
+``get_current_org`` and the product ownership checks run on every
+protected request; caching the organization record and product -> org_id
+for ``AUTH_CACHE_TTL`` seconds saves those round-trips on chatty screens.
+Writers of organizations and products call ``invalidate``; the TTL bounds
+staleness across worker processes.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional, Tuple
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from . import models
+from .configs import config
+
+# Organization columns copied into cached snapshots
+ORG_FIELDS = ("org_id", "org_name", "password_hash", "industry_type", "address", "created_at", "updated_at")
+
+
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+org_cache = TTLCache(maxsize=config.auth_cache_size, ttl=config.auth_cache_ttl)
+product_owner_cache = TTLCache(maxsize=config.auth_cache_size, ttl=config.auth_cache_ttl)
+
+
+async def get_org(db: AsyncSession, org_id: int) -> Optional[models.Organization]:
+    """
+    The organization as a detached, transient copy (safe to share between
+    requests), or None if it does not exist.
+    """
+    fields = org_cache.get(org_id)
+    if fields is None:
+        org = await db.scalar(select(models.Organization).where(models.Organization.org_id == org_id))
+        if org is None:
+            return None
+        fields = {name: getattr(org, name) for name in ORG_FIELDS}
+        org_cache.put(org_id, fields)
+    return models.Organization(**fields)
+
+
+def get_product_org_id(db: Session, product_id: int) -> Optional[int]:
+    """org_id owning ``product_id``, or None if the product does not exist."""
+    org_id = product_owner_cache.get(product_id)
+    if org_id is None:
+        org_id = db.query(models.Product.org_id).filter(models.Product.product_id == product_id).scalar()
+        if org_id is None:
+            return None
+        product_owner_cache.put(product_id, org_id)
+    return org_id
+
+
+async def get_product_org_id_async(db: AsyncSession, product_id: int) -> Optional[int]:
+    """``get_product_org_id`` for routes on the async session."""
+    org_id = product_owner_cache.get(product_id)
+    if org_id is None:
+        org_id = await db.scalar(select(models.Product.org_id).where(models.Product.product_id == product_id))
+        if org_id is None:
+            return None
+        product_owner_cache.put(product_id, org_id)
+    return org_id
@@ -9,9 +9,59 @@ class Config:
     database_url: str = os.getenv("DATABASE_URL", "sqlite:///./manufacturing.db")
     groq_api_key: str = os.getenv("GROQ_API_KEY")
     groq_model: str = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+    # e.g. http://127.0.0.1:8099 for benchmarks/fake_llm_server.py; unset means api.groq.com
+    groq_base_url: str = os.getenv("GROQ_BASE_URL") or None
+    # One ChatGroq per process over a keep-alive pool of at most LLM_MAX_CONNECTIONS
+    # concurrent requests; 429s and 5xx are retried up to LLM_MAX_RETRIES times
+    llm_max_connections: int = int(os.getenv("LLM_MAX_CONNECTIONS", 10))
+    llm_keepalive_expiry: float = float(os.getenv("LLM_KEEPALIVE_EXPIRY", 30))
+    llm_max_retries: int = int(os.getenv("LLM_MAX_RETRIES", 3))
+    llm_timeout: float = float(os.getenv("LLM_TIMEOUT", 30))
     secret_key: str = os.getenv("SECRET_KEY", "change-this-secret-key")
     algorithm: str = os.getenv("ALGORITHM", "HS256")
     access_token_expire_minutes: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60 * 24))
+    model_cache_size: int = int(os.getenv("MODEL_CACHE_SIZE", 32))
+    forecast_pool_size: int = int(os.getenv("FORECAST_POOL_SIZE", 2))
+    forecast_queue_limit: int = int(os.getenv("FORECAST_QUEUE_LIMIT", 8))
+    forecast_job_workers: int = int(os.getenv("FORECAST_JOB_WORKERS", 2))
+    # A running job whose started_at is older than this is taken to be orphaned by a dead worker
+    forecast_job_lease: float = float(os.getenv("FORECAST_JOB_LEASE", 900))
+    # "fallback": Prophet -> ARIMA -> ETS -> trend in sequence; "tournament": fit
+    # every candidate in the forecast pool and keep the best on a holdout window
+    forecast_selection: str = os.getenv("FORECAST_SELECTION", "fallback")
+    # Each model fit runs in a subprocess killed after FORECAST_CANDIDATE_TIMEOUT seconds,
+    # and all fits of one forecast share FORECAST_TIME_BUDGET; 0 disables either limit
+    forecast_candidate_timeout: float = float(os.getenv("FORECAST_CANDIDATE_TIMEOUT", 120))
+    forecast_time_budget: float = float(os.getenv("FORECAST_TIME_BUDGET", 300))
+    # Compile the forecast graph and import model libraries in the background at startup
+    forecast_warmup: bool = os.getenv("FORECAST_WARMUP", "false").lower() == "true"
+    # "llm": report_agent asks the LLM for the summary, falling back to the template
+    # when it fails or takes longer than REPORT_LLM_TIMEOUT seconds (0 waits);
+    # "template": always the deterministic summary
+    forecast_report_mode: str = os.getenv("FORECAST_REPORT_MODE", "llm")
+    report_llm_timeout: float = float(os.getenv("REPORT_LLM_TIMEOUT", 15))
+    # Answers to repeated prompts, in a local SQLite file; an empty path disables it
+    llm_cache_path: str = os.getenv("LLM_CACHE_PATH", "./llm_cache.db")
+    llm_cache_ttl: float = float(os.getenv("LLM_CACHE_TTL", 24 * 3600))
+    llm_cache_size: int = int(os.getenv("LLM_CACHE_SIZE", 10000))
+    import_chunk_size: int = int(os.getenv("IMPORT_CHUNK_SIZE", 10000))
+    # Sales listings return every row unless a limit is given; a cursor alone pages by this size
+    sales_page_limit: int = int(os.getenv("SALES_PAGE_LIMIT", 500))
+    sales_page_max_limit: int = int(os.getenv("SALES_PAGE_MAX_LIMIT", 5000))
+    auth_cache_ttl: float = float(os.getenv("AUTH_CACHE_TTL", 60))
+    auth_cache_size: int = int(os.getenv("AUTH_CACHE_SIZE", 4096))
+    # Engine profile (see app/db.py): pool settings apply to server databases
+    # and file-based SQLite, the PRAGMAs to SQLite only
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", 10))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", 20))
+    db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    db_statement_cache_size: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 500))
+    sqlite_journal_mode: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    sqlite_synchronous: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    sqlite_busy_timeout_ms: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    sqlite_mmap_size: int = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+    sqlite_cache_size_kib: int = int(os.getenv("SQLITE_CACHE_SIZE_KIB", 64 * 1024))
     allowed_origins: list[str] = dataclasses.field(
         default_factory=lambda: os.getenv(
             "ALLOWED_ORIGINS",
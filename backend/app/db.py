@@ -1,12 +1,107 @@
+from functools import lru_cache
+from typing import Any, Optional
+import logging
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
 
-from .configs import config
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from starlette.concurrency import run_in_threadpool
 
-engine = create_engine(
-    config.database_url, connect_args={"check_same_thread": False} if config.database_url.startswith("sqlite") else {}
-)
+from .configs import config, Config
+
+logger = logging.getLogger("database")
+
+
+def engine_options(database_url: str, settings: Config = config) -> dict:
+    """
+    ``create_engine`` keyword arguments for the configured profile: pool
+    sizing for server databases and file-based SQLite, plus the compiled
+    statement cache size.
+    """
+    url = make_url(database_url)
+    options = {"query_cache_size": settings.db_statement_cache_size}
+
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            # In-memory databases live in one connection; keep SQLAlchemy's default pool
+            return options
+    elif url.get_driver_name() == "psycopg":
+        # Server-side prepared statements after the 5th execution of a query
+        options["connect_args"] = {"prepare_threshold": 5}
+    elif url.get_driver_name() == "asyncpg":
+        # asyncpg prepares every statement; keep that many per connection
+        options["connect_args"] = {"statement_cache_size": settings.db_statement_cache_size}
+
+    options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+    return options
+
+
+def sqlite_pragmas(settings: Config = config) -> dict:
+    return {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "mmap_size": settings.sqlite_mmap_size,
+        # Negative cache_size is in KiB rather than pages
+        "cache_size": -settings.sqlite_cache_size_kib,
+    }
+
+
+def make_engine(database_url: str, settings: Config = config, tuned: bool = True) -> Engine:
+    """Create an engine; ``tuned=False`` gives the plain defaults (used by the benchmark)."""
+    if not tuned:
+        connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+        return create_engine(database_url, connect_args=connect_args)
+
+    new_engine = create_engine(database_url, **engine_options(database_url, settings))
+    _install_sqlite_pragmas(new_engine, settings)
+    return new_engine
+
+
+def _install_sqlite_pragmas(new_engine: Engine, settings: Config) -> None:
+    if new_engine.dialect.name != "sqlite":
+        return
+    pragmas = sqlite_pragmas(settings)
+
+    @event.listens_for(new_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+# Async drivers for the synchronous URLs used elsewhere in the app
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def async_database_url(database_url: str) -> URL:
+    """``database_url`` with its driver swapped for the asyncio one (aiosqlite / asyncpg)."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r} databases")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def make_async_engine(database_url: str, settings: Config = config) -> AsyncEngine:
+    """The async counterpart of ``make_engine``, sharing its profile and PRAGMAs."""
+    url = async_database_url(database_url)
+    options = engine_options(url.render_as_string(hide_password=False), settings)
+    new_engine = create_async_engine(url, **options)
+    _install_sqlite_pragmas(new_engine.sync_engine, settings)
+    return new_engine
+
+
+engine = make_engine(config.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -22,3 +117,64 @@ def get_db():
         db.close()
 
 
+@lru_cache(maxsize=None)
+def async_session_factory(database_url: str) -> Optional[async_sessionmaker]:
+    """
+    Sessionmaker on the async engine for ``database_url``, built on first
+    use so importing the app never needs an async driver. None when the
+    backend has none (see ``ASYNC_DRIVERS``) or it is not installed.
+    """
+    try:
+        async_engine = make_async_engine(database_url, config)
+    except (ValueError, ImportError) as e:
+        logger.warning(f"[database] Async sessions unavailable, using the threadpool: {e}")
+        return None
+    return async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+class ThreadpoolSession:
+    """
+    The ``AsyncSession`` calls the async routes make, run on a sync
+    ``Session`` in the threadpool. Results are buffered before returning.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    @property
+    def bind(self) -> Engine:
+        return self.session.get_bind()
+
+    def get_bind(self, *args: Any, **kwargs: Any) -> Engine:
+        return self.session.get_bind(*args, **kwargs)
+
+    async def execute(self, statement: Any, *args: Any, **kwargs: Any):
+        return await run_in_threadpool(lambda: self.session.execute(statement, *args, **kwargs).freeze()())
+
+    async def scalars(self, statement: Any, *args: Any, **kwargs: Any):
+        return (await self.execute(statement, *args, **kwargs)).scalars()
+
+    async def scalar(self, statement: Any, *args: Any, **kwargs: Any):
+        return await run_in_threadpool(self.session.scalar, statement, *args, **kwargs)
+
+    async def get(self, entity: Any, ident: Any, **kwargs: Any):
+        return await run_in_threadpool(self.session.get, entity, ident, **kwargs)
+
+
+async def get_async_db():
+    """
+    Session for read-heavy routes declared ``async def``: queries are awaited
+    on the event loop instead of occupying a threadpool worker each. Without
+    an async driver the sync session serves them from the threadpool.
+    """
+    factory = async_session_factory(config.database_url)
+    if factory is None:
+        db = SessionLocal()
+        try:
+            yield ThreadpoolSession(db)
+        finally:
+            db.close()
+        return
+
+    async with factory() as db:
+        yield db
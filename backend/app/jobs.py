@@ -0,0 +1,161 @@
+"""
+Background forecast jobs.
+
+Jobs are rows in the ``forecast_job`` table and run on a small local thread
+pool, which also caps how many forecasts fit at once. Because the queue
+lives in the database, ``resume_pending`` can pick jobs up again after a
+restart. Several workers may share the table: a job is claimed with a
+conditional UPDATE, so only one of them runs it, and a running job is only
+taken back once its lease (``FORECAST_JOB_LEASE`` seconds from
+``started_at``) has expired.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+import json
+import logging
+import uuid
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from .configs import config
+from .db import SessionLocal
+from . import models
+
+logger = logging.getLogger("forecast_jobs")
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class ForecastJobRunner:
+    """
+    Runs ``handler(job)`` for each queued job; the returned dict is stored as
+    the job's JSON result and any exception as its error.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[models.ForecastJob], dict],
+        max_workers: int,
+        session_factory: Callable[[], Session] = SessionLocal,
+        lease_seconds: Optional[float] = None,
+    ):
+        self.handler = handler
+        self.max_workers = max(1, max_workers)
+        self.session_factory = session_factory
+        self.lease_seconds = config.forecast_job_lease if lease_seconds is None else lease_seconds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="forecast-job"
+                )
+            return self._executor
+
+    def create(
+        self,
+        db: Session,
+        org_id: int,
+        product_id: int,
+        query: str,
+        payload: Optional[Dict[str, Any]] = None,
+    ) -> models.ForecastJob:
+        """``payload`` is the full request, stored as JSON for the handler to replay."""
+        job = models.ForecastJob(
+            job_id=uuid.uuid4().hex,
+            org_id=org_id,
+            product_id=product_id,
+            query=query,
+            payload=json.dumps(payload, default=str) if payload is not None else None,
+            status=QUEUED,
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        self.enqueue(job.job_id)
+        return job
+
+    def enqueue(self, job_id: str) -> Future:
+        return self._get_executor().submit(self._run, job_id)
+
+    def resume_pending(self) -> int:
+        """
+        Enqueue queued jobs, and running jobs whose lease expired (their
+        worker died). Jobs a live worker is running are left alone; queued
+        ones another worker also picked up run once, see ``_claim``.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        db = self.session_factory()
+        try:
+            stale = db.execute(
+                update(models.ForecastJob)
+                .where(
+                    models.ForecastJob.status == RUNNING,
+                    # No started_at: left by a runner that set it in a separate step
+                    or_(models.ForecastJob.started_at.is_(None), models.ForecastJob.started_at < cutoff),
+                )
+                .values(status=QUEUED, started_at=None)
+            ).rowcount
+            db.commit()
+            job_ids = [
+                job_id
+                for (job_id,) in db.query(models.ForecastJob.job_id)
+                .filter(models.ForecastJob.status == QUEUED)
+                .order_by(models.ForecastJob.created_at)
+            ]
+        finally:
+            db.close()
+
+        for job_id in job_ids:
+            self.enqueue(job_id)
+        if job_ids:
+            logger.info(f"[forecast_jobs] Resumed {len(job_ids)} pending jobs ({stale} with an expired lease)")
+        return len(job_ids)
+
+    def _claim(self, db: Session, job_id: str) -> bool:
+        """Mark the job running if it is still queued; False when another worker got it first."""
+        claimed = db.execute(
+            update(models.ForecastJob)
+            .where(models.ForecastJob.job_id == job_id, models.ForecastJob.status == QUEUED)
+            .values(status=RUNNING, started_at=datetime.utcnow())
+        ).rowcount
+        db.commit()
+        return claimed == 1
+
+    def _run(self, job_id: str) -> None:
+        db = self.session_factory()
+        try:
+            if not self._claim(db, job_id):
+                return
+            job = db.query(models.ForecastJob).filter(models.ForecastJob.job_id == job_id).one()
+
+            try:
+                result = self.handler(job)
+            except Exception as e:
+                logger.exception(f"[forecast_jobs] Job {job_id} failed")
+                job.status = FAILED
+                job.error = str(e)
+            else:
+                job.status = SUCCEEDED
+                job.result = json.dumps(result, default=str)
+
+            job.finished_at = datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                # Unfinished jobs stay queued/running in the table and resume on restart
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -1,9 +1,15 @@
+import threading
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from .db import Base, engine
 from .routers import  product, sales, forecast, auth, importData
+from .agents.executor import forecast_pool
+from .agents.tools import shared_llm
 from .configs import config
+from .metrics import registry
 
 Base.metadata.create_all(bind=engine)
 
@@ -20,6 +26,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # app.include_router(organization.router)
@@ -29,8 +36,38 @@ app.include_router(forecast.router)
 app.include_router(auth.router)
 app.include_router(importData.router)
 
+@app.on_event("startup")
+def resume_forecast_jobs():
+    forecast.forecast_jobs.resume_pending()
+
+
+@app.on_event("startup")
+def warm_up_forecasting():
+    if not config.forecast_warmup:
+        return
+
+    def run():
+        from .agents.forecast_graph import warm_up
+
+        warm_up()
+
+    # In the background so the worker starts serving CRUD immediately
+    threading.Thread(target=run, name="forecast-warmup", daemon=True).start()
+
+
+@app.on_event("shutdown")
+def shutdown_forecast_pool():
+    forecast.forecast_jobs.shutdown()
+    forecast_pool.shutdown()
+    shared_llm.close()
+
+
 @app.get("/")
 def read_root():
     return {"status": "ok", "message": "Manufacturing forecasting backend running"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics():
+    """Forecast node timings, token usage and model choices in the Prometheus text format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,160 @@
+"""
+In-process counters and histograms, rendered in the Prometheus text format
+by ``GET /metrics``.
+
+Values live in the worker process that recorded them; with several uvicorn
+workers each scrape sees one worker, so scrape them individually or run a
+single worker per container.
+"""
+
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return f"{value:g}" if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic per-label-set totals."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = Lock()
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labels, key)} {_number(value)}" for key, value in values]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = Lock()
+        # label values -> [per-bucket counts (last is +Inf), sum, count]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            entry = self._values.get(labels)
+            return entry[2] if entry else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, ([*entry[0]], entry[1], entry[2])) for key, entry in self._values.items())
+        lines = []
+        for key, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _number(float(bound))
+                bucket_labels = _labels(self.labels, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_number(float(total))}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {count}")
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            metric.reset()
+
+
+registry = Registry()
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+ROWS_BUCKETS = (10, 100, 1_000, 10_000, 100_000, 1_000_000)
+TOKENS_BUCKETS = (50, 100, 250, 500, 1_000, 2_500, 5_000, 10_000)
+
+forecast_node_seconds = registry.register(Histogram(
+    "forecast_node_duration_seconds", "Wall time of each forecast graph node.", ("node",), SECONDS_BUCKETS
+))
+forecast_node_cpu_seconds = registry.register(Histogram(
+    "forecast_node_cpu_seconds", "CPU time of the thread running each forecast graph node.", ("node",), SECONDS_BUCKETS
+))
+forecast_node_rows = registry.register(Histogram(
+    "forecast_node_rows", "Rows of the sales series returned by a forecast graph node.", ("node",), ROWS_BUCKETS
+))
+forecast_node_errors = registry.register(Counter(
+    "forecast_node_errors_total", "Forecast graph nodes that raised.", ("node",)
+))
+forecast_llm_tokens = registry.register(Histogram(
+    "forecast_llm_tokens", "LLM tokens per forecast graph node, by direction.", ("node", "direction"), TOKENS_BUCKETS
+))
+forecast_llm_cache_requests = registry.register(Counter(
+    "forecast_llm_cache_requests_total", "LLM cache lookups by result.", ("result",)
+))
+forecast_model_selected = registry.register(Counter(
+    "forecast_model_selected_total", "Forecasts by the model that produced them.", ("model", "selection")
+))
+forecast_fallbacks = registry.register(Counter(
+    "forecast_fallbacks_total", "Forecasts where a fit timeout or the time budget ruled a model out.", ()
+))
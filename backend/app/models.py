@@ -5,6 +5,7 @@ from sqlalchemy import (
     Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
@@ -47,11 +48,16 @@ class Product(Base):
 
     organization = relationship("Organization", back_populates="products")
     sales_data = relationship("SalesData", back_populates="product", cascade="all, delete-orphan")
+    sales_rollups = relationship("SalesRollup", back_populates="product", cascade="all, delete-orphan")
 
 
 class SalesData(Base):
     __tablename__ = "sales_data"
-    __table_args__ = (UniqueConstraint("product_id", "sales_date", name="uix_product_date"),)
+    __table_args__ = (
+        UniqueConstraint("product_id", "sales_date", name="uix_product_date"),
+        # Covers the per-product series reads (filter product_id, order by sales_date)
+        Index("ix_sales_product_date_qty", "product_id", "sales_date", "sales_quantity"),
+    )
 
     order_id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("product.product_id"), nullable=False)
@@ -62,3 +68,37 @@ class SalesData(Base):
     product = relationship("Product", back_populates="sales_data")
 
 
+class SalesRollup(Base):
+    """
+    Monthly/yearly totals of ``sales_data`` per product, kept up to date by
+    ``app.rollups`` whenever sales rows are written.
+    """
+
+    __tablename__ = "sales_rollup"
+
+    product_id = Column(Integer, ForeignKey("product.product_id"), primary_key=True)
+    period_type = Column(String, primary_key=True)  # monthly, yearly
+    period_start = Column(Date, primary_key=True)
+    total = Column(Numeric, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+    product = relationship("Product", back_populates="sales_rollups")
+
+
+class ForecastJob(Base):
+    """A queued ``POST /forecast/jobs`` request and, once finished, its result."""
+
+    __tablename__ = "forecast_job"
+
+    job_id = Column(String, primary_key=True)
+    org_id = Column(Integer, ForeignKey("organization.org_id"), nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("product.product_id"), nullable=False)
+    query = Column(Text, nullable=False)
+    payload = Column(Text, nullable=True)  # ForecastNLPRequest JSON, replayed by the worker
+    status = Column(String, nullable=False, default="queued", index=True)  # queued, running, succeeded, failed
+    result = Column(Text, nullable=True)  # ChatbotResponse JSON
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
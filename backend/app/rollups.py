@@ -0,0 +1,217 @@
+"""
+Monthly and yearly sales totals, maintained incrementally.
+
+Every writer of ``sales_data`` calls ``record_sales`` in the same
+transaction, so monthly/yearly series and dashboard rollups can be read
+from ``sales_rollup`` instead of re-aggregating the daily history.
+``rebuild_rollups`` recomputes the table from scratch:
+
+    python -m app.rollups [--product-id N]
+"""
+
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+import argparse
+import logging
+
+import pandas as pd
+from sqlalchemy import Date, and_, cast, func, insert, or_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from . import models
+
+logger = logging.getLogger("sales_rollups")
+
+# period_type -> SQL period name
+PERIOD_TYPES = {"monthly": "month", "yearly": "year"}
+
+# INSERT ... ON CONFLICT DO UPDATE, per dialect; others use ``_add_deltas``
+UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def period_start(day: date, period_type: str) -> date:
+    if period_type == "monthly":
+        return day.replace(day=1)
+    return day.replace(month=1, day=1)
+
+
+def period_start_expression(dialect: str, period: str):
+    """SQL expression truncating sales_date to the start of ``period`` (weeks start on Monday)."""
+    column = models.SalesData.sales_date
+    if dialect == "sqlite":
+        if period == "day":
+            return func.date(column)
+        if period == "week":
+            return func.date(column, "weekday 0", "-6 days")
+        if period == "month":
+            return func.strftime("%Y-%m-01", column)
+        return func.strftime("%Y-01-01", column)
+    return cast(func.date_trunc(period, column), Date)
+
+
+def record_sales(
+    db: Session,
+    product_id: int,
+    added: Iterable[Tuple[date, float]] = (),
+    removed: Iterable[Tuple[date, float]] = (),
+) -> None:
+    """
+    Apply ``(sales_date, quantity)`` rows added to or removed from
+    ``sales_data`` to the product's rollups. Does not commit.
+    """
+    deltas: Dict[Tuple[str, date], List] = {}
+    for rows, sign in ((added, 1), (removed, -1)):
+        for sales_date, quantity in rows:
+            for period_type in PERIOD_TYPES:
+                delta = deltas.setdefault((period_type, period_start(sales_date, period_type)), [0.0, 0])
+                delta[0] += sign * float(quantity)
+                delta[1] += sign
+
+    rows = [
+        {"product_id": product_id, "period_type": period_type, "period_start": start, "total": total, "count": count}
+        for (period_type, start), (total, count) in deltas.items()
+        if count != 0 or total != 0
+    ]
+    if not rows:
+        return
+
+    # The deltas are added in SQL, so concurrent writers to the same period
+    # cannot overwrite each other's totals
+    rollup = models.SalesRollup
+    upsert_insert = UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if upsert_insert is None:
+        _add_deltas(db, rows)
+    else:
+        statement = upsert_insert(rollup).values(rows)
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[rollup.product_id, rollup.period_type, rollup.period_start],
+                set_={
+                    "total": rollup.total + statement.excluded.total,
+                    "count": rollup.count + statement.excluded.count,
+                },
+            )
+        )
+    db.query(rollup).filter(
+        rollup.product_id == product_id,
+        or_(*(
+            and_(rollup.period_type == row["period_type"], rollup.period_start == row["period_start"])
+            for row in rows
+        )),
+        rollup.count <= 0,
+    ).delete(synchronize_session=False)
+
+
+def _add_deltas(db: Session, rows: List[Dict]) -> None:
+    """Update-then-insert for dialects without ON CONFLICT; the UPDATE still adds in SQL."""
+    rollup = models.SalesRollup
+    for row in rows:
+        updated = db.execute(
+            update(rollup)
+            .where(
+                rollup.product_id == row["product_id"],
+                rollup.period_type == row["period_type"],
+                rollup.period_start == row["period_start"],
+            )
+            .values(total=rollup.total + row["total"], count=rollup.count + row["count"])
+        ).rowcount
+        if not updated:
+            db.execute(insert(rollup).values(**row))
+
+
+def load_rollup_series(
+    db: Session, product_id: int, granularity: str, row_count: int
+) -> Optional[pd.DataFrame]:
+    """
+    Monthly/yearly totals of one product, shaped like the daily series of
+    ``filter_data_agent``; None unless they cover all ``row_count`` sales rows.
+    """
+    rows = (
+        db.query(models.SalesRollup.period_start, models.SalesRollup.total, models.SalesRollup.count)
+        .filter(
+            models.SalesRollup.product_id == product_id,
+            models.SalesRollup.period_type == granularity,
+        )
+        .order_by(models.SalesRollup.period_start)
+        .all()
+    )
+    if sum(count for _, _, count in rows) != row_count:
+        return None
+    return pd.DataFrame(
+        {"sales_quantity": [float(total) for _, total, _ in rows]},
+        index=pd.DatetimeIndex(pd.to_datetime([start for start, _, _ in rows]), name="sales_date"),
+    )
+
+
+def rebuild_rollups(db: Session, product_id: Optional[int] = None) -> int:
+    """Recompute rollups from ``sales_data``, for one product or all. Does not commit."""
+    db.flush()
+    delete = db.query(models.SalesRollup)
+    if product_id is not None:
+        delete = delete.filter(models.SalesRollup.product_id == product_id)
+    delete.delete(synchronize_session=False)
+
+    dialect = db.get_bind().dialect.name
+    created = 0
+    for period_type, period in PERIOD_TYPES.items():
+        start = period_start_expression(dialect, period)
+        query = db.query(
+            models.SalesData.product_id,
+            start,
+            func.sum(models.SalesData.sales_quantity),
+            func.count(models.SalesData.order_id),
+        )
+        if product_id is not None:
+            query = query.filter(models.SalesData.product_id == product_id)
+
+        rollups = [
+            models.SalesRollup(
+                product_id=row_product_id,
+                period_type=period_type,
+                period_start=date.fromisoformat(start_value) if isinstance(start_value, str) else start_value,
+                total=float(total),
+                count=count,
+            )
+            for row_product_id, start_value, total, count in query.group_by(models.SalesData.product_id, start)
+        ]
+        db.add_all(rollups)
+        created += len(rollups)
+
+    logger.info(f"[sales_rollups] Rebuilt {created} rollup rows")
+    return created
+
+
+def ensure_rollups(db: Session) -> bool:
+    """
+    Build the rollups once for databases that have sales but no rollups
+    yet; run by the migration that adds sales_rollup. Does not commit.
+    """
+    has_rollups = db.query(models.SalesRollup.product_id).first() is not None
+    has_sales = db.query(models.SalesData.order_id).first() is not None
+    if has_rollups or not has_sales:
+        return False
+    rebuild_rollups(db)
+    db.flush()
+    return True
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .db import SessionLocal, engine
+
+    parser = argparse.ArgumentParser(description="Rebuild the sales_rollup table from sales_data.")
+    parser.add_argument("--product-id", type=int, default=None, help="only rebuild this product")
+    args = parser.parse_args(argv)
+
+    models.SalesRollup.__table__.create(bind=engine, checkfirst=True)
+    db = SessionLocal()
+    try:
+        created = rebuild_rollups(db, args.product_id)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Rebuilt {created} rollup rows")
+
+
+if __name__ == "__main__":
+    main()
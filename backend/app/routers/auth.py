@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
-from ..db import get_db
+from ..auth_cache import get_org, org_cache
+from ..db import get_async_db, get_db
 from ..security import verify_password, get_password_hash, create_access_token, decode_access_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
@@ -30,6 +32,7 @@ def register_organization(org_in: schemas.OrganizationCreate, db: Session = Depe
     db.add(org)
     db.commit()
     db.refresh(org)
+    org_cache.invalidate(org.org_id)
     return org
 
 
@@ -54,7 +57,9 @@ def login_for_access_token(
     return {"access_token": access_token, "token_type": "bearer", "org_id": org.org_id, "org_name": org.org_name}
 
 
-def get_current_org(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> models.Organization:
+async def get_current_org(
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)
+) -> models.Organization:
     payload = decode_access_token(token)
     if not payload or "sub" not in payload:
         raise HTTPException(
@@ -63,7 +68,7 @@ def get_current_org(db: Session = Depends(get_db), token: str = Depends(oauth2_s
             headers={"WWW-Authenticate": "Bearer"},
         )
     org_id = int(payload["sub"])
-    org = db.query(models.Organization).filter(models.Organization.org_id == org_id).first()
+    org = await get_org(db, org_id)
     if not org:
         raise HTTPException(status_code=401, detail="Organization not found")
     return org
@@ -1,115 +1,24 @@
-from datetime import date, timedelta
-import calendar
-import re
+from datetime import date
+import json
 
-from dateutil import parser as date_parser
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from ..agents.forecast_graph import demand_forecast_workflow
+from ..agents.executor import ForecastPoolSaturated
+from ..agents.fast_parser import fast_path_stats
+from ..agents.telemetry import merge_diagnostics
 from .. import models, schemas
+from ..configs import config
+from ..auth_cache import get_product_org_id
 from ..db import get_db
+from ..jobs import ForecastJobRunner
 from .auth import get_current_org
 
 router = APIRouter(prefix="/forecast", tags=["forecast"])
 
 
-# def _parse_nlp_query(text: str) -> tuple[date | None, date | None, int]:
-#     """
-#     Very lightweight NLP-style parser for forecast requests.
-#     Supports phrases like:
-#     - "from Jan 2024 to Mar 2024"
-#     - "between 2023-01-01 and 2023-06-30"
-#     - "for March 2024"
-#     - "for 2023"
-#     - "next week", "next 2 weeks"
-#     - "next month", "next 3 months"
-#     - "next 10 days"
-#     - "till date" / "till today"
-#     """
-#     text_l = text.lower()
-#     today = date.today()
-#     history_start: date | None = None
-#     history_end: date | None = None
-#     days: int = 30
-
-#     # Horizon parsing
-#     m = re.search(r"next\s+(\d+)\s+day", text_l)
-#     if m:
-#         days = int(m.group(1))
-#     else:
-#         m = re.search(r"next\s+(\d+)\s+week", text_l)
-#         if m:
-#             days = int(m.group(1)) * 7
-#         elif "next week" in text_l:
-#             days = 7
-#         else:
-#             m = re.search(r"next\s+(\d+)\s+month", text_l)
-#             if m:
-#                 days = int(m.group(1)) * 30
-#             elif "next month" in text_l:
-#                 days = 30
-#             else:
-#                 m = re.search(r"next\s+(\d+)\s+year", text_l)
-#                 if m:
-#                     days = int(m.group(1)) * 365
-#                 elif "next year" in text_l:
-#                     days = 365
-
-#     # Date range: "from X to Y" or "between X and Y"
-#     m = re.search(r"(from|between)\s+(.+?)\s+(to|and)\s+(.+)", text_l)
-#     if m:
-#         start_str = m.group(2)
-#         end_str = m.group(4)
-#         try:
-#             history_start = date_parser.parse(start_str, dayfirst=False).date()
-#         except Exception:
-#             history_start = None
-#         try:
-#             history_end = date_parser.parse(end_str, dayfirst=False).date()
-#         except Exception:
-#             history_end = None
-
-#     # "since X" if start still unknown
-#     if history_start is None:
-#         m = re.search(r"(since|from)\s+([0-9a-zA-Z ,/-]+)", text_l)
-#         if m:
-#             try:
-#                 history_start = date_parser.parse(m.group(2), dayfirst=False).date()
-#             except Exception:
-#                 history_start = None
-
-#     # Explicit "till date"/"till today"/"until today"
-#     if history_end is None and (
-#         "till date" in text_l
-#         or "till today" in text_l
-#         or "until today" in text_l
-#         or "up to today" in text_l
-#     ):
-#         history_end = today
-
-#     # Month + year or year-only if still not set
-#     if history_start is None and history_end is None:
-#         # Year-only pattern like "2023"
-#         m = re.search(r"\b(20[0-9]{2})\b", text_l)
-#         if m:
-#             y = int(m.group(1))
-#             history_start = date(y, 1, 1)
-#             history_end = date(y, 12, 31)
-#         else:
-#             # Try to parse a month+year like "March 2024"
-#             try:
-#                 dt = date_parser.parse(text_l, default=date(today.year, 1, 1))
-#                 history_start = date(dt.year, dt.month, 1)
-#                 last_day = calendar.monthrange(dt.year, dt.month)[1]
-#                 history_end = date(dt.year, dt.month, last_day)
-#             except Exception:
-#                 history_start = None
-#                 history_end = None
-
-#     return history_start, history_end, days
-
-
 # @router.get("/{product_id}", response_model=schemas.ForecastResponse)
 # def get_forecast(
 #     product_id: int,
@@ -148,27 +57,30 @@ router = APIRouter(prefix="/forecast", tags=["forecast"])
 #     )
 
 
-@router.post("/forecast", response_model=schemas.ChatbotResponse)
-def get_forecast_nlp(
-    payload: schemas.ForecastNLPRequest,
-    db: Session = Depends(get_db),
-    current_org: models.Organization = Depends(get_current_org),
-):
-    product = (
-        db.query(models.Product)
-        .filter(models.Product.product_id == payload.product_id)
-        .first()
-    )
-    if not product:
+def _get_authorized_product(
+    db: Session, product_id: int, current_org: models.Organization
+) -> None:
+    product_org_id = get_product_org_id(db, product_id)
+    if product_org_id is None:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    if product.org_id != current_org.org_id:
+    if product_org_id != current_org.org_id:
         raise HTTPException(
             status_code=403,
             detail="Not authorized to view forecast for this product",
         )
 
-    initial_state = {
+
+def _workflow(async_nodes: bool = False):
+    # Imported on first use: langgraph and langchain add about a second to
+    # worker boot and are not needed by workers that only serve CRUD
+    from ..agents.forecast_graph import get_workflow
+
+    return get_workflow(async_nodes=async_nodes)
+
+
+def _initial_state(payload: schemas.ForecastNLPRequest) -> dict:
+    return {
         "product_id": payload.product_id,
         "user_query": payload.query,
         "is_forecast_request": False,
@@ -178,10 +90,12 @@ def get_forecast_nlp(
         "report": "",
         "history_start": None,
         "history_end": None,
+        "model_selection": payload.model_selection or config.forecast_selection,
+        "report_mode": payload.report_mode or config.forecast_report_mode,
     }
 
-    result_state = demand_forecast_workflow.invoke(initial_state)
-    
+
+def _chatbot_response(product_id: int, result_state: dict, diagnostics: bool = False) -> schemas.ChatbotResponse:
     is_forecast = result_state.get("is_forecast_request", False)
     conversational_response = result_state.get("conversational_response", "")
     forecast = result_state.get("forecast", {})
@@ -195,11 +109,217 @@ def get_forecast_nlp(
         periods = 0
 
     return schemas.ChatbotResponse(
-        product_id=payload.product_id,
+        product_id=product_id,
         is_forecast_request=is_forecast,
         conversational_response=conversational_response if not is_forecast else None,
         forecast=forecast if is_forecast else None,
         periods=periods if is_forecast else None,  # Changed from 'days'
         granularity=granularity if is_forecast else None,  # NEW
+        model=result_state.get("forecast_model") if is_forecast else None,
+        model_candidates=result_state.get("model_candidates") if is_forecast else None,
+        fallback_reason=result_state.get("fallback_reason") if is_forecast else None,
         report=report if is_forecast else None,
-    )
\ No newline at end of file
+        report_source=result_state.get("report_source") if is_forecast else None,
+        diagnostics=result_state.get("diagnostics") if diagnostics else None,
+    )
+
+
+@router.post("/forecast", response_model=schemas.ChatbotResponse)
+def get_forecast_nlp(
+    payload: schemas.ForecastNLPRequest,
+    db: Session = Depends(get_db),
+    current_org: models.Organization = Depends(get_current_org),
+):
+    _get_authorized_product(db, payload.product_id, current_org)
+
+    try:
+        result_state = _workflow().invoke(_initial_state(payload))
+    except ForecastPoolSaturated as e:
+        # Tournament mode fits in the forecast pool
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": "5"},
+        )
+    return _chatbot_response(payload.product_id, result_state, payload.diagnostics)
+
+
+@router.post("/async", response_model=schemas.ChatbotResponse)
+async def get_forecast_nlp_async(
+    payload: schemas.ForecastNLPRequest,
+    db: Session = Depends(get_db),
+    current_org: models.Organization = Depends(get_current_org),
+):
+    """
+    Same as ``POST /forecast/forecast`` without holding a threadpool worker:
+    LLM calls are awaited and model fitting runs in the forecast process
+    pool. Answers 503 when that pool's queue is full.
+    """
+    await run_in_threadpool(_get_authorized_product, db, payload.product_id, current_org)
+
+    try:
+        result_state = await _workflow(async_nodes=True).ainvoke(_initial_state(payload))
+    except ForecastPoolSaturated as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": "5"},
+        )
+    return _chatbot_response(payload.product_id, result_state, payload.diagnostics)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _node_event(node: str, update: dict) -> dict:
+    """Summarize a node's state update for the progress stream."""
+    if node == "fetch_data_agent":
+        return {"rows": update["data_version"][0], "last_date": update.get("last_date")}
+    if node == "filter_data_agent":
+        ts = update.get("time_series")
+        return {
+            "rows": 0 if ts is None else len(ts),
+            "last_date": update.get("last_date"),
+        }
+    if node == "preprocess_agent":
+        return {"periods": len(update["time_series"])}
+    if node == "arima_agent":
+        return {
+            "model": update.get("forecast_model"),
+            "forecast": update.get("forecast"),
+            "candidates": update.get("model_candidates"),
+            "fallback_reason": update.get("fallback_reason"),
+        }
+    # Remaining nodes only return small JSON-friendly values
+    return {k: v for k, v in update.items() if not k.startswith("_") and k != "diagnostics"}
+
+
+@router.post("/stream")
+async def stream_forecast_nlp(
+    payload: schemas.ForecastNLPRequest,
+    db: Session = Depends(get_db),
+    current_org: models.Organization = Depends(get_current_org),
+):
+    """
+    Server-sent events: one event per graph node as it completes (parsed
+    params, rows fetched, winning model and forecast values, report), then
+    a final ``result`` event carrying the ``ChatbotResponse``.
+    """
+    await run_in_threadpool(_get_authorized_product, db, payload.product_id, current_org)
+
+    async def events():
+        state = _initial_state(payload)
+        try:
+            async for chunk in _workflow(async_nodes=True).astream(state, stream_mode="updates"):
+                for node, update in chunk.items():
+                    if not update:
+                        continue
+                    state.update(update, diagnostics=merge_diagnostics(state.get("diagnostics"), update.get("diagnostics")))
+                    yield _sse(node, _node_event(node, update))
+        except ForecastPoolSaturated as e:
+            yield _sse("error", {"status_code": 503, "detail": str(e)})
+            return
+        except Exception as e:
+            yield _sse("error", {"status_code": 500, "detail": str(e)})
+            return
+        yield _sse("result", _chatbot_response(payload.product_id, state, payload.diagnostics).model_dump())
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/batch")
+def batch_forecast_org(
+    payload: schemas.BatchForecastRequest,
+    db: Session = Depends(get_db),
+    current_org: models.Organization = Depends(get_current_org),
+):
+    """
+    Forecast every product of the organization from structured parameters
+    (no LLM). Streams NDJSON, one line per product as its fit finishes.
+    """
+    if payload.org_id != current_org.org_id:
+        raise HTTPException(status_code=403, detail="Not authorized to forecast for this organization")
+
+    from ..agents.batch import batch_forecast, load_org_series
+
+    series = load_org_series(db, payload.org_id, payload.granularity)
+
+    def lines():
+        for result in batch_forecast(series, payload.granularity, payload.horizon):
+            yield json.dumps(result, default=str) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def _run_forecast_job(job: models.ForecastJob) -> dict:
+    # Jobs queued before payloads were stored only have the product and query
+    if job.payload:
+        payload = schemas.ForecastNLPRequest.model_validate_json(job.payload)
+    else:
+        payload = schemas.ForecastNLPRequest(product_id=job.product_id, query=job.query)
+    result_state = _workflow().invoke(_initial_state(payload))
+    return _chatbot_response(job.product_id, result_state, payload.diagnostics).model_dump()
+
+
+forecast_jobs = ForecastJobRunner(_run_forecast_job, max_workers=config.forecast_job_workers)
+
+
+def _job_read(job: models.ForecastJob) -> schemas.ForecastJobRead:
+    return schemas.ForecastJobRead(
+        job_id=job.job_id,
+        product_id=job.product_id,
+        query=job.query,
+        status=job.status,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        result=json.loads(job.result) if job.result else None,
+        error=job.error,
+    )
+
+
+@router.post("/jobs", response_model=schemas.ForecastJobRead, status_code=202)
+def create_forecast_job(
+    payload: schemas.ForecastNLPRequest,
+    db: Session = Depends(get_db),
+    current_org: models.Organization = Depends(get_current_org),
+):
+    """Queue a forecast and return immediately; poll ``GET /forecast/jobs/{job_id}``."""
+    _get_authorized_product(db, payload.product_id, current_org)
+
+    job = forecast_jobs.create(
+        db, current_org.org_id, payload.product_id, payload.query, payload=payload.model_dump()
+    )
+    return _job_read(job)
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.ForecastJobRead)
+def get_forecast_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_org: models.Organization = Depends(get_current_org),
+):
+    job = (
+        db.query(models.ForecastJob)
+        .filter(
+            models.ForecastJob.job_id == job_id,
+            models.ForecastJob.org_id == current_org.org_id,
+        )
+        .first()
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Forecast job not found")
+    return _job_read(job)
+
+
+@router.get("/fast_path/stats")
+def get_fast_path_stats(
+    current_org: models.Organization = Depends(get_current_org),
+):
+    """Hit/miss counters of the rule-based parser that skips LLM round-trips."""
+    return fast_path_stats.snapshot()
@@ -3,9 +3,15 @@ Sales Data Import Endpoints
 Add these to your FastAPI router
 """
 
-from typing import List
+from collections import OrderedDict
+from threading import Lock
+from typing import IO, Dict, List, Optional, Tuple
 from datetime import datetime, date
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status,Form
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, Response, UploadFile, File, status,Form
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 import pandas as pd
@@ -13,9 +19,13 @@ import io
 from pydantic import BaseModel
 
 # Assuming these imports from your existing codebase
-from ..db import get_db
+from ..configs import config
+from ..auth_cache import get_product_org_id, get_product_org_id_async
+from ..db import get_async_db, get_db
 from .. import models, schemas
+from ..rollups import record_sales
 from .auth import get_current_org
+from .sales import SalesPageParams, paginate_sales
 
 router = APIRouter(prefix="/api/sales", tags=["importData"])
 
@@ -32,42 +42,369 @@ class SalesforceImportRequest(BaseModel):
     end_date: str = ""  # YYYY-MM-DD format
 
 
+class ProductImportCount(BaseModel):
+    product_id: int
+    imported_count: int
+    skipped_count: int
+
+
 class ImportResponse(BaseModel):
     imported_count: int
     skipped_count: int
     message: str
+    import_id: Optional[str] = None
+    products: List[ProductImportCount] = []
+
+
+class ImportProgressResponse(BaseModel):
+    import_id: str
+    status: str  # "running", "completed" or "failed"
+    rows_read: int
+    imported_count: int
+    skipped_count: int
+    chunks: int
+
+
+class ImportProgressRegistry:
+    """
+    Row counters of streaming imports, kept in memory so the client can poll
+    ``GET /import/progress/{import_id}`` while the upload is processed.
+    Only the most recent ``maxsize`` imports are remembered.
+    """
+
+    def __init__(self, maxsize: int = 100):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = Lock()
+
+    def start(self, import_id: str, org_id: int) -> None:
+        with self._lock:
+            self._entries[import_id] = {
+                "org_id": org_id,
+                "status": "running",
+                "rows_read": 0,
+                "imported_count": 0,
+                "skipped_count": 0,
+                "chunks": 0,
+            }
+            self._entries.move_to_end(import_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def update(self, import_id: str, **fields) -> None:
+        with self._lock:
+            if import_id in self._entries:
+                self._entries[import_id].update(fields)
+
+    def get(self, import_id: str, org_id: int) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(import_id)
+            if entry is None or entry["org_id"] != org_id:
+                return None
+            return dict(entry)
+
+
+import_progress = ImportProgressRegistry()
+
+# Optional columns naming the product of each row
+PRODUCT_COLUMNS = ('product_id', 'sku')
+
+
+def _prepare_sales_records(df: pd.DataFrame, product_id: int, db: Session) -> Tuple[List[dict], int, List[str]]:
+    """
+    Validate ``sales_date``/``sales_quantity`` column-wise and return
+    ``(records, skipped_count, errors)``. Rows with a missing value, an
+    unparseable value or a negative quantity are skipped, as are dates the
+    product already has and repeated dates within the file.
+    """
+    missing = df['sales_date'].isna() | df['sales_quantity'].isna()
+    # format="mixed" parses each value on its own, like the old per-row loop
+    dates = pd.to_datetime(df['sales_date'], errors='coerce', format='mixed')
+    quantities = pd.to_numeric(df['sales_quantity'], errors='coerce')
+
+    bad_date = ~missing & dates.isna()
+    bad_quantity = ~missing & ~bad_date & quantities.isna()
+    negative = ~missing & ~bad_date & ~bad_quantity & (quantities < 0)
+
+    errors = []
+    for idx in df.index[bad_date | bad_quantity | negative][:5]:  # Only the first 5 are reported
+        if bad_date[idx]:
+            errors.append(f"Row {idx + 2}: Invalid date '{df.at[idx, 'sales_date']}'")
+        elif bad_quantity[idx]:
+            errors.append(f"Row {idx + 2}: Invalid quantity '{df.at[idx, 'sales_quantity']}'")
+        else:
+            errors.append(f"Row {idx + 2}: Negative quantity")
+
+    valid = ~(missing | bad_date | bad_quantity | negative)
+    sales = pd.DataFrame({
+        'sales_date': dates[valid].dt.date,
+        'sales_quantity': quantities[valid].astype(float),
+    })
+
+    if not sales.empty:
+        existing = {
+            row.sales_date
+            for row in db.query(models.SalesData.sales_date).filter(
+                models.SalesData.product_id == product_id,
+                models.SalesData.sales_date.between(sales['sales_date'].min(), sales['sales_date'].max())
+            )
+        }
+        sales = sales[~sales['sales_date'].isin(existing) & ~sales['sales_date'].duplicated()]
+
+    created_at = datetime.utcnow()
+    records = [
+        {
+            'product_id': product_id,
+            'sales_date': sales_date,
+            'sales_quantity': sales_quantity,
+            'created_at': created_at,
+        }
+        for sales_date, sales_quantity in zip(sales['sales_date'], sales['sales_quantity'])
+    ]
+    return records, len(df) - len(records), errors
+
+
+def _bulk_insert_sales(db: Session, records: List[dict]) -> None:
+    """Insert all records with a single executemany."""
+    if records:
+        db.execute(insert(models.SalesData), records)
+
+
+def _check_columns(df: pd.DataFrame, product_id: Optional[int]) -> None:
+    required_columns = ['sales_date', 'sales_quantity']
+    missing_columns = [col for col in required_columns if col not in df.columns]
+
+    if missing_columns:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Missing required columns: {', '.join(missing_columns)}"
+        )
+    if product_id is None and not any(col in df.columns for col in PRODUCT_COLUMNS):
+        raise HTTPException(
+            status_code=400,
+            detail="product_id is required when the file has no sku or product_id column"
+        )
+
+
+def _resolve_products(df: pd.DataFrame, product_id: Optional[int], org_id: int, db: Session) -> pd.Series:
+    """
+    Return the product id of every row (NaN if it cannot be resolved).
+    ``product_id``/``sku`` columns are looked up with one query scoped to
+    the organization; rows without either fall back to ``product_id``.
+    """
+    resolved = pd.Series(product_id, index=df.index, dtype='float')
+    ids = pd.to_numeric(df['product_id'], errors='coerce') if 'product_id' in df.columns else None
+    skus = df['sku'].astype('string').str.strip() if 'sku' in df.columns else None
+    if ids is None and skus is None:
+        return resolved
+
+    filters = []
+    if ids is not None:
+        filters.append(models.Product.product_id.in_(ids.dropna().astype(int).unique().tolist()))
+    if skus is not None:
+        filters.append(models.Product.sku.in_(skus.dropna().unique().tolist()))
+    products = db.query(models.Product.product_id, models.Product.sku).filter(
+        models.Product.org_id == org_id,
+        or_(*filters)
+    ).all()
+
+    if skus is not None:
+        sku_map = {p.sku: p.product_id for p in products if p.sku}
+        resolved = resolved.where(skus.isna(), pd.to_numeric(skus.map(sku_map), errors='coerce'))
+    if ids is not None:
+        known_ids = {p.product_id for p in products}
+        resolved = resolved.where(ids.isna(), ids.where(ids.isin(known_ids)))
+    return resolved
+
+
+def _import_frame(
+    df: pd.DataFrame,
+    product_id: Optional[int],
+    org_id: int,
+    db: Session,
+    per_product: Dict[int, List[int]],
+) -> Tuple[int, int, List[str]]:
+    """
+    Insert the rows of ``df`` product by product without committing and
+    return ``(imported_count, skipped_count, errors)``. ``per_product``
+    accumulates ``[imported, skipped]`` for every product seen.
+    """
+    resolved = _resolve_products(df, product_id, org_id, db)
+    unresolved = resolved.isna()
+
+    errors = []
+    for idx in df.index[unresolved][:5]:
+        identifier = next(
+            (df.at[idx, col] for col in PRODUCT_COLUMNS if col in df.columns and not pd.isna(df.at[idx, col])),
+            None
+        )
+        if identifier is None:
+            errors.append(f"Row {idx + 2}: Missing product")
+        else:
+            errors.append(f"Row {idx + 2}: Unknown product '{identifier}'")
+
+    imported_count = 0
+    skipped_count = int(unresolved.sum())
+    for row_product_id, rows in df[~unresolved].groupby(resolved[~unresolved].astype(int), sort=True):
+        records, skipped, product_errors = _prepare_sales_records(rows, int(row_product_id), db)
+        _bulk_insert_sales(db, records)
+        record_sales(
+            db,
+            int(row_product_id),
+            added=[(record['sales_date'], record['sales_quantity']) for record in records]
+        )
+        counts = per_product.setdefault(int(row_product_id), [0, 0])
+        counts[0] += len(records)
+        counts[1] += skipped
+        imported_count += len(records)
+        skipped_count += skipped
+        errors.extend(product_errors)
+
+    return imported_count, skipped_count, errors
+
+
+def _import_csv_in_chunks(
+    fileobj: IO[bytes],
+    product_id: Optional[int],
+    org_id: int,
+    db: Session,
+    chunk_size: int,
+    import_id: str,
+    per_product: Dict[int, List[int]],
+) -> Tuple[int, int, List[str]]:
+    """
+    Read the CSV ``chunk_size`` rows at a time and commit each chunk on its
+    own, so memory stays bounded by the chunk size rather than the file
+    size. Chunks committed before a failure are kept.
+    """
+    imported_count = 0
+    skipped_count = 0
+    rows_read = 0
+    errors = []
+
+    try:
+        reader = pd.read_csv(fileobj, chunksize=chunk_size)
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Error reading file: {str(e)}"
+        )
+
+    try:
+        with reader:
+            for chunk_number, chunk in enumerate(reader, start=1):
+                if chunk_number == 1:
+                    _check_columns(chunk, product_id)
+
+                # The chunk index continues across chunks, so row numbers match the file
+                try:
+                    imported, skipped, chunk_errors = _import_frame(chunk, product_id, org_id, db, per_product)
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Database error after importing {imported_count} records: {str(e)}"
+                    )
+
+                rows_read += len(chunk)
+                imported_count += imported
+                skipped_count += skipped
+                errors.extend(chunk_errors[:5 - len(errors)])
+                import_progress.update(
+                    import_id,
+                    rows_read=rows_read,
+                    imported_count=imported_count,
+                    skipped_count=skipped_count,
+                    chunks=chunk_number,
+                )
+    except pd.errors.ParserError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Error reading file after importing {imported_count} records: {str(e)}"
+        )
+
+    return imported_count, skipped_count, errors
+
+
+def _import_message(imported_count: int, skipped_count: int, errors: List[str]) -> str:
+    message = f"Successfully imported {imported_count} records"
+    if skipped_count > 0:
+        message += f", skipped {skipped_count} records"
+    if errors:
+        message += f". Errors: {'; '.join(errors[:5])}"  # Show first 5 errors
+    return message
+
+
+def _product_counts(per_product: Dict[int, List[int]]) -> List[ProductImportCount]:
+    return [
+        ProductImportCount(product_id=pid, imported_count=imported, skipped_count=skipped)
+        for pid, (imported, skipped) in sorted(per_product.items())
+    ]
 
 
 @router.post("/import/excel", response_model=ImportResponse)
 async def import_sales_from_excel(
     file: UploadFile = File(...),
-    product_id: int = Form(...),   # <-- REQUIRED FIX
+    product_id: Optional[int] = Form(None),
+    stream: bool = Form(False),
+    chunk_size: Optional[int] = Form(None, ge=1),
+    import_id: Optional[str] = Form(None),
     db: Session = Depends(get_db),
     current_org: models.Organization = Depends(get_current_org),
 ):
 
     """
     Import sales data from Excel/CSV file
-    Expected columns: sales_date, sales_quantity
+    Expected columns: sales_date, sales_quantity, and optionally sku or
+    product_id to load several products from one file. Rows without a
+    product column value go to the ``product_id`` form field.
+
+    With ``stream=true`` a CSV upload is read and committed ``chunk_size``
+    rows at a time; progress can be polled under ``import_id``.
     """
-    if not product_id:
-        raise HTTPException(
-            status_code=400,
-            detail="product_id is required"
-        )
-    
-    # Verify product belongs to organization
-    product = db.query(models.Product).filter(
-        models.Product.product_id == product_id,
-        models.Product.org_id == current_org.org_id
-    ).first()
-    
-    if not product:
-        raise HTTPException(
-            status_code=404,
-            detail="Product not found or does not belong to your organization"
+    if product_id is not None:
+        # Verify product belongs to organization
+        if get_product_org_id(db, product_id) != current_org.org_id:
+            raise HTTPException(
+                status_code=404,
+                detail="Product not found or does not belong to your organization"
+            )
+
+    per_product: Dict[int, List[int]] = {}
+
+    if stream:
+        if not file.filename.endswith('.csv'):
+            raise HTTPException(
+                status_code=400,
+                detail="Streaming import only supports CSV files"
+            )
+        import_id = import_id or uuid.uuid4().hex
+        import_progress.start(import_id, current_org.org_id)
+        try:
+            imported_count, skipped_count, errors = await run_in_threadpool(
+                _import_csv_in_chunks,
+                file.file,
+                product_id,
+                current_org.org_id,
+                db,
+                chunk_size or config.import_chunk_size,
+                import_id,
+                per_product,
+            )
+        except Exception:
+            import_progress.update(import_id, status="failed")
+            raise
+        import_progress.update(import_id, status="completed")
+
+        return ImportResponse(
+            imported_count=imported_count,
+            skipped_count=skipped_count,
+            message=_import_message(imported_count, skipped_count, errors),
+            import_id=import_id,
+            products=_product_counts(per_product),
         )
-    
+
     # Read file
     try:
         contents = await file.read()
@@ -89,61 +426,13 @@ async def import_sales_from_excel(
         )
     
     # Validate required columns
-    required_columns = ['sales_date', 'sales_quantity']
-    missing_columns = [col for col in required_columns if col not in df.columns]
-    
-    if missing_columns:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Missing required columns: {', '.join(missing_columns)}"
-        )
-    
-    # Process and import data
-    imported_count = 0
-    skipped_count = 0
-    errors = []
-    
-    for idx, row in df.iterrows():
-        try:
-            # Parse date
-            if pd.isna(row['sales_date']) or pd.isna(row['sales_quantity']):
-                skipped_count += 1
-                continue
-                
-            sales_date = pd.to_datetime(row['sales_date']).date()
-            sales_quantity = float(row['sales_quantity'])
-            
-            if sales_quantity < 0:
-                errors.append(f"Row {idx + 2}: Negative quantity")
-                skipped_count += 1
-                continue
-            
-            # Check for existing record
-            existing = db.query(models.SalesData).filter(
-                models.SalesData.product_id == product_id,
-                models.SalesData.sales_date == sales_date
-            ).first()
-            
-            if existing:
-                skipped_count += 1
-                continue
-            
-            # Create new sales record
-            sales_record = models.SalesData(
-                product_id=product_id,
-                sales_date=sales_date,
-                sales_quantity=sales_quantity,
-                created_at=datetime.utcnow()
-            )
-            db.add(sales_record)
-            imported_count += 1
-            
-        except Exception as e:
-            errors.append(f"Row {idx + 2}: {str(e)}")
-            skipped_count += 1
-            continue
+    _check_columns(df, product_id)
     
+    # Process and import data, all products in one transaction
     try:
+        imported_count, skipped_count, errors = _import_frame(
+            df, product_id, current_org.org_id, db, per_product
+        )
         db.commit()
     except Exception as e:
         db.rollback()
@@ -152,19 +441,30 @@ async def import_sales_from_excel(
             detail=f"Database error: {str(e)}"
         )
     
-    message = f"Successfully imported {imported_count} records"
-    if skipped_count > 0:
-        message += f", skipped {skipped_count} records"
-    if errors:
-        message += f". Errors: {'; '.join(errors[:5])}"  # Show first 5 errors
-    
     return ImportResponse(
         imported_count=imported_count,
         skipped_count=skipped_count,
-        message=message
+        message=_import_message(imported_count, skipped_count, errors),
+        products=_product_counts(per_product),
     )
 
 
+@router.get("/import/progress/{import_id}", response_model=ImportProgressResponse)
+def get_import_progress(
+    import_id: str,
+    current_org: models.Organization = Depends(get_current_org),
+):
+    """Row counters of a streaming import started by this organization"""
+    progress = import_progress.get(import_id, current_org.org_id)
+    if progress is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Import not found"
+        )
+    progress.pop("org_id")
+    return ImportProgressResponse(import_id=import_id, **progress)
+
+
 @router.post("/import/salesforce", response_model=ImportResponse)
 async def import_sales_from_salesforce(
     request: SalesforceImportRequest,
@@ -176,12 +476,7 @@ async def import_sales_from_salesforce(
     Fetches OpportunityLineItem records
     """
     # Verify product belongs to organization
-    product = db.query(models.Product).filter(
-        models.Product.product_id == request.product_id,
-        models.Product.org_id == current_org.org_id
-    ).first()
-    
-    if not product:
+    if get_product_org_id(db, request.product_id) != current_org.org_id:
         raise HTTPException(
             status_code=404,
             detail="Product not found or does not belong to your organization"
@@ -251,6 +546,7 @@ async def import_sales_from_salesforce(
     # Process and import data
     imported_count = 0
     skipped_count = 0
+    added = []
     
     for record in records:
         try:
@@ -285,6 +581,7 @@ async def import_sales_from_salesforce(
                 created_at=datetime.utcnow()
             )
             db.add(sales_record)
+            added.append((sales_date, sales_quantity))
             imported_count += 1
             
         except Exception as e:
@@ -292,6 +589,7 @@ async def import_sales_from_salesforce(
             continue
     
     try:
+        record_sales(db, request.product_id, added=added)
         db.commit()
     except Exception as e:
         db.rollback()
@@ -309,26 +607,23 @@ async def import_sales_from_salesforce(
 
 # Optional: Get sales data for a product
 @router.get("/product/{product_id}", response_model=List[schemas.SalesDataRead])
-def get_product_sales(
+async def get_product_sales(
     product_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    page: SalesPageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
     current_org: models.Organization = Depends(get_current_org),
 ):
-    """Get all sales data for a specific product"""
+    """Get sales data for a specific product, newest first, one page at a time"""
     # Verify product belongs to organization
-    product = db.query(models.Product).filter(
-        models.Product.product_id == product_id,
-        models.Product.org_id == current_org.org_id
-    ).first()
-    
-    if not product:
+    if await get_product_org_id_async(db, product_id) != current_org.org_id:
         raise HTTPException(
             status_code=404,
             detail="Product not found or does not belong to your organization"
         )
     
-    sales_data = db.query(models.SalesData).filter(
+    query = select(models.SalesData).where(
         models.SalesData.product_id == product_id
-    ).order_by(models.SalesData.sales_date.desc()).all()
+    )
     
-    return sales_data
\ No newline at end of file
+    return await paginate_sales(db, query, page, response)
\ No newline at end of file
@@ -1,10 +1,13 @@
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
-from ..db import get_db
+from ..auth_cache import product_owner_cache
+from ..db import get_async_db, get_db
 from .auth import get_current_org
 
 router = APIRouter(prefix="/product", tags=["product"])
@@ -28,18 +31,19 @@ def create_product(
     db.add(product)
     db.commit()
     db.refresh(product)
+    product_owner_cache.invalidate(product.product_id)
     return product
 
 
 @router.get("/by_org/{org_id}", response_model=List[schemas.ProductRead])
-def list_products_by_org(
+async def list_products_by_org(
     org_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_org: models.Organization = Depends(get_current_org),
 ):
     if current_org.org_id != org_id:
         raise HTTPException(status_code=403, detail="Not authorized to view products for this organization")
-    products = db.query(models.Product).filter(models.Product.org_id == org_id).all()
-    return products
+    products = await db.scalars(select(models.Product).where(models.Product.org_id == org_id))
+    return products.all()
 
 
@@ -1,29 +1,100 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
-from ..db import get_db
+from ..agents.model_cache import fitted_model_cache
+from ..configs import config
+from ..auth_cache import get_product_org_id, get_product_org_id_async
+from ..db import get_async_db, get_db
+from ..rollups import PERIOD_TYPES, period_start_expression, record_sales
 from .auth import get_current_org
 
 router = APIRouter(prefix="/sales", tags=["sales"])
 
 
+class SalesPageParams:
+    """
+    Query parameters shared by the sales listings: ``limit``, an opaque
+    ``cursor`` from the previous page's ``X-Next-Cursor`` header, and an
+    inclusive ``from``/``to`` date range. Without ``limit`` or ``cursor``
+    every row is returned, as before pagination existed.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=config.sales_page_max_limit),
+        cursor: Optional[str] = Query(None),
+        from_date: Optional[date] = Query(None, alias="from"),
+        to_date: Optional[date] = Query(None, alias="to"),
+    ):
+        if limit is None and cursor:
+            limit = config.sales_page_limit
+        self.limit = limit
+        self.cursor = cursor
+        self.from_date = from_date
+        self.to_date = to_date
+
+
+def _encode_cursor(sales: models.SalesData) -> str:
+    return f"{sales.sales_date.isoformat()}.{sales.order_id}"
+
+
+def _decode_cursor(cursor: str):
+    try:
+        sales_date, order_id = cursor.split(".")
+        return date.fromisoformat(sales_date), int(order_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def paginate_sales(
+    db: AsyncSession, query: Select, page: SalesPageParams, response: Response
+) -> List[models.SalesData]:
+    """
+    Apply the date range and keyset pagination on (sales_date, order_id),
+    newest first, and set ``X-Next-Cursor`` when more rows follow.
+    """
+    if page.from_date is not None:
+        query = query.where(models.SalesData.sales_date >= page.from_date)
+    if page.to_date is not None:
+        query = query.where(models.SalesData.sales_date <= page.to_date)
+    if page.cursor:
+        last_date, last_order_id = _decode_cursor(page.cursor)
+        query = query.where(
+            or_(
+                models.SalesData.sales_date < last_date,
+                and_(
+                    models.SalesData.sales_date == last_date,
+                    models.SalesData.order_id < last_order_id,
+                ),
+            )
+        )
+
+    query = query.order_by(models.SalesData.sales_date.desc(), models.SalesData.order_id.desc())
+    if page.limit is not None:
+        query = query.limit(page.limit + 1)
+    rows = list((await db.scalars(query)).all())
+    if page.limit is not None and len(rows) > page.limit:
+        rows = rows[:page.limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1])
+    return rows
+
+
 @router.post("", response_model=schemas.SalesRead)
 def create_sales_entry(
     sales_in: schemas.SalesCreate,
     db: Session = Depends(get_db),
     current_org: models.Organization = Depends(get_current_org),
 ):
-    product = (
-        db.query(models.Product)
-        .filter(models.Product.product_id == sales_in.product_id)
-        .first()
-    )
-    if not product:
+    product_org_id = get_product_org_id(db, sales_in.product_id)
+    if product_org_id is None:
         raise HTTPException(status_code=400, detail="Product does not exist")
 
-    if product.org_id != current_org.org_id:
+    if product_org_id != current_org.org_id:
         raise HTTPException(
             status_code=403,
             detail="Not authorized to add sales for this product",
@@ -50,76 +121,167 @@ def create_sales_entry(
         sales_quantity=sales_in.sales_quantity,
     )
     db.add(sales)
+    record_sales(db, sales.product_id, added=[(sales.sales_date, sales.sales_quantity)])
     db.commit()
     db.refresh(sales)
     return sales
 
 
 @router.get("/by_product/{product_id}", response_model=List[schemas.SalesRead])
-def list_sales_by_product(
+async def list_sales_by_product(
     product_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    page: SalesPageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
     current_org: models.Organization = Depends(get_current_org),
 ):
-    product = (
-        db.query(models.Product)
-        .filter(models.Product.product_id == product_id)
-        .first()
-    )
-    if not product:
+    product_org_id = await get_product_org_id_async(db, product_id)
+    if product_org_id is None:
         raise HTTPException(status_code=404, detail="Product not found")
-    if product.org_id != current_org.org_id:
+    if product_org_id != current_org.org_id:
         raise HTTPException(status_code=403, detail="Not authorized to view sales for this product")
 
-    sales = (
-        db.query(models.SalesData)
-        .filter(models.SalesData.product_id == product_id)
-        .order_by(models.SalesData.sales_date.desc())
-        .all()
-    )
-    return sales
+    query = select(models.SalesData).where(models.SalesData.product_id == product_id)
+    return await paginate_sales(db, query, page, response)
 
 
 @router.get("/by_org/{org_id}", response_model=List[schemas.SalesRead])
-def list_sales_by_org(
+async def list_sales_by_org(
     org_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    page: SalesPageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
     current_org: models.Organization = Depends(get_current_org),
 ):
     if current_org.org_id != org_id:
         raise HTTPException(status_code=403, detail="Not authorized to view sales for this organization")
 
-    sales = (
-        db.query(models.SalesData)
+    query = (
+        select(models.SalesData)
         .join(models.Product, models.Product.product_id == models.SalesData.product_id)
-        .filter(models.Product.org_id == org_id)
-        .order_by(models.SalesData.sales_date.desc())
-        .all()
+        .where(models.Product.org_id == org_id)
     )
-    return sales
+    return await paginate_sales(db, query, page, response)
+
+
+PERIODS = ("day", "week", "month", "year")
+
+# Aggregates that can be answered from sales_rollup totals and counts
+ROLLUP_AGGREGATES = ("sum", "count", "avg")
+
+AGGREGATES = {
+    "sum": func.sum,
+    "avg": func.avg,
+    "count": func.count,
+    "min": func.min,
+    "max": func.max,
+}
+
+
+def _rollup_aggregate_query(
+    org_id: int,
+    period_type: str,
+    agg: str,
+    by_product: bool,
+    product_id: Optional[int],
+) -> Select:
+    """Monthly/yearly aggregates read from the pre-aggregated sales_rollup rows."""
+    rollup = models.SalesRollup
+    columns = [rollup.product_id.label("product_id")] if by_product else []
+    columns.append(rollup.period_start.label("period"))
+
+    if agg == "sum":
+        value = func.sum(rollup.total)
+    elif agg == "count":
+        value = func.sum(rollup.count)
+    else:
+        value = func.sum(rollup.total) * 1.0 / func.sum(rollup.count)
+
+    query = (
+        select(*columns, value.label("value"))
+        .join(models.Product, models.Product.product_id == rollup.product_id)
+        .where(models.Product.org_id == org_id, rollup.period_type == period_type)
+    )
+    if product_id is not None:
+        query = query.where(rollup.product_id == product_id)
+    return query.group_by(*columns).order_by(*columns)
+
+
+@router.get("/aggregate", response_model=List[schemas.SalesAggregateRow])
+async def aggregate_sales(
+    group_by: List[Literal["product", "day", "week", "month", "year"]] = Query(["product"]),
+    agg: Literal["sum", "avg", "count", "min", "max"] = "sum",
+    product_id: Optional[int] = None,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    db: AsyncSession = Depends(get_async_db),
+    current_org: models.Organization = Depends(get_current_org),
+):
+    """
+    Aggregate the organization's sales quantities in SQL. ``group_by`` may
+    be given twice to combine ``product`` with one period. Monthly and
+    yearly sums, counts and averages over the full history come from
+    sales_rollup.
+    """
+    periods = [key for key in group_by if key in PERIODS]
+    if len(periods) > 1:
+        raise HTTPException(status_code=400, detail="Group by at most one of day, week, month or year")
+
+    period_types = {period: period_type for period_type, period in PERIOD_TYPES.items()}
+    if (
+        periods and periods[0] in period_types
+        and agg in ROLLUP_AGGREGATES
+        and from_date is None and to_date is None
+    ):
+        query = _rollup_aggregate_query(
+            current_org.org_id, period_types[periods[0]], agg, "product" in group_by, product_id
+        )
+    else:
+        columns = []
+        if "product" in group_by:
+            columns.append(models.SalesData.product_id.label("product_id"))
+        if periods:
+            columns.append(period_start_expression(db.bind.dialect.name, periods[0]).label("period"))
+
+        value = AGGREGATES[agg](models.SalesData.sales_quantity).label("value")
+        query = (
+            select(*columns, value)
+            .join(models.Product, models.Product.product_id == models.SalesData.product_id)
+            .where(models.Product.org_id == current_org.org_id)
+        )
+        if product_id is not None:
+            query = query.where(models.SalesData.product_id == product_id)
+        if from_date is not None:
+            query = query.where(models.SalesData.sales_date >= from_date)
+        if to_date is not None:
+            query = query.where(models.SalesData.sales_date <= to_date)
+        if columns:
+            query = query.group_by(*columns).order_by(*columns)
+
+    return [
+        schemas.SalesAggregateRow(
+            product_id=getattr(row, "product_id", None),
+            period=getattr(row, "period", None),
+            value=float(row.value or 0),
+        )
+        for row in (await db.execute(query)).all()
+    ]
 
 
 @router.get("/{order_id}", response_model=schemas.SalesRead)
-def get_sales_entry(
+async def get_sales_entry(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_org: models.Organization = Depends(get_current_org),
 ):
-    sales = (
-        db.query(models.SalesData)
-        .filter(models.SalesData.order_id == order_id)
-        .first()
+    sales = await db.scalar(
+        select(models.SalesData).where(models.SalesData.order_id == order_id)
     )
     if not sales:
         raise HTTPException(status_code=404, detail="Sales entry not found")
     
     # Check authorization
-    product = (
-        db.query(models.Product)
-        .filter(models.Product.product_id == sales.product_id)
-        .first()
-    )
-    if product.org_id != current_org.org_id:
+    if await get_product_org_id_async(db, sales.product_id) != current_org.org_id:
         raise HTTPException(status_code=403, detail="Not authorized to view this sales entry")
     
     return sales
@@ -141,12 +303,7 @@ def update_sales_entry(
         raise HTTPException(status_code=404, detail="Sales entry not found")
     
     # Check authorization
-    product = (
-        db.query(models.Product)
-        .filter(models.Product.product_id == sales.product_id)
-        .first()
-    )
-    if product.org_id != current_org.org_id:
+    if get_product_org_id(db, sales.product_id) != current_org.org_id:
         raise HTTPException(status_code=403, detail="Not authorized to update this sales entry")
     
     # Check if updating date would create duplicate
@@ -167,13 +324,18 @@ def update_sales_entry(
             )
     
     # Update fields
+    previous = (sales.sales_date, sales.sales_quantity)
     if sales_update.sales_date is not None:
         sales.sales_date = sales_update.sales_date
     if sales_update.sales_quantity is not None:
         sales.sales_quantity = sales_update.sales_quantity
+    record_sales(
+        db, sales.product_id, added=[(sales.sales_date, sales.sales_quantity)], removed=[previous]
+    )
     
     db.commit()
     db.refresh(sales)
+    fitted_model_cache.invalidate(sales.product_id)
     return sales
 
 
@@ -192,14 +354,11 @@ def delete_sales_entry(
         raise HTTPException(status_code=404, detail="Sales entry not found")
     
     # Check authorization
-    product = (
-        db.query(models.Product)
-        .filter(models.Product.product_id == sales.product_id)
-        .first()
-    )
-    if product.org_id != current_org.org_id:
+    if get_product_org_id(db, sales.product_id) != current_org.org_id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this sales entry")
     
     db.delete(sales)
+    record_sales(db, sales.product_id, removed=[(sales.sales_date, sales.sales_quantity)])
     db.commit()
+    fitted_model_cache.invalidate(sales.product_id)
     return {"message": "Sales entry deleted successfully"}
\ No newline at end of file
@@ -1,5 +1,5 @@
 from datetime import date, datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Literal
 from decimal import Decimal
 
 from pydantic import BaseModel, Field
@@ -82,6 +82,13 @@ SalesCreate = SalesDataCreate
 SalesRead = SalesDataRead
 
 
+class SalesAggregateRow(BaseModel):
+    """One group of ``GET /sales/aggregate``; unused group keys are null"""
+    product_id: Optional[int] = None
+    period: Optional[date] = None  # first day of the day/week/month/year
+    value: float
+
+
 # ============= Forecast Schemas =============
 class ForecastRequest(BaseModel):
     product_id: int
@@ -98,6 +105,40 @@ class ForecastResponse(BaseModel):
 class ForecastNLPRequest(BaseModel):
     product_id: int
     query: str
+    # Defaults to FORECAST_SELECTION
+    model_selection: Optional[Literal["fallback", "tournament"]] = None
+    # Defaults to FORECAST_REPORT_MODE; "template" skips the LLM for the report
+    report_mode: Optional[Literal["llm", "template"]] = None
+    # Return per-node timings, row counts, token usage and the model choice
+    diagnostics: bool = False
+
+
+class ModelCandidate(BaseModel):
+    model: str
+    status: str  # 'ok', 'cached', 'failed' or 'timeout'
+    seconds: Optional[float] = None
+    holdout_mae: Optional[float] = None
+
+
+class LLMUsage(BaseModel):
+    calls: int
+    cache_hits: int = 0  # answered from the LLM cache, no network call
+    input_tokens: int
+    output_tokens: int
+
+
+class NodeDiagnostics(BaseModel):
+    wall_seconds: float
+    cpu_seconds: float  # thread CPU; model fits run in subprocesses and are not included
+    rows: Optional[int] = None
+    fast_path: Optional[bool] = None  # answered by the rule-based parser, no LLM call
+    llm: Optional[LLMUsage] = None
+    model_cache_hit: Optional[bool] = None
+    model: Optional[str] = None
+    selection: Optional[str] = None  # 'fallback' or 'tournament'
+    fallback_chain: Optional[List[str]] = None  # fallback mode: models tried, ending with the winner
+    fallback_reason: Optional[str] = None
+    report_source: Optional[str] = None  # 'llm' or 'template'
 
 
 class ChatbotResponse(BaseModel):
@@ -107,7 +148,30 @@ class ChatbotResponse(BaseModel):
     forecast: Optional[Dict[str, float]] = None
     periods: Optional[int] = None
     granularity: Optional[str] = None  # 'daily', 'monthly', or 'yearly'
+    model: Optional[str] = None  # 'prophet', 'arima', 'ets' or 'trend'
+    model_candidates: Optional[List[ModelCandidate]] = None  # tournament mode only
+    fallback_reason: Optional[str] = None  # set when a time limit ruled a model out
     report: Optional[str] = None
+    report_source: Optional[str] = None  # 'llm' or 'template'
+    diagnostics: Optional[Dict[str, NodeDiagnostics]] = None  # by node, when requested
+
+
+class BatchForecastRequest(BaseModel):
+    org_id: int
+    granularity: Literal["daily", "monthly", "yearly"] = "daily"
+    horizon: int = Field(30, ge=1, le=3660, description="Periods to forecast after each product's last date")
+
+
+class ForecastJobRead(BaseModel):
+    job_id: str
+    product_id: int
+    query: str
+    status: str  # 'queued', 'running', 'succeeded' or 'failed'
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[ChatbotResponse] = None
+    error: Optional[str] = None
 
 
 # ============= Auth Schemas =============
@@ -0,0 +1,179 @@
+"""
+Import and list endpoint timings through the ASGI app.
+
+Requests go through FastAPI's TestClient against a temporary SQLite
+database (dependencies overridden as in the tests), so the numbers cover
+validation, SQL and serialization but not the network. Run from backend/:
+
+    python -m benchmarks.bench_api --import-sizes 1000,10000 --requests 50
+"""
+
+import os
+
+# app.main creates tables on DATABASE_URL at import; keep it off the dev database
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+import argparse
+import json
+import statistics
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app import models
+from app.auth_cache import org_cache, product_owner_cache
+from app.db import Base, get_async_db, get_db, make_engine
+from app.main import app
+from app.routers.auth import get_current_org
+
+from .synthetic import SIZES, sales_file, seed_product
+
+IMPORT_SIZES = (1_000, 10_000, 50_000)
+
+MEDIA_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+}
+
+
+@contextmanager
+def bench_client() -> Iterator[tuple]:
+    """A TestClient on a fresh database file, plus its session factory."""
+    # ids restart in every database
+    org_cache.clear()
+    product_owner_cache.clear()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "api.db"
+        engine = make_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        # TestClient runs each request on a fresh event loop, so no pooled connections
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+        AsyncSession = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+        def override_get_db():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        async def override_get_async_db():
+            async with AsyncSession() as db:
+                yield db
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        app.dependency_overrides[get_current_org] = lambda: models.Organization(org_id=1, org_name="Bench Org")
+        try:
+            yield TestClient(app), Session
+        finally:
+            app.dependency_overrides.clear()
+            engine.dispose()
+
+
+def _latency_summary(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "requests": len(ordered),
+        "p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+    }
+
+
+def run_import(sizes: List[int], formats: List[str]) -> List[Dict[str, Any]]:
+    results = []
+    with bench_client() as (client, Session):
+        db = Session()
+        try:
+            seed_product(db, 1)  # creates the organization the imports run as
+            for fmt in formats:
+                for rows in sizes:
+                    contents = sales_file(rows, fmt)
+                    product = models.Product(org_id=1, product_name=f"Import {fmt} {rows}")
+                    db.add(product)
+                    db.commit()
+
+                    began = time.perf_counter()
+                    resp = client.post(
+                        "/api/sales/import/excel",
+                        data={"product_id": str(product.product_id)},
+                        files={"file": (f"sales.{fmt}", contents, MEDIA_TYPES[fmt])},
+                    )
+                    seconds = time.perf_counter() - began
+                    body = resp.json()
+                    results.append({
+                        "format": fmt,
+                        "rows": rows,
+                        "file_bytes": len(contents),
+                        "status_code": resp.status_code,
+                        "imported": body.get("imported_count"),
+                        "seconds": round(seconds, 4),
+                        "rows_per_second": round(rows / seconds),
+                    })
+        finally:
+            db.close()
+    return results
+
+
+def run_endpoints(sizes: List[int], requests: int) -> List[Dict[str, Any]]:
+    results = []
+    with bench_client() as (client, Session):
+        db = Session()
+        try:
+            product_ids = {rows: seed_product(db, rows, seed=rows)[1] for rows in sizes}
+        finally:
+            db.close()
+
+        def time_requests(name: str, url: str, **extra: Any) -> None:
+            samples = []
+            for _ in range(requests):
+                began = time.perf_counter()
+                resp = client.get(url)
+                samples.append(time.perf_counter() - began)
+                if resp.status_code != 200:
+                    raise RuntimeError(f"GET {url} answered {resp.status_code}: {resp.text}")
+            results.append({"endpoint": name, "url": url, **extra, **_latency_summary(samples)})
+
+        time_requests("products_by_org", "/product/by_org/1")
+        time_requests("sales_by_org", "/sales/by_org/1")
+        time_requests("aggregate_product", "/sales/aggregate?group_by=product")
+        time_requests("aggregate_month_rollup", "/sales/aggregate?group_by=product&group_by=month")
+        time_requests("aggregate_week", "/sales/aggregate?group_by=week")
+        for rows, product_id in product_ids.items():
+            time_requests("sales_by_product", f"/sales/by_product/{product_id}", rows=rows)
+            time_requests("sales_by_product_max_page", f"/sales/by_product/{product_id}?limit=5000", rows=rows)
+            time_requests("import_product_sales", f"/api/sales/product/{product_id}", rows=rows)
+    return results
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--import-sizes", default=",".join(str(s) for s in IMPORT_SIZES))
+    parser.add_argument("--import-formats", default="xlsx,csv")
+    parser.add_argument("--endpoint-sizes", default=",".join(str(s) for s in SIZES), help="rows per seeded product")
+    parser.add_argument("--requests", type=int, default=50, help="requests per endpoint")
+
+
+def run_from_args(args: argparse.Namespace) -> Dict[str, List[Dict[str, Any]]]:
+    return {
+        "import": run_import([int(s) for s in args.import_sizes.split(",")], args.import_formats.split(",")),
+        "endpoints": run_endpoints([int(s) for s in args.endpoint_sizes.split(",")], args.requests),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_arguments(parser)
+    print(json.dumps(run_from_args(parser.parse_args()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
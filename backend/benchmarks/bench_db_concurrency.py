@@ -0,0 +1,153 @@
+"""
+Read latency during a bulk import, default engine vs. the tuned profile.
+
+A writer process bulk-inserts sales rows in committed chunks (as the
+importer does) while reader processes, standing in for API workers,
+repeatedly load another product's series (as filter_data_agent does).
+Run from backend/:
+
+    python -m benchmarks.bench_db_concurrency --rows 200000 --readers 4
+"""
+
+from datetime import date, timedelta
+from pathlib import Path
+import argparse
+import multiprocessing
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.db import Base, make_engine
+
+SEED_DAYS = 3 * 365
+
+
+def _seed(Session, products: int) -> None:
+    db = Session()
+    org = models.Organization(org_name="Bench Org", password_hash="x")
+    db.add(org)
+    db.commit()
+    db.add_all(models.Product(org_id=org.org_id, product_name=f"P{i}") for i in range(products + 1))
+    db.commit()
+    start = date(2020, 1, 1)
+    for product_id in range(2, products + 2):
+        db.execute(insert(models.SalesData), [
+            {"product_id": product_id, "sales_date": start + timedelta(days=d), "sales_quantity": d % 50 + 1}
+            for d in range(SEED_DAYS)
+        ])
+    db.commit()
+    db.close()
+
+
+def _sessions(url: str, tuned: bool):
+    return sessionmaker(bind=make_engine(url, tuned=tuned), autoflush=False)
+
+
+def _writer(url: str, tuned: bool, rows: int, chunk: int, started, done, results) -> None:
+    Session = _sessions(url, tuned)
+    db = Session()
+    start = date(1900, 1, 1)
+    error = None
+    started.wait()
+    began = time.perf_counter()
+    try:
+        for offset in range(0, rows, chunk):
+            db.execute(insert(models.SalesData), [
+                {"product_id": 1, "sales_date": start + timedelta(days=d), "sales_quantity": 1}
+                for d in range(offset, min(offset + chunk, rows))
+            ])
+            db.commit()
+    except Exception as e:
+        error = str(e)
+    finally:
+        db.close()
+        done.set()
+    results.put(("writer", time.perf_counter() - began, error))
+
+
+def _reader(url: str, tuned: bool, product_id: int, started, done, results) -> None:
+    Session = _sessions(url, tuned)
+    latencies, errors = [], 0
+    started.wait()
+    while not done.is_set():
+        db = Session()
+        began = time.perf_counter()
+        try:
+            db.query(models.SalesData.sales_date, models.SalesData.sales_quantity).filter(
+                models.SalesData.product_id == product_id
+            ).order_by(models.SalesData.sales_date).all()
+            latencies.append((time.perf_counter() - began) * 1000)
+        except Exception:
+            errors += 1
+        finally:
+            db.close()
+    results.put(("reader", latencies, errors))
+
+
+def run(tuned: bool, rows: int, chunk: int, readers: int) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        engine = make_engine(url, tuned=tuned)
+        Base.metadata.create_all(bind=engine)
+        _seed(sessionmaker(bind=engine, autoflush=False), readers)
+        engine.dispose()
+
+        started, done, results = ctx.Event(), ctx.Event(), ctx.Queue()
+        processes = [ctx.Process(target=_writer, args=(url, tuned, rows, chunk, started, done, results))]
+        processes += [
+            ctx.Process(target=_reader, args=(url, tuned, product_id, started, done, results))
+            for product_id in range(2, readers + 2)
+        ]
+        for process in processes:
+            process.start()
+        time.sleep(2)  # let every process import and connect before the clock starts
+        started.set()
+
+        write_seconds, write_error, latencies, read_errors = 0.0, None, [], 0
+        for _ in processes:
+            kind, *payload = results.get()
+            if kind == "writer":
+                write_seconds, write_error = payload
+            else:
+                latencies.extend(payload[0])
+                read_errors += payload[1]
+        for process in processes:
+            process.join()
+
+    latencies.sort()
+    return {
+        "profile": "tuned" if tuned else "default",
+        "write_seconds": round(write_seconds, 2),
+        "write_error": write_error,
+        "reads": len(latencies),
+        "read_errors": read_errors,
+        "read_p50_ms": round(statistics.median(latencies), 2) if latencies else None,
+        "read_p95_ms": round(latencies[int(len(latencies) * 0.95)], 2) if latencies else None,
+        "read_max_ms": round(latencies[-1], 2) if latencies else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000, help="rows written by the bulk import")
+    parser.add_argument("--chunk", type=int, default=5_000, help="rows per committed chunk")
+    parser.add_argument("--readers", type=int, default=4, help="concurrent reader processes")
+    args = parser.parse_args()
+
+    for tuned in (False, True):
+        result = run(tuned, args.rows, args.chunk, args.readers)
+        print(
+            f"{result['profile']:>8}: import {result['write_seconds']}s"
+            f"{' (failed: ' + result['write_error'] + ')' if result['write_error'] else ''}, "
+            f"{result['reads']} reads, {result['read_errors']} errors, "
+            f"p50 {result['read_p50_ms']} ms, p95 {result['read_p95_ms']} ms, max {result['read_max_ms']} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+LLM call throughput with one shared ChatGroq vs. a new client per call.
+
+Runs against benchmarks/fake_llm_server (started in-process unless --url
+is given), so no Groq key or network is needed. "unpooled" builds a
+ChatGroq for every call as get_llm() used to; "pooled" reuses the
+process-wide client and its keep-alive connections. Run from backend/:
+
+    python -m benchmarks.bench_llm_client --calls 200 --concurrency 8 --connect-latency 0.03
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+import argparse
+import json
+import statistics
+import time
+
+from app.agents import tools
+from app.configs import config
+
+from .fake_llm_server import FakeLLMServer
+
+PROMPT = "Summarize this day-level demand forecast for a manufacturing analyst."
+
+
+def _run(make_llm, calls: int, concurrency: int) -> Dict[str, Any]:
+    def call(_):
+        began = time.perf_counter()
+        make_llm().invoke(PROMPT)
+        return time.perf_counter() - began
+
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = sorted(executor.map(call, range(calls)))
+    seconds = time.perf_counter() - began
+    return {
+        "calls": calls,
+        "seconds": round(seconds, 3),
+        "calls_per_second": round(calls / seconds, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[min(calls - 1, int(calls * 0.95))] * 1000, 2),
+    }
+
+
+def run(
+    calls: int,
+    concurrency: int,
+    latency: float,
+    connect_latency: float,
+    url: Optional[str] = None,
+) -> Dict[str, Any]:
+    server = None
+    if url is None:
+        server = FakeLLMServer(latency=latency, connect_latency=connect_latency).start()
+        url = server.url
+    config.groq_api_key = config.groq_api_key or "benchmark"
+    config.groq_base_url = url
+    config.llm_max_connections = max(config.llm_max_connections, concurrency)
+
+    results = {}
+    try:
+        for mode, make_llm in (("unpooled", tools.build_llm), ("pooled", tools.get_llm)):
+            before = dict(server.stats) if server else None
+            results[mode] = _run(make_llm, calls, concurrency)
+            if server:
+                results[mode]["connections"] = server.stats["connections"] - before["connections"]
+    finally:
+        tools.shared_llm.close()
+        if server:
+            server.stop()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.02, help="fake server seconds per answer")
+    parser.add_argument("--connect-latency", type=float, default=0.03, help="fake server seconds per new connection")
+    parser.add_argument("--url", default=None, help="an already running fake server (or any Groq-compatible API)")
+    args = parser.parse_args()
+    print(json.dumps(run(args.calls, args.concurrency, args.latency, args.connect_latency, args.url), indent=2))
+
+
+if __name__ == "__main__":
+    main()
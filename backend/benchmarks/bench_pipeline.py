@@ -0,0 +1,167 @@
+"""
+Per-node timings of demand_forecast_workflow on synthetic daily series.
+
+Each size gets its own product in a temporary SQLite database. The nodes
+run in graph order (extract_params before fetch_data, as when they race)
+with a stub LLM, then the whole compiled graph is invoked once more;
+the fitted-model cache is cleared before every run. Run from backend/:
+
+    python -m benchmarks.bench_pipeline --sizes 1000,10000 --fit-timeout 30
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import argparse
+import json
+import logging
+import statistics
+import tempfile
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from app.agents import forecast_graph, forecasters
+from app.agents.executor import run_in_subprocess
+from app.agents.model_cache import fitted_model_cache
+from app.configs import config
+from app.db import Base, make_engine
+
+from .synthetic import SIZES, seed_product
+
+# Graph order; the conversational branch is not taken for forecast queries
+NODES = (
+    "classify_query_agent",
+    "extract_params_agent",
+    "fetch_data_agent",
+    "filter_data_agent",
+    "preprocess_agent",
+    "arima_agent",
+    "report_agent",
+)
+
+DEFAULT_QUERY = "forecast the next 30 days"
+
+
+class StubLLM:
+    """Canned answers for each prompt the graph sends, after an optional fixed latency."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def invoke(self, prompt: Any) -> str:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        text = str(prompt)
+        if "is_forecast_request" in text:
+            return '{"is_forecast_request": true}'
+        if "start_horizon" in text:
+            return '{"start_horizon": 1, "end_horizon": 30, "single_day": false, "granularity": "daily"}'
+        return "Demand is expected to stay close to recent levels with the usual weekly pattern."
+
+    async def ainvoke(self, prompt: Any) -> str:
+        return self.invoke(prompt)
+
+
+def _run_nodes(product_id: int, query: str) -> Dict[str, Any]:
+    state: Dict[str, Any] = {"product_id": product_id, "user_query": query}
+    timings = {}
+    for node in NODES:
+        began = time.perf_counter()
+        update = getattr(forecast_graph, node)(state)
+        timings[node] = time.perf_counter() - began
+        state.update(update or {})
+    return {"timings": timings, "state": state}
+
+
+def run(
+    sizes: List[int],
+    query: str = DEFAULT_QUERY,
+    repeat: int = 1,
+    llm_latency: float = 0.0,
+    candidates: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    llm = StubLLM(llm_latency)
+    forecast_graph.get_llm = lambda: llm
+    if candidates:
+        forecasters.CANDIDATES = tuple(candidates)
+    if forecasters.candidate_time_limit() is not None:
+        # Start the fitting forkserver and its preloaded libraries outside the timings
+        run_in_subprocess(len, (), timeout=300)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{Path(tmp) / 'pipeline.db'}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        forecast_graph.SessionLocal = Session
+
+        for rows in sizes:
+            db = Session()
+            try:
+                _, product_id = seed_product(db, rows, seed=rows)
+            finally:
+                db.close()
+
+            node_runs, workflow_runs = [], []
+            for _ in range(repeat):
+                fitted_model_cache.clear()
+                node_runs.append(_run_nodes(product_id, query))
+
+                fitted_model_cache.clear()
+                began = time.perf_counter()
+                forecast_graph.get_workflow().invoke({"product_id": product_id, "user_query": query})
+                workflow_runs.append(time.perf_counter() - began)
+
+            state = node_runs[-1]["state"]
+            results.append({
+                "rows": rows,
+                "nodes_seconds": {
+                    node: round(statistics.median(run["timings"][node] for run in node_runs), 4)
+                    for node in NODES
+                },
+                "nodes_total_seconds": round(
+                    statistics.median(sum(run["timings"].values()) for run in node_runs), 4
+                ),
+                "workflow_seconds": round(statistics.median(workflow_runs), 4),
+                "model": state.get("forecast_model"),
+                "fallback_reason": state.get("fallback_reason"),
+                "forecast_periods": len(state.get("forecast") or {}),
+            })
+        engine.dispose()
+    return results
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--sizes", default=",".join(str(s) for s in SIZES), help="comma-separated row counts")
+    parser.add_argument("--query", default=DEFAULT_QUERY)
+    parser.add_argument("--repeat", type=int, default=1, help="runs per size (median reported)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="seconds the stub LLM sleeps per call")
+    parser.add_argument("--candidates", default=None, help="comma-separated subset of prophet,arima,ets")
+    parser.add_argument("--fit-timeout", type=float, default=60, help="FORECAST_CANDIDATE_TIMEOUT for the run")
+    parser.add_argument("--time-budget", type=float, default=120, help="FORECAST_TIME_BUDGET for the run")
+
+
+def run_from_args(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    config.forecast_candidate_timeout = args.fit_timeout
+    config.forecast_time_budget = args.time_budget
+    return run(
+        [int(size) for size in args.sizes.split(",")],
+        query=args.query,
+        repeat=args.repeat,
+        llm_latency=args.llm_latency,
+        candidates=args.candidates.split(",") if args.candidates else None,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_arguments(parser)
+    args = parser.parse_args()
+    logging.getLogger("forecast_workflow").setLevel(logging.WARNING)
+    print(json.dumps(run_from_args(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
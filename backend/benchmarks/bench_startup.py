@@ -0,0 +1,73 @@
+"""
+API worker startup: time and peak RSS of ``import app.main``.
+
+Each run is a fresh interpreter, so nothing is served from sys.modules.
+Also reports the one-off cost the first forecast request now pays to
+import and compile the forecast graph. Run from backend/:
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+
+from pathlib import Path
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+CHILD = """
+import json, resource, sys, time
+
+began = time.perf_counter()
+import app.main
+import_seconds = time.perf_counter() - began
+import_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+heavy = [m for m in ("langgraph", "langchain_core", "statsmodels", "pmdarima", "prophet") if m in sys.modules]
+
+began = time.perf_counter()
+from app.agents.forecast_graph import get_workflow
+get_workflow()
+graph_seconds = time.perf_counter() - began
+
+print(json.dumps({
+    "import_seconds": import_seconds,
+    "import_rss_mib": import_rss / 1024,
+    "graph_seconds": graph_seconds,
+    "heavy_modules_at_import": heavy,
+}))
+"""
+
+
+def run_once() -> dict:
+    # In-memory database: importing app.main runs create_all
+    env = {**os.environ, "DATABASE_URL": "sqlite:///:memory:", "FORECAST_WARMUP": "false"}
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to time")
+    args = parser.parse_args()
+
+    results = [run_once() for _ in range(args.runs)]
+    print(
+        f"import app.main: median {statistics.median(r['import_seconds'] for r in results):.2f}s, "
+        f"peak RSS {statistics.median(r['import_rss_mib'] for r in results):.0f} MiB"
+    )
+    print(f"first forecast graph compile: median {statistics.median(r['graph_seconds'] for r in results):.2f}s")
+    print(f"heavy modules loaded at import: {', '.join(results[0]['heavy_modules_at_import']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Local stand-in for the Groq chat completions API.
+
+Answers ``POST /openai/v1/chat/completions`` after a fixed latency with
+the same canned replies as the pipeline benchmark's stub LLM, and counts
+requests and TCP connections so pooled and unpooled clients can be
+compared offline; ``--connect-latency`` stands in for the TCP/TLS
+handshake every new connection pays. With ``--max-concurrent``, requests
+beyond that many in flight get a 429 with ``retry-after-ms``, like Groq's
+rate limiter. Point the backend at it with ``GROQ_BASE_URL`` (any
+``GROQ_API_KEY`` works):
+
+    python -m benchmarks.fake_llm_server --port 8099 --latency 0.05
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Dict, Optional
+import argparse
+import json
+import time
+
+COMPLETIONS_PATH = "/openai/v1/chat/completions"
+
+
+def canned_answer(prompt: str) -> str:
+    if "is_forecast_request" in prompt:
+        return '{"is_forecast_request": true}'
+    if "start_horizon" in prompt:
+        return '{"start_horizon": 1, "end_horizon": 30, "single_day": false, "granularity": "daily"}'
+    return "Demand is expected to stay close to recent levels with the usual weekly pattern."
+
+
+class FakeLLMServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        connect_latency: float = 0.0,
+        max_concurrent: int = 0,
+        retry_after_ms: int = 50,
+        rate_limited: int = 0,
+    ):
+        """``rate_limited``: answer that many first requests with 429 regardless of load."""
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.max_concurrent = max_concurrent
+        self.retry_after_ms = retry_after_ms
+        self.rate_limited = rate_limited
+        self._lock = Lock()
+        self._in_flight = 0
+        self.stats: Dict[str, int] = {"connections": 0, "requests": 0, "rate_limited": 0}
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _admit(self) -> bool:
+        with self._lock:
+            self.stats["requests"] += 1
+            if self.rate_limited > 0 or (self.max_concurrent and self._in_flight >= self.max_concurrent):
+                self.rate_limited = max(self.rate_limited - 1, 0)
+                self.stats["rate_limited"] += 1
+                return False
+            self._in_flight += 1
+            return True
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, so pooled clients reuse one connection
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.stats["connections"] += 1
+                if server.connect_latency:
+                    time.sleep(server.connect_latency)
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status: int, body: dict, headers: Optional[Dict[str, str]] = None) -> None:
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if self.path != COMPLETIONS_PATH:
+                    self._reply(404, {"error": {"message": f"no route {self.path}"}})
+                    return
+                if not server._admit():
+                    self._reply(
+                        429,
+                        {"error": {"message": "Rate limit reached", "type": "tokens", "code": "rate_limit_exceeded"}},
+                        {"retry-after-ms": str(server.retry_after_ms)},
+                    )
+                    return
+                try:
+                    if server.latency:
+                        time.sleep(server.latency)
+                    prompt = " ".join(str(m.get("content", "")) for m in request.get("messages", []))
+                    answer = canned_answer(prompt)
+                    prompt_tokens, completion_tokens = len(prompt.split()), len(answer.split())
+                    self._reply(200, {
+                        "id": f"chatcmpl-fake-{server.stats['requests']}",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": request.get("model", "fake"),
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": answer},
+                            "finish_reason": "stop",
+                        }],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": completion_tokens,
+                            "total_tokens": prompt_tokens + completion_tokens,
+                        },
+                    })
+                finally:
+                    server._release()
+
+        return Handler
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = Thread(target=self._httpd.serve_forever, name="fake-llm-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds before each answer")
+    parser.add_argument("--connect-latency", type=float, default=0.0, help="seconds added to each new connection")
+    parser.add_argument("--max-concurrent", type=int, default=0, help="429 beyond this many requests in flight (0: never)")
+    args = parser.parse_args()
+
+    server = FakeLLMServer(args.host, args.port, args.latency, args.connect_latency, args.max_concurrent)
+    print(f"Fake Groq API on {server.url} (GROQ_BASE_URL={server.url})")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.stats))
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Run the pipeline and API benchmarks and write one JSON report.
+
+Compare against the report of a previous release with ``--baseline``;
+any timing more than ``--threshold`` times slower is listed and the exit
+status is 1. Run from backend/:
+
+    python -m benchmarks.run_suite --output bench-results/1.4.0.json
+    python -m benchmarks.run_suite --output new.json --baseline bench-results/1.4.0.json
+"""
+
+import os
+
+# app.main creates tables on DATABASE_URL at import; keep it off the dev database
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+
+from . import bench_api, bench_pipeline
+
+# Differences below this are noise whatever the ratio
+MIN_SECONDS = 0.005
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def flatten(report: Dict[str, Any]) -> Dict[str, float]:
+    """``{metric name: seconds}`` for every timing in a report."""
+    metrics = {}
+    for result in report.get("pipeline", []):
+        prefix = f"pipeline/{result['rows']}"
+        for node, seconds in result["nodes_seconds"].items():
+            metrics[f"{prefix}/{node}"] = seconds
+        metrics[f"{prefix}/workflow"] = result["workflow_seconds"]
+    for result in report.get("import", []):
+        metrics[f"import/{result['format']}/{result['rows']}"] = result["seconds"]
+    for result in report.get("endpoints", []):
+        name = result["endpoint"] + (f"/{result['rows']}" if "rows" in result else "")
+        metrics[f"endpoints/{name}/p50"] = result["p50_ms"] / 1000
+        metrics[f"endpoints/{name}/p95"] = result["p95_ms"] / 1000
+    return metrics
+
+
+def regressions(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Tuple[str, float, float]]:
+    """``(metric, baseline seconds, current seconds)`` for timings slower than ``threshold`` x baseline."""
+    before, after = flatten(baseline), flatten(current)
+    return [
+        (name, before[name], after[name])
+        for name in sorted(before.keys() & after.keys())
+        if after[name] > before[name] * threshold and after[name] - before[name] > MIN_SECONDS
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", default="bench-results.json", help="where to write the JSON report")
+    parser.add_argument("--baseline", default=None, help="previous report to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as a regression")
+    parser.add_argument("--skip-pipeline", action="store_true")
+    parser.add_argument("--skip-api", action="store_true")
+    bench_pipeline.add_arguments(parser)
+    bench_api.add_arguments(parser)
+    args = parser.parse_args()
+    logging.getLogger("forecast_workflow").setLevel(logging.WARNING)
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        }
+    }
+    if not args.skip_pipeline:
+        report["pipeline"] = bench_pipeline.run_from_args(args)
+    if not args.skip_api:
+        report.update(bench_api.run_from_args(args))
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, default=str))
+    print(f"Wrote {output}")
+
+    if args.baseline:
+        slower = regressions(json.loads(Path(args.baseline).read_text()), report, args.threshold)
+        for name, before, after in slower:
+            print(f"REGRESSION {name}: {before * 1000:.1f} ms -> {after * 1000:.1f} ms ({after / before:.2f}x)")
+        if slower:
+            sys.exit(1)
+        print(f"No timing more than {args.threshold}x slower than {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
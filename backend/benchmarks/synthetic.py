@@ -0,0 +1,69 @@
+"""
+Synthetic sales data shared by the benchmarks.
+
+Daily quantities with a slow upward trend, weekly and yearly seasonality
+and Gaussian noise, always ending on the same date so runs are comparable.
+"""
+
+from datetime import date
+from typing import Tuple
+import io
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app import models
+from app.rollups import rebuild_rollups
+
+END_DATE = date(2024, 12, 31)
+
+# Row counts of the standard daily series
+SIZES = (1_000, 10_000, 100_000)
+
+
+def daily_sales(rows: int, seed: int = 0, end: date = END_DATE) -> pd.Series:
+    """``rows`` consecutive days of positive integer quantities ending at ``end``."""
+    index = pd.date_range(end=pd.Timestamp(end), periods=rows, freq="D", name="sales_date")
+    t = np.arange(rows)
+    rng = np.random.default_rng(seed)
+
+    weekly = 1 + 0.25 * np.sin(2 * np.pi * t / 7)
+    yearly = 1 + 0.35 * np.sin(2 * np.pi * index.dayofyear.to_numpy() / 365.25)
+    level = 100 + 0.01 * t
+    values = np.maximum(np.round(level * weekly * yearly + rng.normal(0, 8, rows)), 1)
+    return pd.Series(values, index=index, name="sales_quantity")
+
+
+def seed_product(db: Session, rows: int, seed: int = 0, org_name: str = "Bench Org") -> Tuple[int, int]:
+    """Insert an organization and one product with ``rows`` days of sales; returns (org_id, product_id)."""
+    org = db.query(models.Organization).filter(models.Organization.org_name == org_name).first()
+    if org is None:
+        org = models.Organization(org_name=org_name, password_hash="x")
+        db.add(org)
+        db.commit()
+    product = models.Product(org_id=org.org_id, product_name=f"Bench {rows} rows", sku=f"BENCH-{rows}-{seed}")
+    db.add(product)
+    db.commit()
+
+    series = daily_sales(rows, seed)
+    db.execute(insert(models.SalesData), [
+        {"product_id": product.product_id, "sales_date": day.date(), "sales_quantity": float(quantity)}
+        for day, quantity in series.items()
+    ])
+    rebuild_rollups(db, product.product_id)
+    db.commit()
+    return org.org_id, product.product_id
+
+
+def sales_file(rows: int, fmt: str = "xlsx", seed: int = 0) -> bytes:
+    """An import file with ``sales_date``/``sales_quantity`` columns, as users upload them."""
+    frame = daily_sales(rows, seed).reset_index()
+    frame["sales_date"] = frame["sales_date"].dt.date
+    buffer = io.BytesIO()
+    if fmt == "xlsx":
+        frame.to_excel(buffer, index=False)
+    else:
+        frame.to_csv(buffer, index=False)
+    return buffer.getvalue()
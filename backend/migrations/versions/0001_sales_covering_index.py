@@ -0,0 +1,31 @@
+"""covering index on sales_data(product_id, sales_date, sales_quantity)
+
+Tables are still created by ``Base.metadata.create_all`` at startup, which
+also creates this index on new databases; the migration brings existing
+databases up to date.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_sales_product_date_qty",
+        "sales_data",
+        ["product_id", "sales_date", "sales_quantity"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sales_product_date_qty", table_name="sales_data", if_exists=True)
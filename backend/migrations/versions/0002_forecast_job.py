@@ -0,0 +1,48 @@
+"""forecast_job table for queued forecasts, with the replayed request payload
+
+Databases created before the job queue get the whole table; those created
+by ``create_all`` before jobs stored their request get the ``payload``
+column, which ``create_all`` never adds to an existing table.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table("forecast_job"):
+        if "payload" not in {column["name"] for column in inspector.get_columns("forecast_job")}:
+            op.add_column("forecast_job", sa.Column("payload", sa.Text(), nullable=True))
+        return
+
+    op.create_table(
+        "forecast_job",
+        sa.Column("job_id", sa.String(), primary_key=True),
+        sa.Column("org_id", sa.Integer(), sa.ForeignKey("organization.org_id"), nullable=False),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("product.product_id"), nullable=False),
+        sa.Column("query", sa.Text(), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("result", sa.Text(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_forecast_job_org_id", "forecast_job", ["org_id"])
+    op.create_index("ix_forecast_job_status", "forecast_job", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_table("forecast_job")
@@ -0,0 +1,46 @@
+"""sales_rollup table of monthly/yearly totals, filled from sales_data
+
+Databases from before the rollups get the table; whether it was just
+created here or left empty by ``create_all``, it is then built once from
+the existing sales, in this migration's transaction rather than by every
+API worker at startup.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from app.rollups import ensure_rollups
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if not sa.inspect(op.get_bind()).has_table("sales_rollup"):
+        op.create_table(
+            "sales_rollup",
+            sa.Column("product_id", sa.Integer(), sa.ForeignKey("product.product_id"), primary_key=True),
+            sa.Column("period_type", sa.String(), primary_key=True),
+            sa.Column("period_start", sa.Date(), primary_key=True),
+            sa.Column("total", sa.Numeric(), nullable=False),
+            sa.Column("count", sa.Integer(), nullable=False),
+        )
+
+    # Joins the migration's transaction; alembic commits it
+    session = Session(bind=op.get_bind())
+    try:
+        ensure_rollups(session)
+    finally:
+        session.close()
+
+
+def downgrade() -> None:
+    op.drop_table("sales_rollup")
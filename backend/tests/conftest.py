@@ -0,0 +1,104 @@
+import os
+
+# Keep every test module off the on-disk development database, whichever
+# module happens to import app.configs first.
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+# Fit models in-process: tests monkeypatch the fitters, which a fitting
+# subprocess would not see. test_fit_timeouts covers the subprocess path.
+os.environ["FORECAST_CANDIDATE_TIMEOUT"] = "0"
+os.environ["FORECAST_TIME_BUDGET"] = "0"
+# No LLM answers persisted between runs; test_llm_cache uses its own file
+os.environ["LLM_CACHE_PATH"] = ""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app import models
+from app.db import Base, ThreadpoolSession, get_async_db, get_db
+
+
+class AppDatabase:
+    """
+    A throwaway SQLite file with the app's tables. ``client`` points the
+    app's ``get_db`` and ``get_async_db`` at it, and with ``org_id`` also
+    signs every request in as that organization. ``async_fallback`` serves
+    the async routes as ``get_async_db`` does without an async driver.
+    """
+
+    def __init__(self, path):
+        self.engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=self.engine)
+        self.session_factory = sessionmaker(bind=self.engine, autoflush=False)
+        # TestClient runs each request on a fresh event loop, so no pooled connections
+        self.async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+        self.async_session_factory = async_sessionmaker(bind=self.async_engine, expire_on_commit=False)
+        self.app = None
+
+    def add_org(self, org_name: str, *product_names: str) -> int:
+        db = self.session_factory()
+        try:
+            org = models.Organization(org_name=org_name, password_hash="x")
+            db.add(org)
+            db.commit()
+            for product_name in product_names:
+                db.add(models.Product(org_id=org.org_id, product_name=product_name))
+            db.commit()
+            return org.org_id
+        finally:
+            db.close()
+
+    def client(self, org_id=None, async_fallback: bool = False, **kwargs) -> TestClient:
+        # Imported here so the environment above is in place first
+        from app.main import app
+        from app.routers.auth import get_current_org
+
+        def override_get_db():
+            db = self.session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        async def override_get_async_db():
+            if async_fallback:
+                db = self.session_factory()
+                try:
+                    yield ThreadpoolSession(db)
+                finally:
+                    db.close()
+                return
+            async with self.async_session_factory() as db:
+                yield db
+
+        self.app = app
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        if org_id is not None:
+            app.dependency_overrides[get_current_org] = lambda: models.Organization(org_id=org_id, org_name="Test Org")
+        return TestClient(app, **kwargs)
+
+    def close(self) -> None:
+        if self.app is not None:
+            self.app.dependency_overrides.clear()
+        self.engine.dispose()
+
+
+@pytest.fixture
+def app_db(tmp_path):
+    database = AppDatabase(tmp_path / "app.db")
+    yield database
+    database.close()
+
+
+@pytest.fixture(autouse=True)
+def clear_auth_caches():
+    # Every test builds its own database, so ids repeat with different owners
+    from app.auth_cache import org_cache, product_owner_cache
+
+    org_cache.clear()
+    product_owner_cache.clear()
+    yield
@@ -0,0 +1,55 @@
+import time
+
+import pytest
+from sqlalchemy import event
+
+from app.auth_cache import TTLCache, org_cache, product_owner_cache
+from app.security import create_access_token
+
+
+@pytest.fixture
+def counted_client(app_db):
+    org_id = app_db.add_org("Auth Org", "Auth Product")
+
+    statements = []
+
+    @event.listens_for(app_db.async_engine.sync_engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    client = app_db.client(headers={"Authorization": f"Bearer {create_access_token({'sub': str(org_id)})}"})
+    return client, statements
+
+
+def test_repeat_requests_skip_org_and_product_lookups(counted_client):
+    client, statements = counted_client
+
+    assert client.get("/sales/by_product/1").status_code == 200
+    first = list(statements)
+    assert any("FROM organization" in s for s in first)
+    assert any("FROM product" in s for s in first)
+
+    statements.clear()
+    assert client.get("/sales/by_product/1").status_code == 200
+    assert not any("FROM organization" in s or "FROM product" in s for s in statements)
+    assert org_cache.stats()["hits"] == 1
+    assert product_owner_cache.stats()["hits"] == 1
+
+
+def test_unknown_product_is_not_cached(counted_client):
+    client, _ = counted_client
+    assert client.get("/sales/by_product/99").status_code == 404
+    assert product_owner_cache.get(99) is None
+
+
+def test_ttl_expiry_and_invalidate():
+    cache = TTLCache(maxsize=2, ttl=0.05)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("c", 3)
+    assert cache.get("a") is None  # evicted by size
+    cache.invalidate("b")
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    time.sleep(0.06)
+    assert cache.get("c") is None
@@ -0,0 +1,84 @@
+import asyncio
+import dataclasses
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.configs import config
+from app.db import (
+    Base,
+    ThreadpoolSession,
+    async_database_url,
+    async_session_factory,
+    engine_options,
+    make_async_engine,
+    make_engine,
+)
+
+
+def test_sqlite_file_engine_applies_pragmas(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == config.sqlite_busy_timeout_ms
+        assert conn.exec_driver_sql("PRAGMA cache_size").scalar() == -config.sqlite_cache_size_kib
+    assert engine.pool.size() == config.db_pool_size
+    engine.dispose()
+
+
+def test_profiles_per_backend():
+    settings = dataclasses.replace(config, db_pool_size=7, db_max_overflow=3, db_pool_pre_ping=True)
+
+    postgres = engine_options("postgresql+psycopg://u:p@db/app", settings)
+    assert postgres["pool_size"] == 7
+    assert postgres["max_overflow"] == 3
+    assert postgres["pool_pre_ping"] is True
+    assert postgres["connect_args"] == {"prepare_threshold": 5}
+    assert postgres["query_cache_size"] == settings.db_statement_cache_size
+
+    memory = engine_options("sqlite:///:memory:", settings)
+    assert "pool_size" not in memory
+    assert memory["connect_args"] == {"check_same_thread": False}
+
+
+def test_async_url_swaps_driver():
+    assert async_database_url("sqlite:///./app.db").drivername == "sqlite+aiosqlite"
+    assert async_database_url("postgresql+psycopg://u:p@db/app").drivername == "postgresql+asyncpg"
+    with pytest.raises(ValueError):
+        async_database_url("mysql://u:p@db/app")
+
+
+def test_async_engine_shares_the_sqlite_profile(tmp_path):
+    engine = make_async_engine(f"sqlite:///{tmp_path / 'async.db'}")
+
+    async def pragmas():
+        async with engine.connect() as conn:
+            journal_mode = (await conn.exec_driver_sql("PRAGMA journal_mode")).scalar()
+            busy_timeout = (await conn.exec_driver_sql("PRAGMA busy_timeout")).scalar()
+        await engine.dispose()
+        return journal_mode, busy_timeout
+
+    assert asyncio.run(pragmas()) == ("wal", config.sqlite_busy_timeout_ms)
+
+
+def test_backends_without_an_async_driver_fall_back_to_the_threadpool(tmp_path):
+    assert async_session_factory("mysql://u:p@db/app") is None
+
+    engine = make_engine(f"sqlite:///{tmp_path / 'fallback.db'}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(models.Organization(org_name="Fallback Org", password_hash="x"))
+    db.commit()
+    session = ThreadpoolSession(db)
+
+    async def queries():
+        names = (await session.scalars(select(models.Organization.org_name))).all()
+        org_id = await session.scalar(select(models.Organization.org_id))
+        return names, (await session.get(models.Organization, org_id)).org_name
+
+    assert asyncio.run(queries()) == (["Fallback Org"], "Fallback Org")
+    db.close()
+    engine.dispose()
@@ -0,0 +1,41 @@
+import time
+
+import pytest
+
+from app.agents.executor import ForecastPool, ForecastPoolSaturated
+
+
+def test_pool_rejects_work_beyond_queue_limit():
+    pool = ForecastPool(size=1, queue_limit=1)
+    try:
+        running = pool.submit(time.sleep, 0.5)
+        queued = pool.submit(time.sleep, 0)
+        with pytest.raises(ForecastPoolSaturated):
+            pool.submit(time.sleep, 0)
+
+        running.result(timeout=60)
+        queued.result(timeout=60)
+
+        # Slots are released by done-callbacks shortly after completion
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                follow_up = pool.submit(abs, -3)
+                break
+            except ForecastPoolSaturated:
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+        assert follow_up.result(timeout=60) == 3
+    finally:
+        pool.shutdown()
+
+
+def test_map_unordered_drains_more_jobs_than_queue_space():
+    pool = ForecastPool(size=2, queue_limit=0)
+    try:
+        jobs = ((i, (-i,)) for i in range(6))
+        results = {key: future.result() for key, future in pool.map_unordered(abs, jobs)}
+        assert results == {i: i for i in range(6)}
+    finally:
+        pool.shutdown()
+
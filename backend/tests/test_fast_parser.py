@@ -0,0 +1,61 @@
+from datetime import date
+
+from app.agents.fast_parser import (
+    classify_query,
+    fast_extract_params,
+    fast_path_stats,
+    parse_forecast_params,
+)
+
+LAST_DATE = date(2024, 12, 31)
+
+
+def _horizon(query):
+    params = parse_forecast_params(query, LAST_DATE)
+    assert params is not None, query
+    return params.start_horizon, params.end_horizon, params.granularity, params.single_day
+
+
+def test_relative_horizons():
+    assert _horizon("Forecast the next 30 days") == (1, 30, "daily", False)
+    assert _horizon("next 2 weeks please") == (1, 14, "daily", False)
+    assert _horizon("What will demand be tomorrow?") == (1, 1, "daily", True)
+    assert _horizon("forecast next 3 months") == (1, 3, "monthly", False)
+    assert _horizon("predict next month") == (1, 1, "monthly", False)
+    assert _horizon("next quarter") == (1, 3, "monthly", False)
+    assert _horizon("forecast for the next four years") == (1, 4, "yearly", False)
+
+
+def test_calendar_horizons():
+    assert _horizon("February 2025") == (2, 2, "monthly", True)
+    assert _horizon("forecast March to June 2025") == (3, 6, "monthly", False)
+    assert _horizon("all months of 2026") == (13, 24, "monthly", False)
+    assert _horizon("forecast for 2026") == (2, 2, "yearly", True)
+    assert _horizon("2025 to 2027") == (1, 3, "yearly", False)
+
+
+def test_ambiguous_queries_defer_to_llm():
+    for query in [
+        "forecast next 3 months based on data since 2023",
+        "daily forecast for the next 3 months",
+        "sales forecast for Q1 2025",
+        "forecast for 2025-03-15",
+        "forecast for March 2024",  # not after the last observed month
+        "hello there",
+    ]:
+        assert parse_forecast_params(query, LAST_DATE) is None, query
+
+
+def test_classification():
+    assert classify_query("Forecast the next 3 months").is_forecast_request
+    assert classify_query("What will we sell in March 2026?").is_forecast_request
+    assert classify_query("How were sales in 2023?") is None
+    assert classify_query("hi, who are you?") is None
+
+
+def test_hit_miss_counters():
+    fast_path_stats.reset()
+    fast_extract_params("next 7 days", LAST_DATE)
+    fast_extract_params("tell me a joke", LAST_DATE)
+    fast_extract_params("next month", LAST_DATE)
+    assert fast_path_stats.snapshot() == {"extract": {"hits": 2, "misses": 1}}
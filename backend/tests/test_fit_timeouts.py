@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from app.agents import forecasters
+from app.agents.executor import SubprocessTimeout, run_in_subprocess
+from app.configs import config
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_fit_limits_are_on_by_default():
+    # conftest turns them off for the suite; deployments get them unless they opt out
+    env = {k: v for k, v in os.environ.items() if k not in ("FORECAST_CANDIDATE_TIMEOUT", "FORECAST_TIME_BUDGET")}
+    code = "from app.configs import config; print(config.forecast_candidate_timeout, config.forecast_time_budget)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    candidate_timeout, time_budget = map(float, output.split())
+    assert candidate_timeout > 0 and time_budget > 0
+
+
+def test_subprocess_result_and_kill_at_deadline():
+    assert run_in_subprocess(divmod, 7, 2, timeout=30) == (3, 1)
+
+    began = time.monotonic()
+    with pytest.raises(SubprocessTimeout):
+        run_in_subprocess(time.sleep, 30, timeout=0.5)
+    assert time.monotonic() - began < 10
+
+    with pytest.raises(RuntimeError, match="ZeroDivisionError"):
+        run_in_subprocess(divmod, 1, 0, timeout=30)
+
+
+def test_spent_budget_falls_back_to_trend_and_says_why(monkeypatch):
+    monkeypatch.setattr(config, "forecast_time_budget", 1e-9)
+    dates = pd.date_range(start="2024-01-01", periods=30, freq="D")
+    series = pd.Series([10.0 + (i % 7) for i in range(30)], index=dates)
+
+    values, model_name, fitted_models, reason = forecasters.forecast_series(series, "daily", 1, 5)
+
+    assert model_name == "trend"
+    assert len(values) == 5
+    assert fitted_models == {}  # timeouts are not cached as failures
+    assert reason.startswith("prophet skipped")
+    assert "ets skipped" in reason
+
+
+def test_slow_fit_is_killed_and_the_chain_moves_on(monkeypatch):
+    monkeypatch.setattr(config, "forecast_candidate_timeout", 0.5)
+    monkeypatch.setattr(forecasters, "CANDIDATES", ("arima", "ets"))
+
+    def fit_within(name, series, granularity, timeout):
+        if name == "arima":
+            # Stands in for a runaway auto_arima search
+            return run_in_subprocess(time.sleep, 30, timeout=timeout)
+        return forecasters.fit_candidate(name, series, granularity)
+
+    monkeypatch.setattr(forecasters, "fit_candidate_within", fit_within)
+    dates = pd.date_range(start="2024-01-01", periods=60, freq="D")
+    series = pd.Series([10.0 + (i % 7) for i in range(60)], index=dates)
+
+    began = time.monotonic()
+    values, model_name, fitted_models, reason = forecasters.forecast_series(series, "daily", 1, 3)
+
+    assert model_name == "ets"
+    assert len(values) == 3
+    assert time.monotonic() - began < 10
+    assert "arima" not in fitted_models
+    assert reason == "arima timed out after 0.5s"
@@ -0,0 +1,242 @@
+from concurrent.futures import Future
+from datetime import date, timedelta
+import asyncio
+
+import json
+
+import pytest
+
+from langchain_core.messages import AIMessage
+
+from app import metrics, models
+from app.agents import batch, forecast_graph, forecasters
+from app.agents.model_cache import fitted_model_cache
+
+
+class InlinePool:
+    """Stands in for the forecast process pool; runs the fit in-process."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def run(self, fn, *args):
+        self.calls.append(fn.__name__)
+        return fn(*args)
+
+    def map_unordered(self, fn, jobs):
+        for key, args in jobs:
+            self.calls.append(fn.__name__)
+            future = Future()
+            future.set_result(fn(*args))
+            yield key, future
+
+
+@pytest.fixture
+def graph_db(app_db, monkeypatch):
+    monkeypatch.setattr(forecast_graph, "SessionLocal", app_db.session_factory)
+    # Prophet/auto_arima are slow on tiny synthetic series; ETS is enough here
+    monkeypatch.setattr(forecasters, "CANDIDATES", ("ets",))
+
+    app_db.add_org("Graph Org", "Graph Product")
+    product_id = 1
+    db = app_db.session_factory()
+    start = date(2024, 1, 1)
+    for i in range(60):
+        db.add(models.SalesData(
+            product_id=product_id,
+            sales_date=start + timedelta(days=i),
+            sales_quantity=20 + (i % 7),
+        ))
+    db.commit()
+    db.close()
+
+    fitted_model_cache.clear()
+    yield product_id
+    fitted_model_cache.clear()
+
+
+def test_fetch_and_extract_run_in_parallel(graph_db):
+    steps = {}
+    for event in forecast_graph.demand_forecast_workflow.stream(
+        {"product_id": graph_db, "user_query": "forecast the next 5 days"},
+        stream_mode="debug",
+    ):
+        if event["type"] == "task":
+            steps.setdefault(event["step"], set()).add(event["payload"]["name"])
+
+    ordered = [steps[k] for k in sorted(steps)]
+    assert ordered[0] == {"classify_query_agent"}
+    assert ordered[1] == {"fetch_data_agent", "extract_params_agent"}
+    assert ordered[2] == {"filter_data_agent"}
+
+
+def test_workflow_forecasts_from_last_sales_date(graph_db):
+    result = forecast_graph.demand_forecast_workflow.invoke(
+        {"product_id": graph_db, "user_query": "forecast the next 5 days"}
+    )
+
+    assert result["is_forecast_request"] is True
+    assert result["last_date"] == date(2024, 2, 29)
+    assert list(result["forecast"]) == [
+        (date(2024, 3, 1) + timedelta(days=i)).isoformat() for i in range(5)
+    ]
+    assert forecast_graph.fetch_last_date(graph_db) == date(2024, 2, 29)
+
+
+def test_workflow_records_node_diagnostics(graph_db, monkeypatch):
+    report = AIMessage(content="Steady demand.", usage_metadata={"input_tokens": 120, "output_tokens": 30, "total_tokens": 150})
+
+    class FakeLLM:
+        def invoke(self, prompt):
+            return report
+
+    monkeypatch.setattr(forecast_graph, "get_llm", lambda: FakeLLM())
+
+    result = forecast_graph.demand_forecast_workflow.invoke(
+        {"product_id": graph_db, "user_query": "forecast the next 5 days"}
+    )
+    diagnostics = result["diagnostics"]
+
+    assert set(diagnostics) == {
+        "classify_query_agent", "fetch_data_agent", "extract_params_agent",
+        "filter_data_agent", "preprocess_agent", "arima_agent", "report_agent",
+    }
+    assert all(entry["wall_seconds"] >= 0 and entry["cpu_seconds"] >= 0 for entry in diagnostics.values())
+    assert diagnostics["classify_query_agent"]["fast_path"] is True
+    assert diagnostics["fetch_data_agent"]["rows"] == 60
+    assert diagnostics["arima_agent"]["model"] == "ets"
+    assert diagnostics["arima_agent"]["fallback_chain"] == ["ets"]
+    assert diagnostics["arima_agent"]["model_cache_hit"] is False
+    assert diagnostics["report_agent"]["llm"] == {"calls": 1, "cache_hits": 0, "input_tokens": 120, "output_tokens": 30}
+
+
+def test_data_version_changes_when_a_sale_is_edited(graph_db):
+    version = forecast_graph.fetch_data_agent({"product_id": graph_db})["data_version"]
+
+    db = forecast_graph.SessionLocal()
+    sale = db.query(models.SalesData).filter(models.SalesData.product_id == graph_db).first()
+    sale.sales_quantity = 99
+    db.commit()
+    edited = forecast_graph.fetch_data_agent({"product_id": graph_db})["data_version"]
+
+    sale.sales_date = date(2023, 6, 1)
+    db.commit()
+    db.close()
+    moved = forecast_graph.fetch_data_agent({"product_id": graph_db})["data_version"]
+
+    assert len({version, edited, moved}) == 3
+    assert version[0] == edited[0] == moved[0] == 60
+
+
+def test_data_version_changes_when_quantities_are_swapped(graph_db):
+    version = forecast_graph.fetch_data_agent({"product_id": graph_db})["data_version"]
+
+    db = forecast_graph.SessionLocal()
+    first, last = (
+        db.query(models.SalesData)
+        .filter(models.SalesData.product_id == graph_db)
+        .order_by(models.SalesData.sales_date)
+        .all()[::59]
+    )
+    first.sales_quantity, last.sales_quantity = 10, 20
+    db.commit()
+    before = forecast_graph.fetch_data_agent({"product_id": graph_db})["data_version"]
+
+    first.sales_quantity, last.sales_quantity = 20, 10
+    db.commit()
+    db.close()
+    swapped = forecast_graph.fetch_data_agent({"product_id": graph_db})["data_version"]
+
+    assert before[:4] == swapped[:4]
+    assert len({version, before, swapped}) == 3
+
+
+@pytest.fixture
+def api_client(app_db, graph_db, monkeypatch):
+    pool = InlinePool()
+    monkeypatch.setattr(forecast_graph, "forecast_pool", pool)
+    monkeypatch.setattr(batch, "forecast_pool", pool)
+    return app_db.client(org_id=1)
+
+
+def test_async_workflow_offloads_fit(graph_db, monkeypatch):
+    pool = InlinePool()
+    monkeypatch.setattr(forecast_graph, "forecast_pool", pool)
+
+    result = asyncio.run(forecast_graph.async_demand_forecast_workflow.ainvoke(
+        {"product_id": graph_db, "user_query": "forecast the next 3 days"}
+    ))
+
+    assert pool.calls == ["forecast_series"]
+    assert len(result["forecast"]) == 3
+    assert result["forecast_model"] == "ets"
+
+
+def test_stream_emits_node_events_before_result(api_client, graph_db):
+    response = api_client.post(
+        "/forecast/stream",
+        json={"product_id": graph_db, "query": "forecast the next 4 days"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        event_line, data_line = block.split("\n")
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    names = [name for name, _ in events]
+
+    assert names[0] == "classify_query_agent"
+    assert names.index("arima_agent") < names.index("report_agent") < names.index("result")
+    assert dict(events)["fetch_data_agent"]["rows"] == 60
+    assert dict(events)["extract_params_agent"]["end_horizon"] == 4
+    assert dict(events)["arima_agent"]["model"] == "ets"
+    assert len(dict(events)["arima_agent"]["forecast"]) == 4
+    assert dict(events)["result"]["model"] == "ets"
+
+
+def test_batch_streams_one_line_per_product(api_client, graph_db):
+    db = forecast_graph.SessionLocal()
+    db.add(models.Product(org_id=1, product_name="No Sales"))
+    db.add(models.Product(org_id=2, product_name="Other Org"))
+    db.commit()
+    db.close()
+
+    response = api_client.post(
+        "/forecast/batch",
+        json={"org_id": 1, "granularity": "daily", "horizon": 3},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    by_name = {line["product_name"]: line for line in lines}
+    assert set(by_name) == {"Graph Product", "No Sales"}
+    assert by_name["No Sales"]["error"] == "No sales data"
+    assert by_name["Graph Product"]["model"] == "ets"
+    assert list(by_name["Graph Product"]["forecast"]) == ["2024-03-01", "2024-03-02", "2024-03-03"]
+
+    assert api_client.post("/forecast/batch", json={"org_id": 2}).status_code == 403
+
+
+def test_diagnostics_in_response_on_request_and_in_metrics(api_client, graph_db):
+    metrics.registry.reset()
+
+    plain = api_client.post("/forecast/forecast", json={"product_id": graph_db, "query": "forecast the next 3 days"})
+    assert plain.status_code == 200
+    assert plain.json()["diagnostics"] is None
+
+    response = api_client.post(
+        "/forecast/async",
+        json={"product_id": graph_db, "query": "forecast the next 3 days", "diagnostics": True},
+    )
+    assert response.status_code == 200
+    diagnostics = response.json()["diagnostics"]
+    assert diagnostics["preprocess_agent"]["rows"] == 60
+    assert diagnostics["arima_agent"]["model"] == "ets"
+    assert diagnostics["arima_agent"]["model_cache_hit"] is True
+
+    text = api_client.get("/metrics").text
+    assert 'forecast_node_duration_seconds_count{node="arima_agent"} 2' in text
+    assert 'forecast_node_rows_bucket{node="fetch_data_agent",le="100"} 2' in text
+    assert 'forecast_model_selected_total{model="ets",selection="fallback"} 2' in text
@@ -0,0 +1,166 @@
+from datetime import date
+
+import pytest
+
+from app import models
+
+
+@pytest.fixture
+def import_client(app_db):
+    org_id = app_db.add_org("Import Org", "Import Product")
+
+    db = app_db.session_factory()
+    db.add(models.SalesData(product_id=1, sales_date=date(2024, 1, 1), sales_quantity=5))
+    db.commit()
+    db.close()
+
+    return app_db.client(org_id=org_id), app_db.session_factory
+
+
+def _upload(client, csv_text, product_id=1):
+    return client.post(
+        "/api/sales/import/excel",
+        data={"product_id": str(product_id)},
+        files={"file": ("sales.csv", csv_text.encode(), "text/csv")},
+    )
+
+
+def test_csv_import_counts_match_row_rules(import_client):
+    client, session_factory = import_client
+    csv_text = "\n".join([
+        "sales_date,sales_quantity",
+        "2024-01-01,7",     # already stored
+        "2024-01-02,10",
+        "01/03/2024,0",     # other date format, zero is allowed
+        "2024-01-04,-3",    # negative
+        "not a date,4",     # unparseable date
+        "2024-01-05,lots",  # unparseable quantity
+        "2024-01-06,",      # missing quantity
+        "2024-01-02,11",    # repeated in the file
+    ])
+
+    resp = _upload(client, csv_text)
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["imported_count"] == 2
+    assert body["skipped_count"] == 6
+    assert "Row 5: Negative quantity" in body["message"]
+    assert "Row 6: Invalid date" in body["message"]
+    assert "Row 7: Invalid quantity" in body["message"]
+
+    db = session_factory()
+    rows = {
+        r.sales_date: float(r.sales_quantity)
+        for r in db.query(models.SalesData).filter(models.SalesData.product_id == 1)
+    }
+    db.close()
+    assert rows == {date(2024, 1, 1): 5.0, date(2024, 1, 2): 10.0, date(2024, 1, 3): 0.0}
+
+
+def test_reimporting_same_file_skips_everything(import_client):
+    client, _ = import_client
+    csv_text = "sales_date,sales_quantity\n" + "\n".join(
+        f"2024-02-{day:02d},{day}" for day in range(1, 29)
+    )
+
+    assert _upload(client, csv_text).json()["imported_count"] == 28
+    second = _upload(client, csv_text).json()
+    assert second["imported_count"] == 0
+    assert second["skipped_count"] == 28
+
+
+def test_streaming_import_commits_in_chunks(import_client):
+    client, session_factory = import_client
+    csv_text = "sales_date,sales_quantity\n" + "\n".join(
+        f"2024-03-{day:02d},{-1 if day == 4 else day}" for day in range(1, 11)
+    )
+
+    resp = client.post(
+        "/api/sales/import/excel",
+        data={"product_id": "1", "stream": "true", "chunk_size": "3", "import_id": "big-upload"},
+        files={"file": ("sales.csv", csv_text.encode(), "text/csv")},
+    )
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["import_id"] == "big-upload"
+    assert body["imported_count"] == 9
+    assert body["skipped_count"] == 1
+    assert "Row 5: Negative quantity" in body["message"]
+
+    progress = client.get("/api/sales/import/progress/big-upload").json()
+    assert progress == {
+        "import_id": "big-upload",
+        "status": "completed",
+        "rows_read": 10,
+        "imported_count": 9,
+        "skipped_count": 1,
+        "chunks": 4,
+    }
+    assert client.get("/api/sales/import/progress/unknown").status_code == 404
+
+    db = session_factory()
+    assert db.query(models.SalesData).filter(models.SalesData.product_id == 1).count() == 10
+    db.close()
+
+
+def test_streaming_import_rejects_excel(import_client):
+    client, _ = import_client
+    resp = client.post(
+        "/api/sales/import/excel",
+        data={"product_id": "1", "stream": "true"},
+        files={"file": ("sales.xlsx", b"not really excel", "application/octet-stream")},
+    )
+    assert resp.status_code == 400
+
+
+def test_one_file_imports_several_products(import_client):
+    client, session_factory = import_client
+    db = session_factory()
+    db.query(models.Product).filter(models.Product.product_id == 1).update({"sku": "SKU-A"})
+    db.add(models.Product(org_id=1, product_name="Second", sku="SKU-B"))
+    other_org = models.Organization(org_name="Other Org", password_hash="x")
+    db.add(other_org)
+    db.commit()
+    db.add(models.Product(org_id=other_org.org_id, product_name="Foreign", sku="SKU-X"))
+    db.commit()
+    db.close()
+
+    csv_text = "\n".join([
+        "sku,sales_date,sales_quantity",
+        "SKU-A,2024-01-01,1",   # already stored
+        "SKU-A,2024-01-02,2",
+        "SKU-B,2024-01-01,3",
+        "SKU-B,2024-01-02,-4",  # negative
+        "SKU-X,2024-01-01,5",   # other organization
+        "NOPE,2024-01-01,6",
+    ])
+    resp = client.post(
+        "/api/sales/import/excel",
+        files={"file": ("sales.csv", csv_text.encode(), "text/csv")},
+    )
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["imported_count"] == 2
+    assert body["skipped_count"] == 4
+    assert body["products"] == [
+        {"product_id": 1, "imported_count": 1, "skipped_count": 1},
+        {"product_id": 2, "imported_count": 1, "skipped_count": 1},
+    ]
+    assert "Row 6: Unknown product 'SKU-X'" in body["message"]
+
+    db = session_factory()
+    assert db.query(models.SalesData).filter(models.SalesData.product_id == 2).count() == 1
+    assert db.query(models.SalesData).filter(models.SalesData.product_id == 3).count() == 0
+    db.close()
+
+
+def test_product_required_without_product_column(import_client):
+    client, _ = import_client
+    resp = client.post(
+        "/api/sales/import/excel",
+        files={"file": ("sales.csv", b"sales_date,sales_quantity\n2024-01-02,1", "text/csv")},
+    )
+    assert resp.status_code == 400
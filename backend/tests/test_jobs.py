@@ -0,0 +1,140 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import models
+from app.jobs import ForecastJobRunner
+
+
+@pytest.fixture
+def session_factory(app_db):
+    app_db.add_org("Jobs Org", "Jobs Product")
+    return app_db.session_factory
+
+
+def _job(session_factory, job_id):
+    db = session_factory()
+    try:
+        return db.query(models.ForecastJob).filter(models.ForecastJob.job_id == job_id).one()
+    finally:
+        db.close()
+
+
+def test_job_result_is_stored(session_factory):
+    runner = ForecastJobRunner(
+        lambda job: {"product_id": job.product_id, "query": job.query},
+        max_workers=1,
+        session_factory=session_factory,
+    )
+    db = session_factory()
+    job = runner.create(db, org_id=1, product_id=1, query="next 3 days")
+    job_id = job.job_id
+    db.close()
+
+    runner._get_executor().shutdown(wait=True)
+
+    job = _job(session_factory, job_id)
+    assert job.status == "succeeded"
+    assert json.loads(job.result) == {"product_id": 1, "query": "next 3 days"}
+    assert job.started_at is not None and job.finished_at is not None
+
+
+def test_failed_job_records_error(session_factory):
+    def boom(job):
+        raise RuntimeError("fit exploded")
+
+    runner = ForecastJobRunner(boom, max_workers=1, session_factory=session_factory)
+    db = session_factory()
+    db.add(models.ForecastJob(job_id="j1", org_id=1, product_id=1, query="q"))
+    db.commit()
+    db.close()
+
+    runner.enqueue("j1").result(timeout=30)
+    job = _job(session_factory, "j1")
+    assert job.status == "failed"
+    assert job.error == "fit exploded"
+    runner.shutdown()
+
+
+def test_resume_pending_requeues_interrupted_jobs(session_factory):
+    db = session_factory()
+    db.add(models.ForecastJob(job_id="queued", org_id=1, product_id=1, query="q", status="queued"))
+    db.add(models.ForecastJob(job_id="running", org_id=1, product_id=1, query="q", status="running"))
+    db.add(models.ForecastJob(job_id="done", org_id=1, product_id=1, query="q", status="succeeded"))
+    db.commit()
+    db.close()
+
+    seen = []
+    runner = ForecastJobRunner(
+        lambda job: seen.append(job.job_id) or {},
+        max_workers=1,
+        session_factory=session_factory,
+    )
+    assert runner.resume_pending() == 2
+    runner._get_executor().shutdown(wait=True)
+
+    assert sorted(seen) == ["queued", "running"]
+    assert _job(session_factory, "running").status == "succeeded"
+    assert _job(session_factory, "done").status == "succeeded"
+
+
+def test_resume_pending_leaves_running_jobs_within_their_lease(session_factory):
+    now = datetime.utcnow()
+    db = session_factory()
+    db.add(models.ForecastJob(job_id="live", org_id=1, product_id=1, query="q", status="running", started_at=now))
+    db.add(models.ForecastJob(
+        job_id="orphaned", org_id=1, product_id=1, query="q", status="running",
+        started_at=now - timedelta(hours=1),
+    ))
+    db.commit()
+    db.close()
+
+    seen = []
+    runner = ForecastJobRunner(
+        lambda job: seen.append(job.job_id) or {},
+        max_workers=1,
+        session_factory=session_factory,
+        lease_seconds=600,
+    )
+    assert runner.resume_pending() == 1
+    runner._get_executor().shutdown(wait=True)
+
+    assert seen == ["orphaned"]
+    assert _job(session_factory, "live").status == "running"
+
+
+def test_job_runs_once_when_enqueued_twice(session_factory):
+    db = session_factory()
+    db.add(models.ForecastJob(job_id="j1", org_id=1, product_id=1, query="q"))
+    db.commit()
+    db.close()
+
+    seen = []
+    runner = ForecastJobRunner(
+        lambda job: seen.append(job.job_id) or {},
+        max_workers=2,
+        session_factory=session_factory,
+    )
+    # As when two workers both resume the same queued job
+    runner._run("j1")
+    runner._run("j1")
+
+    assert seen == ["j1"]
+    assert _job(session_factory, "j1").status == "succeeded"
+
+
+def test_job_payload_is_stored_for_the_handler(session_factory):
+    runner = ForecastJobRunner(
+        lambda job: json.loads(job.payload),
+        max_workers=1,
+        session_factory=session_factory,
+    )
+    payload = {"product_id": 1, "query": "next 3 days", "model_selection": "tournament", "diagnostics": True}
+    db = session_factory()
+    job_id = runner.create(db, org_id=1, product_id=1, query="next 3 days", payload=payload).job_id
+    db.close()
+
+    runner._get_executor().shutdown(wait=True)
+
+    assert json.loads(_job(session_factory, job_id).result) == payload
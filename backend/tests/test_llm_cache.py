@@ -0,0 +1,93 @@
+from datetime import date
+
+import pytest
+
+from app.agents import forecast_graph
+from app.agents import llm_cache as llm_cache_module
+from app.agents.llm_cache import LLMCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache_module, "time", clock)
+    return clock
+
+
+def test_hits_ignore_case_and_whitespace_and_survive_reopen(tmp_path, clock):
+    cache = LLMCache(str(tmp_path / "llm.db"))
+    cache.put(cache.make_key("m", "Forecast  next\nmonth"), "m", "answer")
+
+    assert cache.get(cache.make_key("m", "forecast next month")) == "answer"
+    assert cache.get(cache.make_key("other-model", "forecast next month")) is None
+    assert cache.get(cache.make_key("m", "forecast next month", date(2024, 1, 1))) is None
+
+    cache.close()
+    assert LLMCache(str(tmp_path / "llm.db")).get(cache.make_key("m", "forecast next month")) == "answer"
+
+
+def test_entries_expire_and_least_recently_used_are_evicted(tmp_path, clock):
+    cache = LLMCache(str(tmp_path / "llm.db"), ttl=60, maxsize=2)
+    for prompt in ("a", "b"):
+        cache.put(prompt, "m", prompt.upper())
+        clock.now += 1
+    assert cache.get("a") == "A"  # now more recently used than "b"
+    clock.now += 1
+    cache.put("c", "m", "C")
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+
+    clock.now += 61
+    assert cache.get("c") is None
+    assert len(cache) == 1
+
+
+class CountingLLM:
+    model_name = "test-model"
+
+    def __init__(self):
+        self.prompts = []
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        return "Demand stays flat."
+
+    async def ainvoke(self, prompt):
+        return self.invoke(prompt)
+
+
+def test_repeated_report_prompt_skips_the_llm(tmp_path, monkeypatch):
+    llm = CountingLLM()
+    monkeypatch.setattr(forecast_graph, "get_llm", lambda: llm)
+    monkeypatch.setattr(forecast_graph, "llm_cache", LLMCache(str(tmp_path / "llm.db")))
+    state = {"forecast": {"2024-03-01": 10.0, "2024-03-02": 12.0}, "granularity": "daily"}
+
+    first = forecast_graph.report_agent(state)
+    second = forecast_graph.report_agent(state)
+
+    assert first["report"] == second["report"] == "Demand stays flat."
+    assert len(llm.prompts) == 1
+
+    # Parameter extraction also keys on the dates the answer depends on
+    forecast_graph._invoke_llm("next month", date(2024, 1, 1), date(2023, 12, 31))
+    forecast_graph._invoke_llm("next month", date(2024, 1, 2), date(2023, 12, 31))
+    assert len(llm.prompts) == 3
+
+
+def test_stub_llm_answers_are_not_cached(tmp_path, monkeypatch):
+    cache = LLMCache(str(tmp_path / "llm.db"))
+    monkeypatch.setattr(forecast_graph, "llm_cache", cache)
+    monkeypatch.setattr(forecast_graph.config, "groq_api_key", None)
+
+    forecast_graph._invoke_llm("hello")
+    assert len(cache) == 0
@@ -0,0 +1,44 @@
+import pytest
+
+from app.agents import tools
+from app.configs import config
+from benchmarks.fake_llm_server import FakeLLMServer
+
+
+@pytest.fixture
+def fake_groq(monkeypatch):
+    server = FakeLLMServer(retry_after_ms=10).start()
+    monkeypatch.setattr(config, "groq_api_key", "test")
+    monkeypatch.setattr(config, "groq_base_url", server.url)
+    yield server
+    tools.shared_llm.close()
+    server.stop()
+
+
+def test_calls_share_one_client_and_connection(fake_groq, monkeypatch):
+    llm = tools.get_llm()
+    for _ in range(3):
+        assert tools.get_llm() is llm
+        assert "weekly pattern" in llm.invoke("Summarize the forecast").content
+
+    assert fake_groq.stats["requests"] == 3
+    assert fake_groq.stats["connections"] == 1
+
+    monkeypatch.setattr(config, "groq_model", "another-model")
+    assert tools.get_llm() is not llm
+    assert tools.get_llm().model_name == "another-model"
+
+
+def test_rate_limited_calls_are_retried(fake_groq):
+    fake_groq.rate_limited = 2
+
+    response = tools.get_llm().invoke("is_forecast_request?")
+
+    assert response.content == '{"is_forecast_request": true}'
+    assert fake_groq.stats["requests"] == 3
+    assert fake_groq.stats["rate_limited"] == 2
+
+
+def test_stub_without_api_key(monkeypatch):
+    monkeypatch.setattr(config, "groq_api_key", None)
+    assert isinstance(tools.get_llm(), tools.StubLLM)
@@ -0,0 +1,31 @@
+from app.metrics import Counter, Histogram, Registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    latency = registry.register(Histogram("latency_seconds", "Latency.", ("node",), (0.1, 1)))
+    errors = registry.register(Counter("errors_total", "Errors.", ("node",)))
+
+    for value in (0.05, 0.1, 0.5, 3):
+        latency.observe(value, "a")
+    errors.inc("a")
+    errors.inc("a", amount=2)
+
+    assert registry.render().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{node="a",le="0.1"} 2',
+        'latency_seconds_bucket{node="a",le="1"} 3',
+        'latency_seconds_bucket{node="a",le="+Inf"} 4',
+        'latency_seconds_sum{node="a"} 3.65',
+        'latency_seconds_count{node="a"} 4',
+        "# HELP errors_total Errors.",
+        "# TYPE errors_total counter",
+        'errors_total{node="a"} 3',
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = Counter("hits_total", "Hits.", ("path",))
+    counter.inc('a"b\\c')
+    assert counter.samples() == ['hits_total{path="a\\"b\\\\c"} 1']
@@ -0,0 +1,94 @@
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from datetime import date
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.db import Base
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def _alembic_config(url: str) -> Config:
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    config.set_main_option("sqlalchemy.url", url)
+    return config
+
+
+def _columns(engine, table: str) -> set:
+    return {column["name"] for column in inspect(engine).get_columns(table)}
+
+
+def test_upgrade_creates_forecast_job_on_a_database_without_it(tmp_path):
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE forecast_job"))
+
+    command.upgrade(_alembic_config(url), "head")
+
+    assert _columns(engine, "forecast_job") == {c.name for c in Base.metadata.tables["forecast_job"].columns}
+    indexes = {index["name"] for index in inspect(engine).get_indexes("forecast_job")}
+    assert {"ix_forecast_job_org_id", "ix_forecast_job_status"} <= indexes
+
+    command.downgrade(_alembic_config(url), "0001")
+    assert not inspect(engine).has_table("forecast_job")
+    engine.dispose()
+
+
+def test_upgrade_adds_payload_to_an_existing_forecast_job(tmp_path):
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE forecast_job DROP COLUMN payload"))
+        conn.execute(text(
+            "INSERT INTO forecast_job (job_id, org_id, product_id, query, status, created_at) "
+            "VALUES ('old', 1, 1, 'next week', 'succeeded', '2024-01-01 00:00:00')"
+        ))
+
+    command.upgrade(_alembic_config(url), "head")
+
+    assert "payload" in _columns(engine, "forecast_job")
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT query, payload FROM forecast_job")).one() == ("next week", None)
+    engine.dispose()
+
+
+def test_upgrade_builds_sales_rollup_from_existing_sales(tmp_path):
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE sales_rollup"))
+    db = sessionmaker(bind=engine)()
+    db.add(models.Organization(org_name="Legacy Org", password_hash="x"))
+    db.add(models.Product(org_id=1, product_name="Legacy Product"))
+    db.add_all([
+        models.SalesData(product_id=1, sales_date=date(2024, 1, 5), sales_quantity=2),
+        models.SalesData(product_id=1, sales_date=date(2024, 2, 5), sales_quantity=3),
+    ])
+    db.commit()
+    db.close()
+
+    command.upgrade(_alembic_config(url), "head")
+
+    with engine.connect() as conn:
+        rollups = conn.execute(text(
+            "SELECT period_type, period_start, total, count FROM sales_rollup ORDER BY period_type, period_start"
+        )).all()
+    assert [(t, s, float(total), c) for t, s, total, c in rollups] == [
+        ("monthly", "2024-01-01", 2.0, 1),
+        ("monthly", "2024-02-01", 3.0, 1),
+        ("yearly", "2024-01-01", 5.0, 2),
+    ]
+
+    command.downgrade(_alembic_config(url), "0002")
+    assert not inspect(engine).has_table("sales_rollup")
+    engine.dispose()
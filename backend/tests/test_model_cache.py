@@ -0,0 +1,64 @@
+import pandas as pd
+
+from app.agents import forecasters
+from app.agents.forecast_graph import arima_agent
+from app.agents.model_cache import FittedModelCache, fitted_model_cache
+
+
+def test_lru_eviction_and_invalidation():
+    cache = FittedModelCache(maxsize=2)
+    k1 = cache.make_key(1, "daily", None, None, (10, None))
+    k2 = cache.make_key(2, "daily", None, None, (10, None))
+    k3 = cache.make_key(3, "daily", None, None, (10, None))
+
+    cache.put(k1, {"ets": "m1"})
+    cache.put(k2, {"ets": "m2"})
+    assert cache.get(k1) == {"ets": "m1"}  # k1 becomes most recent
+    cache.put(k3, {"ets": "m3"})
+
+    assert cache.get(k2) is None
+    assert cache.get(k1) is not None
+    assert len(cache) == 2
+
+    cache.invalidate(1)
+    assert cache.get(k1) is None
+    assert cache.get(k3) == {"ets": "m3"}
+
+
+def test_arima_agent_reuses_fitted_models(monkeypatch):
+    fitted_model_cache.clear()
+    fit_calls = []
+    real_fit = forecasters.fit_candidate
+
+    def counting_fit(name, series, granularity):
+        fit_calls.append(name)
+        if name != "ets":
+            raise ValueError("skip")
+        return real_fit(name, series, granularity)
+
+    monkeypatch.setattr(forecasters, "fit_candidate", counting_fit)
+
+    dates = pd.date_range(start="2024-01-01", periods=30, freq="D")
+    ts = pd.DataFrame({"sales_quantity": [10 + (i % 7) for i in range(30)]}, index=dates)
+    state = {
+        "product_id": 42,
+        "time_series": ts,
+        "granularity": "daily",
+        "start_horizon": 1,
+        "end_horizon": 5,
+        "data_version": (30, None),
+    }
+
+    first = arima_agent(state)
+    assert first["forecast_model"] == "ets"
+    assert fit_calls == ["prophet", "arima", "ets"]
+
+    second = arima_agent({**state, "end_horizon": 10})
+    assert fit_calls == ["prophet", "arima", "ets"]
+    assert len(second["forecast"]) == 10
+    assert list(second["forecast"].values())[:5] == list(first["forecast"].values())
+
+    # New rows change the fingerprint and force a refit
+    arima_agent({**state, "data_version": (31, None)})
+    assert fit_calls.count("ets") == 2
+    fitted_model_cache.clear()
@@ -0,0 +1,100 @@
+from datetime import date
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, func, inspect, text
+from sqlalchemy.dialects import sqlite
+
+from app import models
+from app.agents.model_cache import data_version_columns
+from app.db import Base
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def db(app_db):
+    session = app_db.session_factory()
+    yield session
+    session.close()
+
+
+def _plan(db, query) -> str:
+    compiled = query.statement.compile(dialect=sqlite.dialect())
+    params = tuple(
+        value.isoformat() if isinstance(value, date) else value
+        for value in (compiled.params[name] for name in compiled.positiontup)
+    )
+    rows = db.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + compiled.string, params).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+def _assert_index_search(plan: str):
+    assert "SEARCH sales_data USING" in plan, plan
+    assert "SCAN sales_data" not in plan, plan
+
+
+def test_series_read_uses_covering_index(db):
+    # filter_data_agent
+    plan = _plan(
+        db,
+        db.query(models.SalesData.sales_date, models.SalesData.sales_quantity)
+        .filter(models.SalesData.product_id == 1)
+        .order_by(models.SalesData.sales_date),
+    )
+    _assert_index_search(plan)
+    assert "COVERING INDEX ix_sales_product_date_qty" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_dedup_lookups_use_index(db):
+    # create_sales_entry / update_sales_entry
+    _assert_index_search(_plan(
+        db,
+        db.query(models.SalesData).filter(
+            models.SalesData.product_id == 1,
+            models.SalesData.sales_date == date(2024, 1, 1),
+        ),
+    ))
+    # Importers: existing dates of the product within the file's range
+    _assert_index_search(_plan(
+        db,
+        db.query(models.SalesData.sales_date).filter(
+            models.SalesData.product_id == 1,
+            models.SalesData.sales_date.between(date(2024, 1, 1), date(2024, 12, 31)),
+        ),
+    ))
+
+
+def test_fingerprint_and_last_date_use_index(db):
+    # fetch_data_agent
+    plan = _plan(
+        db,
+        db.query(*data_version_columns(), func.max(models.SalesData.sales_date))
+        .filter(models.SalesData.product_id == 1),
+    )
+    _assert_index_search(plan)
+    assert "INDEX ix_sales_product_date_qty" in plan
+
+
+def test_migration_adds_index_to_existing_database(tmp_path):
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_sales_product_date_qty"))
+
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "head")
+
+    indexes = {index["name"] for index in inspect(engine).get_indexes("sales_data")}
+    assert "ix_sales_product_date_qty" in indexes
+
+    command.downgrade(config, "base")
+    indexes = {index["name"] for index in inspect(engine).get_indexes("sales_data")}
+    assert "ix_sales_product_date_qty" not in indexes
+    engine.dispose()
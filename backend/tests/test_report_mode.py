@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import pandas as pd
+import pytest
+
+from app.agents import forecast_graph
+from app.agents.report_template import template_report
+from app.configs import config
+
+
+def test_template_covers_totals_extremes_and_trailing_change():
+    history = pd.Series([10.0] * 20)
+    forecast = {"2024-03-01": 10.0, "2024-03-02": 14.0, "2024-03-03": 12.0}
+
+    report = template_report(forecast, "daily", history)
+
+    assert report == (
+        "Forecast for 2024-03-01 to 2024-03-03 (3 days): 36.0 units in total, 12.0 per day on average. "
+        "The peak day is 2024-03-02 with 14.0 units and the lowest is 2024-03-01 with 10.0 units. "
+        "That is +20.0% against the average of the last 7 days of history (10.0 units per day)."
+    )
+    assert template_report({"2025": 90.0}, "yearly", pd.Series([100.0]), single_period=True) == (
+        "Forecast for 2025: 90.0 units. That is -10.0% against the average of the last 1 year "
+        "of history (100.0 units per year)."
+    )
+    assert template_report({}, "monthly") == "No forecast available."
+
+
+class LLM:
+    model_name = "test-model"
+
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return "From the LLM."
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return "From the LLM."
+
+
+def _state(**extra):
+    ts = pd.DataFrame({"sales_quantity": [5.0] * 10}, index=pd.date_range("2024-02-20", periods=10, freq="D"))
+    return {"forecast": {"2024-03-01": 6.0, "2024-03-02": 4.0}, "granularity": "daily", "time_series": ts, **extra}
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    llm = LLM()
+    monkeypatch.setattr(forecast_graph, "get_llm", lambda: llm)
+    monkeypatch.setattr(config, "report_llm_timeout", 0.2)
+    return llm
+
+
+def test_template_mode_skips_the_llm(llm):
+    update = forecast_graph.report_agent(_state(report_mode="template"))
+
+    assert llm.calls == 0
+    assert update["report_source"] == "template"
+    assert update["report"].startswith("Forecast for 2024-03-01 to 2024-03-02 (2 days)")
+
+
+def test_llm_mode_uses_the_llm_answer(llm):
+    update = forecast_graph.report_agent(_state(report_mode="llm"))
+    assert update == {"report": "From the LLM.", "report_source": "llm"}
+
+
+@pytest.mark.parametrize("unreliable", [LLM(delay=1.0), LLM(error=RuntimeError("503 from Groq"))])
+def test_slow_or_failing_llm_falls_back_to_template(llm, monkeypatch, unreliable):
+    monkeypatch.setattr(forecast_graph, "get_llm", lambda: unreliable)
+
+    began = time.perf_counter()
+    update = forecast_graph.report_agent(_state())
+    assert time.perf_counter() - began < 0.9
+    assert update["report_source"] == "template"
+
+    update = asyncio.run(forecast_graph.areport_agent(_state()))
+    assert update["report_source"] == "template"
+
+
+def test_without_an_llm_the_template_is_used(monkeypatch):
+    monkeypatch.setattr(config, "groq_api_key", None)
+    update = forecast_graph.report_agent(_state())
+    assert update["report_source"] == "template"
@@ -0,0 +1,134 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app import models
+from app.agents import batch, forecast_graph
+from app import rollups
+from app.rollups import rebuild_rollups, record_sales
+
+
+@pytest.fixture
+def session_factory(app_db, monkeypatch):
+    monkeypatch.setattr(forecast_graph, "SessionLocal", app_db.session_factory)
+    app_db.add_org("Rollup Org", "Rollup Product")
+    return app_db.session_factory
+
+
+def _rollups(session_factory):
+    db = session_factory()
+    try:
+        return {
+            (r.period_type, r.period_start): (float(r.total), r.count)
+            for r in db.query(models.SalesRollup).filter(models.SalesRollup.product_id == 1)
+        }
+    finally:
+        db.close()
+
+
+def _rebuilt(session_factory):
+    db = session_factory()
+    rebuild_rollups(db)
+    db.commit()
+    db.close()
+    return _rollups(session_factory)
+
+
+def test_writes_keep_rollups_in_sync(app_db, session_factory):
+    client = app_db.client(org_id=1)
+    csv_text = "sales_date,sales_quantity\n" + "\n".join(
+        f"{date(2024, 1, 20) + timedelta(days=i)},{i + 1}" for i in range(20)
+    )
+    resp = client.post(
+        "/api/sales/import/excel",
+        data={"product_id": "1"},
+        files={"file": ("sales.csv", csv_text.encode(), "text/csv")},
+    )
+    assert resp.json()["imported_count"] == 20
+
+    created = client.post("/sales", json={"product_id": 1, "sales_date": "2023-12-31", "sales_quantity": 4})
+    order_id = created.json()["order_id"]
+    client.put(f"/sales/{order_id}", json={"sales_date": "2024-03-05", "sales_quantity": 6})
+    first_order = client.get("/sales/by_product/1", params={"to": "2024-01-20"}).json()[0]["order_id"]
+    client.delete(f"/sales/{first_order}")
+
+    incremental = _rollups(session_factory)
+    assert incremental[("monthly", date(2024, 1, 1))] == (sum(range(2, 13)), 11)
+    assert incremental[("monthly", date(2024, 3, 1))] == (6.0, 1)
+    assert ("yearly", date(2023, 1, 1)) not in incremental
+    assert incremental == _rebuilt(session_factory)
+
+
+def _seed_daily(session_factory, days=90):
+    db = session_factory()
+    for i in range(days):
+        db.add(models.SalesData(product_id=1, sales_date=date(2024, 1, 1) + timedelta(days=i), sales_quantity=i + 1))
+    db.commit()
+    rebuild_rollups(db)
+    db.commit()
+    db.close()
+
+
+def test_record_sales_adds_to_existing_rollups_and_drops_emptied_periods(session_factory):
+    db = session_factory()
+    record_sales(db, 1, added=[(date(2024, 1, 5), 2), (date(2024, 2, 5), 3)])
+    db.commit()
+    record_sales(db, 1, added=[(date(2024, 1, 9), 4)], removed=[(date(2024, 2, 5), 3)])
+    db.commit()
+    db.close()
+
+    assert _rollups(session_factory) == {
+        ("monthly", date(2024, 1, 1)): (6.0, 2),
+        ("yearly", date(2024, 1, 1)): (6.0, 2),
+    }
+
+
+def test_dialects_without_on_conflict_update_then_insert(session_factory, monkeypatch):
+    monkeypatch.setattr(rollups, "UPSERT_INSERTS", {})
+    test_record_sales_adds_to_existing_rollups_and_drops_emptied_periods(session_factory)
+
+
+def _load_series(**params):
+    state = {"product_id": 1, **params}
+    state.update(forecast_graph.fetch_data_agent(state))
+    state.update(forecast_graph.filter_data_agent(state))
+    return state
+
+
+def test_monthly_forecast_series_is_read_from_rollups(session_factory):
+    _seed_daily(session_factory)
+
+    daily = _load_series(granularity="daily")
+    monthly = _load_series(granularity="monthly")
+    windowed = _load_series(granularity="monthly", history_start=date(2024, 2, 1))
+
+    assert len(daily["time_series"]) == 90
+    assert len(monthly["time_series"]) == 3  # never loaded the 90 daily rows
+    assert monthly["last_date"] == daily["last_date"] == date(2024, 3, 30)
+    expected = forecast_graph.preprocess_agent(dict(daily, granularity="monthly"))["time_series"]
+    assert monthly["time_series"]["sales_quantity"].tolist() == expected["sales_quantity"].tolist()
+    # A history window needs the daily rows
+    assert len(windowed["time_series"]) == 59
+
+
+def test_stale_rollups_fall_back_to_daily_rows(session_factory):
+    _seed_daily(session_factory)
+    db = session_factory()
+    db.query(models.SalesRollup).filter(models.SalesRollup.period_start == date(2024, 3, 1)).delete()
+    db.commit()
+    db.close()
+
+    assert len(_load_series(granularity="monthly")["time_series"]) == 90
+
+
+def test_batch_loads_rollups_for_yearly(session_factory):
+    _seed_daily(session_factory)
+
+    db = session_factory()
+    name, ts, version = batch.load_org_series(db, 1, "yearly")[1]
+    daily_version = batch.load_org_series(db, 1)[1][2]
+    db.close()
+
+    assert name == "Rollup Product"
+    assert ts["sales_quantity"].tolist() == [float(sum(range(1, 91)))]
+    assert version == daily_version
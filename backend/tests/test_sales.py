@@ -0,0 +1,120 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app import models
+from app.configs import config
+from app.rollups import rebuild_rollups
+
+
+@pytest.fixture(params=[False, True], ids=["async", "threadpool"])
+def sales_client(app_db, request):
+    org_id = app_db.add_org("Sales Org", "First", "Second")
+
+    db = app_db.session_factory()
+    start = date(2024, 1, 1)
+    for i in range(10):
+        for product_id in (1, 2):
+            db.add(models.SalesData(
+                product_id=product_id,
+                sales_date=start + timedelta(days=i),
+                sales_quantity=i + 1,
+            ))
+    db.commit()
+    rebuild_rollups(db)
+    db.commit()
+    db.close()
+
+    # "threadpool": the sync session fallback used without an async driver
+    return app_db.client(org_id=org_id, async_fallback=request.param)
+
+
+def _all_pages(client, url, **params):
+    pages = []
+    cursor = None
+    while True:
+        resp = client.get(url, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert resp.status_code == 200
+        pages.append(resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+
+
+def test_org_listing_pages_through_every_row_once(sales_client):
+    pages = _all_pages(sales_client, "/sales/by_org/1", limit=3)
+
+    rows = [row for page in pages for row in page]
+    assert [len(page) for page in pages] == [3, 3, 3, 3, 3, 3, 2]
+    assert len({row["order_id"] for row in rows}) == 20
+    keys = [(row["sales_date"], row["order_id"]) for row in rows]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_date_range_is_applied_in_sql(sales_client):
+    pages = _all_pages(sales_client, "/sales/by_product/1", limit=2, **{"from": "2024-01-03", "to": "2024-01-06"})
+
+    dates = [row["sales_date"] for page in pages for row in page]
+    assert dates == ["2024-01-06", "2024-01-05", "2024-01-04", "2024-01-03"]
+
+
+def test_import_router_listing_is_paginated(sales_client):
+    resp = sales_client.get("/api/sales/product/2", params={"limit": 4})
+    assert len(resp.json()) == 4
+    assert resp.headers["X-Next-Cursor"] == "2024-01-07.14"
+
+
+def test_listing_without_limit_or_cursor_returns_every_row(sales_client, monkeypatch):
+    monkeypatch.setattr(config, "sales_page_limit", 3)
+
+    resp = sales_client.get("/sales/by_org/1")
+    assert len(resp.json()) == 20
+    assert "X-Next-Cursor" not in resp.headers
+
+    first = sales_client.get("/sales/by_org/1", params={"limit": 5})
+    rest = sales_client.get("/sales/by_org/1", params={"cursor": first.headers["X-Next-Cursor"]})
+    assert len(rest.json()) == 3
+
+
+def test_limit_is_capped_and_cursor_validated(sales_client):
+    assert sales_client.get("/sales/by_org/1", params={"limit": 10**6}).status_code == 422
+    assert sales_client.get("/sales/by_org/1", params={"cursor": "garbage"}).status_code == 400
+
+
+def test_aggregate_by_product_and_month(sales_client):
+    resp = sales_client.get("/sales/aggregate", params={"group_by": ["product", "month"]})
+    assert resp.status_code == 200
+    assert resp.json() == [
+        {"product_id": 1, "period": "2024-01-01", "value": 55.0},
+        {"product_id": 2, "period": "2024-01-01", "value": 55.0},
+    ]
+
+
+def test_aggregate_by_week_with_filters(sales_client):
+    # 2024-01-01 is a Monday, so days 1..7 and 8..10 form two weeks
+    resp = sales_client.get(
+        "/sales/aggregate",
+        params={"group_by": "week", "agg": "max", "product_id": 1, "to": "2024-01-09"},
+    )
+    assert resp.json() == [
+        {"product_id": None, "period": "2024-01-01", "value": 7.0},
+        {"product_id": None, "period": "2024-01-08", "value": 9.0},
+    ]
+
+    daily = sales_client.get("/sales/aggregate", params={"group_by": "day", "agg": "count"}).json()
+    assert len(daily) == 10
+    assert {row["value"] for row in daily} == {2.0}
+
+
+def test_aggregate_month_with_a_date_range_reads_sales_data(sales_client):
+    resp = sales_client.get(
+        "/sales/aggregate",
+        params={"group_by": "month", "product_id": 2, "from": "2024-01-05", "to": "2024-01-31"},
+    )
+    assert resp.status_code == 200
+    assert resp.json() == [{"product_id": None, "period": "2024-01-01", "value": 45.0}]
+
+
+def test_aggregate_rejects_two_periods(sales_client):
+    resp = sales_client.get("/sales/aggregate", params={"group_by": ["day", "month"]})
+    assert resp.status_code == 400
@@ -0,0 +1,29 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.agents import forecast_graph
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_importing_the_app_defers_forecasting_libraries():
+    code = (
+        "import json, sys; import app.main; "
+        "print(json.dumps([m for m in ('langgraph', 'langchain_core', 'app.agents.forecast_graph', "
+        "'statsmodels', 'pmdarima', 'prophet') if m in sys.modules]))"
+    )
+    env = {**os.environ, "DATABASE_URL": "sqlite:///:memory:"}
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    assert json.loads(output.strip().splitlines()[-1]) == []
+
+
+def test_workflow_is_compiled_once_and_shared():
+    workflow = forecast_graph.get_workflow()
+    assert forecast_graph.get_workflow() is workflow
+    assert forecast_graph.demand_forecast_workflow is workflow
+    assert forecast_graph.async_demand_forecast_workflow is forecast_graph.get_workflow(async_nodes=True)
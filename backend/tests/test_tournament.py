@@ -0,0 +1,134 @@
+import asyncio
+from concurrent.futures import Future
+from threading import Timer
+
+import pandas as pd
+import pytest
+
+from app.agents import forecast_graph, forecasters, tournament
+from app.agents.executor import SubprocessTimeout
+from app.configs import config
+
+
+class InlinePool:
+    """Runs submissions synchronously; results are handed over after ``queued`` seconds."""
+
+    def __init__(self, queued=0.0):
+        self.queued = queued
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append(args[0])
+        future = Future()
+        try:
+            result, error = fn(*args), None
+        except Exception as e:
+            result, error = None, e
+
+        def settle():
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+        if self.queued:
+            Timer(self.queued, settle).start()
+        else:
+            settle()
+        return future
+
+    async def run(self, fn, *args):
+        return fn(*args)
+
+
+@pytest.fixture
+def fake_models(monkeypatch):
+    # prophet fails, arima predicts 0, ets predicts the series level (10);
+    # candidates in ``pool.slow`` overrun any time limit
+    def fit(name, series, granularity, timeout):
+        if name == "prophet":
+            raise ValueError("no fit")
+        if name in pool.slow and timeout is not None:
+            raise SubprocessTimeout(f"Timed out after {timeout:g}s")
+        return name
+
+    def predict(name, fitted, total_steps, granularity):
+        return [0.0 if fitted == "arima" else 10.0] * total_steps
+
+    monkeypatch.setattr(forecasters, "fit_candidate_within", fit)
+    monkeypatch.setattr(forecasters, "predict_candidate", predict)
+    pool = InlinePool()
+    pool.slow = set()
+    monkeypatch.setattr(tournament, "forecast_pool", pool)
+    return pool
+
+
+def _series(periods=60):
+    dates = pd.date_range(start="2024-01-01", periods=periods, freq="D")
+    return pd.Series([10.0 + (i % 3) - 1 for i in range(periods)], index=dates)
+
+
+def test_lowest_holdout_error_wins_and_scores_are_reused(fake_models):
+    values, name, fitted_models, candidates, reason = tournament.run_tournament(_series(), "daily", 1, 5)
+
+    assert name == "ets"
+    assert values == [10.0] * 5
+    assert reason is None
+    assert {c["model"]: c["status"] for c in candidates} == {"prophet": "failed", "arima": "ok", "ets": "ok"}
+    ets = next(c for c in candidates if c["model"] == "ets")
+    assert ets["seconds"] is not None and ets["holdout_mae"] < 1
+
+    fake_models.submitted.clear()
+    _, name, _, candidates, _ = tournament.run_tournament(_series(), "daily", 1, 5, fitted_models)
+    assert name == "ets"
+    assert fake_models.submitted == []
+    assert {c["model"]: c["status"] for c in candidates}["ets"] == "cached"
+
+
+def test_slow_candidate_times_out(fake_models, monkeypatch):
+    fake_models.slow = {"ets"}
+    monkeypatch.setattr(config, "forecast_candidate_timeout", 0.05)
+
+    _, name, fitted_models, candidates, reason = asyncio.run(tournament.arun_tournament(_series(), "daily", 1, 5))
+
+    assert name == "arima"
+    assert {c["model"]: c["status"] for c in candidates}["ets"] == "timeout"
+    assert reason == "ets timed out after 0.05s"
+    assert "ets" not in fitted_models
+
+
+def test_time_queued_for_the_pool_does_not_count_against_the_limit(fake_models, monkeypatch):
+    fake_models.queued = 0.2
+    monkeypatch.setattr(config, "forecast_candidate_timeout", 0.05)
+
+    _, name, _, candidates, reason = tournament.run_tournament(_series(), "daily", 1, 5)
+
+    assert name == "ets"
+    assert reason is None
+    assert {c["model"]: c["status"] for c in candidates} == {"prophet": "failed", "arima": "ok", "ets": "ok"}
+
+
+def test_arima_agent_reports_candidates_in_tournament_mode(fake_models):
+    ts = _series().to_frame("sales_quantity")
+    update = forecast_graph.arima_agent({
+        "time_series": ts,
+        "granularity": "daily",
+        "start_horizon": 1,
+        "end_horizon": 3,
+        "model_selection": "tournament",
+    })
+    assert update["forecast_model"] == "ets"
+    assert [c["model"] for c in update["model_candidates"]] == ["prophet", "arima", "ets"]
+
+
+def test_short_series_falls_back_to_chain(fake_models):
+    ts = _series(periods=4).to_frame("sales_quantity")
+    update = forecast_graph.arima_agent({
+        "time_series": ts,
+        "granularity": "daily",
+        "start_horizon": 1,
+        "end_horizon": 2,
+        "model_selection": "tournament",
+    })
+    assert "model_candidates" not in update
+    assert fake_models.submitted == []
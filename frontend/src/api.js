@@ -50,13 +50,43 @@ export async function createSalesEntry(input) {
 }
 
 // Sales endpoints - READ
-export async function getSalesByProduct(productId) {
-  const res = await api.get(`/sales/by_product/${productId}`);
-  return res.data;
+// Listings are paginated newest first; the next page's cursor comes back in
+// the X-Next-Cursor header. params: { limit, cursor, from, to }
+async function getSalesPage(path, params = {}) {
+  const res = await api.get(path, { params });
+  return { items: res.data, nextCursor: res.headers["x-next-cursor"] ?? null };
+}
+
+async function getAllSalesPages(path, params = {}) {
+  const items = [];
+  let cursor = null;
+  do {
+    const page = await getSalesPage(path, { ...params, ...(cursor ? { cursor } : {}) });
+    items.push(...page.items);
+    cursor = page.nextCursor;
+  } while (cursor);
+  return items;
+}
+
+export async function getSalesPageByOrg(orgId, params = {}) {
+  return getSalesPage(`/sales/by_org/${orgId}`, params);
+}
+
+export async function getSalesByProduct(productId, params = {}) {
+  return getAllSalesPages(`/sales/by_product/${productId}`, params);
 }
 
-export async function getSalesByOrg(orgId) {
-  const res = await api.get(`/sales/by_org/${orgId}`);
+export async function getSalesByOrg(orgId, params = {}) {
+  return getAllSalesPages(`/sales/by_org/${orgId}`, params);
+}
+
+// Aggregates computed server-side.
+// params: { group_by: ["product", "day"|"week"|"month"|"year"], agg, product_id, from, to }
+export async function getSalesAggregate(params = {}) {
+  const res = await api.get("/sales/aggregate", {
+    params,
+    paramsSerializer: { indexes: null }, // group_by=product&group_by=day
+  });
   return res.data;
 }
 
@@ -91,4 +121,64 @@ export async function getNlpForecast(productId, query) {
     query,
   });
   return res.data;
-}
\ No newline at end of file
+}
+
+// Server-sent events: onEvent(name, data) fires as each forecast step completes
+export async function streamNlpForecast(productId, query, onEvent) {
+  const res = await fetch(`${api.defaults.baseURL}/forecast/stream`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      Authorization: api.defaults.headers.common["Authorization"],
+    },
+    body: JSON.stringify({ product_id: productId, query }),
+  });
+  if (!res.ok) throw new Error(`Forecast stream failed: ${res.status}`);
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let result = null;
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let sep;
+    while ((sep = buffer.indexOf("\n\n")) !== -1) {
+      const block = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+      const event = block.match(/^event: (.*)$/m)?.[1];
+      const data = JSON.parse(block.match(/^data: (.*)$/m)?.[1] ?? "null");
+      if (event === "error") throw new Error(data.detail);
+      if (event === "result") result = data;
+      onEvent?.(event, data);
+    }
+  }
+  return result;
+}
+
+// Forecast jobs: queue the forecast, then poll until it finishes
+export async function createForecastJob(productId, query) {
+  const res = await api.post("/forecast/jobs", {
+    product_id: productId,
+    query,
+  });
+  return res.data;
+}
+
+export async function getForecastJob(jobId) {
+  const res = await api.get(`/forecast/jobs/${jobId}`);
+  return res.data;
+}
+
+export async function runForecastJob(productId, query, { intervalMs = 1000 } = {}) {
+  let job = await createForecastJob(productId, query);
+  while (job.status === "queued" || job.status === "running") {
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    job = await getForecastJob(job.job_id);
+  }
+  if (job.status === "failed") {
+    throw new Error(job.error || "Forecast job failed");
+  }
+  return job.result;
+}
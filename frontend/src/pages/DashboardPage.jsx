@@ -1,7 +1,7 @@
 import React, { useEffect, useState, useRef } from "react";
 import ProductSelector from "../components/ProductSelector";
 import { useAuth } from "../context/AuthContext";
-import { createProduct, listProductsByOrg, getForecast, getNlpForecast } from "../api";
+import { createProduct, listProductsByOrg, getForecast, runForecastJob } from "../api";
 import ForecastBubble from "../components/ForecastBubble";
 import { Send, TrendingUp } from "lucide-react";
 
@@ -52,7 +52,7 @@ function DashboardPage() {
     setChatHistory((prev) => [...prev, { type: "user", content: userMessage }]);
 
     try {
-      const res = await getNlpForecast(selectedProductId, userMessage);
+      const res = await runForecastJob(selectedProductId, userMessage);
 
       if (res.is_forecast_request) {
         setChatHistory((prev) => [
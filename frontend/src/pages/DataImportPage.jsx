@@ -66,6 +66,10 @@ function DataImportPage() {
     const formData = new FormData();
     formData.append('file', file);
     formData.append('product_id', selectedProduct);
+    if (file.name.endsWith('.csv')) {
+      // Large CSVs are read and committed in chunks on the server
+      formData.append('stream', 'true');
+    }
 
     try {
       const token = localStorage.getItem('auth_token');
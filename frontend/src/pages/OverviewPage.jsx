@@ -11,7 +11,7 @@ import {
 } from "recharts";
 import { useAuth } from "../context/AuthContext";
 import ProductSelector from "../components/ProductSelector";
-import { getSalesByOrg, getSalesByProduct, listProductsByOrg } from "../api";
+import { getSalesAggregate, listProductsByOrg } from "../api";
 
 function OverviewPage() {
   const { org } = useAuth();
@@ -26,17 +26,14 @@ function OverviewPage() {
     const load = async () => {
       if (!org) return;
       try {
-        const [prods, orgSalesData] = await Promise.all([
+        const [prods, orgDaily] = await Promise.all([
           listProductsByOrg(org.org_id),
-          getSalesByOrg(org.org_id),
+          getSalesAggregate({ group_by: "day", agg: "sum" }),
         ]);
         setProducts(prods);
-        setOrgSales(orgSalesData);
+        setOrgSales(orgDaily);
         if (prods.length > 0) {
-          const pid = prods[0].product_id;
-          setSelectedProductId(pid);
-          const ps = await getSalesByProduct(pid);
-          setProductSales(ps);
+          setSelectedProductId(prods[0].product_id);
         }
       } catch (err) {
         console.error(err);
@@ -49,7 +46,11 @@ function OverviewPage() {
     const loadProductSales = async () => {
       if (!selectedProductId) return;
       try {
-        const ps = await getSalesByProduct(selectedProductId);
+        const ps = await getSalesAggregate({
+          group_by: "day",
+          agg: "sum",
+          product_id: selectedProductId,
+        });
         setProductSales(ps);
       } catch (err) {
         console.error(err);
@@ -64,24 +65,15 @@ function OverviewPage() {
 
   const productSeries = useMemo(
     () =>
-      productSales.map((s) => ({
-        date: s.sales_date,
-        quantity: Number(s.sales_quantity),
-      })),
+      productSales.map((row) => ({ date: row.period, quantity: row.value })),
     [productSales]
   );
 
-  const overallSeries = useMemo(() => {
-    const map = new Map();
-    orgSales.forEach((s) => {
-      const key = s.sales_date;
-      const prev = map.get(key) ?? 0;
-      map.set(key, prev + Number(s.sales_quantity));
-    });
-    return Array.from(map.entries())
-      .sort(([a], [b]) => (a < b ? -1 : 1))
-      .map(([date, quantity]) => ({ date, quantity }));
-  }, [orgSales]);
+  // Daily totals across all products, summed by the server
+  const overallSeries = useMemo(
+    () => orgSales.map((row) => ({ date: row.period, quantity: row.value })),
+    [orgSales]
+  );
 
   const activeSeries = seriesMode === "product" ? productSeries : overallSeries;
 
@@ -3,12 +3,15 @@ import { Plus, Edit2, Trash2, X, Search, Package, TrendingUp } from "lucide-reac
 import { useAuth } from "../context/AuthContext";
 import {
   listProductsByOrg,
-  getSalesByOrg,
+  getSalesPageByOrg,
   createSalesEntry,
   updateSalesEntry,
   deleteSalesEntry,
 } from "../api";
 
+// Rows fetched per request; older rows load on demand
+const PAGE_SIZE = 200;
+
 function SalesDataPage() {
   const { org } = useAuth();
   const [products, setProducts] = useState([]);
@@ -26,6 +29,8 @@ function SalesDataPage() {
     sales_quantity: "",
   });
   const [error, setError] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     if (org?.org_id) {
@@ -41,12 +46,13 @@ function SalesDataPage() {
     setLoading(true);
     setError(null);
     try {
-      const [productsData, salesResponse] = await Promise.all([
+      const [productsData, salesPage] = await Promise.all([
         listProductsByOrg(org.org_id),
-        getSalesByOrg(org.org_id),
+        getSalesPageByOrg(org.org_id, { limit: PAGE_SIZE }),
       ]);
       setProducts(productsData);
-      setSalesData(salesResponse);
+      setSalesData(salesPage.items);
+      setNextCursor(salesPage.nextCursor);
     } catch (error) {
       console.error("Error loading data:", error);
       setError("Failed to load data. Please try again.");
@@ -55,6 +61,24 @@ function SalesDataPage() {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const salesPage = await getSalesPageByOrg(org.org_id, {
+        limit: PAGE_SIZE,
+        cursor: nextCursor,
+      });
+      setSalesData((loaded) => [...loaded, ...salesPage.items]);
+      setNextCursor(salesPage.nextCursor);
+    } catch (error) {
+      console.error("Error loading more sales:", error);
+      setError("Failed to load more sales. Please try again.");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const filterSales = () => {
     let filtered = [...salesData];
 
@@ -348,6 +372,17 @@ function SalesDataPage() {
                 )}
               </tbody>
             </table>
+            {nextCursor && (
+              <div className="px-6 py-4 border-t border-gray-200 text-center">
+                <button
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                  className="text-sm font-medium text-blue-600 hover:text-blue-800 disabled:text-gray-400"
+                >
+                  {loadingMore ? "Loading..." : "Load more"}
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>